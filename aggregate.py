@@ -0,0 +1,224 @@
+"""Потоковые итоги тренировок по пользователям и видам тренировок."""
+from collections import deque
+from dataclasses import asdict, dataclass, field
+from typing import Any, Hashable, Iterator, Sequence
+
+from batch import neumaier_add
+from homework import InfoMessage, read_package
+
+DAY: int = 24 * 60 * 60
+WEEK: int = 7 * DAY
+
+Key = tuple[Hashable, str]
+
+
+@dataclass
+class TypeTotals:
+    """Суммарные показатели по виду тренировки.
+
+    Суммы копятся с компенсацией (Неймайер): поля `*_error` хранят
+    остаток округления, который ещё не вошёл в сумму.
+    """
+
+    count: int = 0
+    duration: float = 0.0
+    distance: float = 0.0
+    calories: float = 0.0
+    duration_error: float = field(default=0.0, repr=False, compare=False)
+    distance_error: float = field(default=0.0, repr=False, compare=False)
+    calories_error: float = field(default=0.0, repr=False, compare=False)
+
+    def add(self, info: InfoMessage) -> None:
+        """Учесть сообщение о тренировке."""
+        self.count += 1
+        self.duration, self.duration_error = neumaier_add(
+            self.duration, self.duration_error, info.duration
+        )
+        self.distance, self.distance_error = neumaier_add(
+            self.distance, self.distance_error, info.distance
+        )
+        self.calories, self.calories_error = neumaier_add(
+            self.calories, self.calories_error, info.calories
+        )
+
+    def merge(self, other: 'TypeTotals') -> None:
+        """Прибавить показатели другого набора."""
+        self.count += other.count
+        self.duration, self.duration_error = neumaier_add(
+            self.duration, self.duration_error + other.duration_error,
+            other.duration,
+        )
+        self.distance, self.distance_error = neumaier_add(
+            self.distance, self.distance_error + other.distance_error,
+            other.distance,
+        )
+        self.calories, self.calories_error = neumaier_add(
+            self.calories, self.calories_error + other.calories_error,
+            other.calories,
+        )
+
+    @property
+    def mean_distance(self) -> float:
+        """Средняя дистанция тренировки."""
+        return self.distance / self.count if self.count else 0.0
+
+    @property
+    def mean_calories(self) -> float:
+        """Среднее количество калорий за тренировку."""
+        return self.calories / self.count if self.count else 0.0
+
+    @property
+    def mean_speed(self) -> float:
+        """Средняя скорость по всем тренировкам."""
+        return self.distance / self.duration if self.duration else 0.0
+
+
+class KeyState:
+    """Итоги за всё время и корзины скользящего окна для одного ключа."""
+
+    __slots__ = ('totals', 'buckets')
+
+    def __init__(self) -> None:
+        self.totals = TypeTotals()
+        self.buckets: deque[tuple[int, TypeTotals]] = deque()
+
+
+class StreamingAggregator:
+    """Нарастающие итоги и скользящие окна по пользователю и виду.
+
+    Окно делится на корзины по `bucket` секунд, поэтому память
+    на ключ ограничена числом корзин в окне.
+    """
+
+    def __init__(self, window: int = WEEK, bucket: int = DAY) -> None:
+        if window <= 0 or bucket <= 0 or window % bucket:
+            raise ValueError('Окно должно делиться на корзины без остатка.')
+        self.window = window
+        self.bucket = bucket
+        self.late = 0
+        self._states: dict[Key, KeyState] = {}
+
+    @property
+    def buckets_in_window(self) -> int:
+        """Число корзин в окне."""
+        return self.window // self.bucket
+
+    def add(self,
+            user: Hashable,
+            info: InfoMessage,
+            timestamp: float) -> None:
+        """Учесть сообщение о тренировке пользователя."""
+        key = (user, info.training_type)
+        state = self._states.get(key)
+        if state is None:
+            state = self._states[key] = KeyState()
+        state.totals.add(info)
+        index = int(timestamp // self.bucket)
+        buckets = state.buckets
+        if buckets and buckets[-1][0] == index:
+            buckets[-1][1].add(info)
+        elif not buckets or buckets[-1][0] < index:
+            buckets.append((index, TypeTotals()))
+            buckets[-1][1].add(info)
+            self._trim(buckets, index)
+        else:
+            self._add_late(buckets, index, info)
+
+    def add_package(self,
+                    user: Hashable,
+                    workout_type: str,
+                    data: Sequence[float],
+                    timestamp: float) -> InfoMessage:
+        """Рассчитать пакет и учесть его сообщение."""
+        info = read_package(workout_type, data).show_training_info()
+        self.add(user, info, timestamp)
+        return info
+
+    def _trim(self, buckets: deque, index: int) -> None:
+        oldest = index - self.buckets_in_window
+        while buckets and buckets[0][0] <= oldest:
+            buckets.popleft()
+
+    def _add_late(self, buckets: deque, index: int, info: InfoMessage) -> None:
+        if index <= buckets[-1][0] - self.buckets_in_window:
+            self.late += 1
+            return
+        for position, (bucket_index, totals) in enumerate(buckets):
+            if bucket_index == index:
+                totals.add(info)
+                return
+            if bucket_index > index:
+                buckets.insert(position, (index, TypeTotals()))
+                buckets[position][1].add(info)
+                return
+
+    def totals(self, user: Hashable, training_type: str) -> TypeTotals:
+        """Получить итоги ключа за всё время."""
+        state = self._states.get((user, training_type))
+        return state.totals if state else TypeTotals()
+
+    def window_totals(self,
+                      user: Hashable,
+                      training_type: str,
+                      now: float) -> TypeTotals:
+        """Получить итоги ключа за окно, заканчивающееся в `now`."""
+        result = TypeTotals()
+        state = self._states.get((user, training_type))
+        if state is None:
+            return result
+        oldest = int(now // self.bucket) - self.buckets_in_window
+        for index, totals in state.buckets:
+            if index > oldest:
+                result.merge(totals)
+        return result
+
+    def keys(self) -> Iterator[Key]:
+        """Перебрать ключи пользователь — вид тренировки."""
+        return iter(self._states)
+
+    def evict_idle(self, now: float) -> dict[Key, TypeTotals]:
+        """Удалить ключи без тренировок в окне и вернуть их итоги."""
+        oldest = int(now // self.bucket) - self.buckets_in_window
+        idle = [
+            key for key, state in self._states.items()
+            if not state.buckets or state.buckets[-1][0] <= oldest
+        ]
+        return {key: self._states.pop(key).totals for key in idle}
+
+    def __len__(self) -> int:
+        return len(self._states)
+
+    def snapshot(self) -> dict[str, Any]:
+        """Сохранить состояние в словарь, пригодный для JSON."""
+        return {
+            'window': self.window,
+            'bucket': self.bucket,
+            'late': self.late,
+            'keys': [
+                {
+                    'user': user,
+                    'training_type': training_type,
+                    'totals': asdict(state.totals),
+                    'buckets': [
+                        [index, asdict(totals)]
+                        for index, totals in state.buckets
+                    ],
+                }
+                for (user, training_type), state in self._states.items()
+            ],
+        }
+
+    @classmethod
+    def restore(cls, snapshot: dict[str, Any]) -> 'StreamingAggregator':
+        """Восстановить агрегатор из словаря `snapshot`."""
+        aggregator = cls(snapshot['window'], snapshot['bucket'])
+        aggregator.late = snapshot['late']
+        for item in snapshot['keys']:
+            state = KeyState()
+            state.totals = TypeTotals(**item['totals'])
+            state.buckets.extend(
+                (index, TypeTotals(**totals))
+                for index, totals in item['buckets']
+            )
+            aggregator._states[(item['user'], item['training_type'])] = state
+        return aggregator
@@ -0,0 +1,468 @@
+"""Пакетный расчёт показателей тренировок по столбцам данных.
+
+Точность. Ядра вычисляют те же выражения в том же порядке, что
+и методы классов тренировок, поэтому в режиме `float64` результаты
+побитово совпадают со скалярным расчётом. В режиме `float32`
+вычисления идут в float64, а результат округляется один раз:
+относительная ошибка не больше 2**-24 (около 6e-8). Если и входные
+столбцы хранятся во float32 (`TrainingBatch(..., typecode='f')`),
+ошибка встроенных видов тренировок не больше `FLOAT32_BOUND`.
+
+Суммы столбцов (`column_sum`): `naive` — последовательное сложение
+с ошибкой до (n - 1) * 2**-53 * sum(|x|); `compensated` — сложение
+Неймайера с ошибкой до 2**-52 * |S| + O(n * 2**-106) * sum(|x|);
+`exact` — `math.fsum`, правильно округлённая сумма.
+"""
+import math
+from array import array
+from dataclasses import dataclass
+from functools import lru_cache, reduce
+from operator import add
+from typing import Callable, Iterable, Iterator, Mapping, Optional, Sequence
+
+from homework import (
+    METRICS,
+    LazyInfoMessage,
+    Running,
+    SportsWalking,
+    Swimming,
+    Training,
+    get_parameters,
+    load_workout,
+)
+
+COLUMNS: tuple[str, ...] = (
+    'action',
+    'duration',
+    'weight',
+    'height',
+    'length_pool',
+    'count_pool',
+)
+
+FIELDS: tuple[str, ...] = ('distance', 'speed', 'calories')
+PRECISIONS: dict[str, str] = {'float64': 'd', 'float32': 'f'}
+FLOAT32_BOUND: float = 8 * 2.0 ** -24
+
+Columns = Mapping[str, Sequence[float]]
+Metrics = tuple[list[float], list[float], list[float]]
+
+
+@dataclass
+class BatchResult:
+    """Результаты расчёта для набора тренировок одного вида.
+
+    Показатели, не запрошенные при расчёте, равны `None`.
+    """
+
+    training_type: str
+    duration: array
+    distance: Optional[array] = None
+    speed: Optional[array] = None
+    calories: Optional[array] = None
+
+    def __len__(self) -> int:
+        return len(self.duration)
+
+    def total(self, name: str, summation: str = 'compensated') -> float:
+        """Получить сумму показателя способом `summation`."""
+        values = getattr(self, name)
+        if values is None:
+            raise ValueError(f'Показатель {name} не рассчитан.')
+        return column_sum(values, summation)
+
+
+def neumaier_sum(values: Iterable[float]) -> float:
+    """Сложить значения с компенсацией ошибки округления (Неймайер)."""
+    total = 0.0
+    compensation = 0.0
+    for value in values:
+        updated = total + value
+        if abs(total) >= abs(value):
+            compensation += (total - updated) + value
+        else:
+            compensation += (value - updated) + total
+        total = updated
+    return total + compensation
+
+
+def neumaier_add(total: float,
+                 error: float,
+                 value: float) -> tuple[float, float]:
+    """Прибавить значение к нарастающей сумме с остатком округления.
+
+    Возвращает новую сумму, уже учитывающую остаток, и новый остаток.
+    """
+    updated = total + value
+    if abs(total) >= abs(value):
+        error += (total - updated) + value
+    else:
+        error += (value - updated) + total
+    total = updated + error
+    return total, error - (total - updated)
+
+
+SUMMATIONS: dict[str, Callable[[Iterable[float]], float]] = {
+    'naive': lambda values: reduce(add, values, 0.0),
+    'compensated': neumaier_sum,
+    'exact': math.fsum,
+}
+
+
+def column_sum(values: Iterable[float],
+               summation: str = 'compensated') -> float:
+    """Сложить столбец: `naive`, `compensated` или `exact`."""
+    try:
+        return SUMMATIONS[summation](values)
+    except KeyError:
+        raise ValueError(
+            f'Способ суммирования должен быть одним из: '
+            f'{", ".join(SUMMATIONS)}.'
+        ) from None
+
+
+@lru_cache(maxsize=None)
+def get_columns(training_class: type[Training]) -> tuple[str, ...]:
+    """Получить столбцы, которые принимает конструктор тренировки."""
+    return get_parameters(training_class)
+
+
+def _distance(cls: type[Training], columns: Columns) -> list[float]:
+    len_step = cls.LEN_STEP
+    m_in_km = cls.M_IN_KM
+    return [action * len_step / m_in_km for action in columns['action']]
+
+
+def _mean_speed(distance: list[float], columns: Columns) -> list[float]:
+    return [
+        distance_km / duration
+        for distance_km, duration in zip(distance, columns['duration'])
+    ]
+
+
+def _action_speed(cls: type[Training], columns: Columns) -> list[float]:
+    len_step = cls.LEN_STEP
+    m_in_km = cls.M_IN_KM
+    return [
+        action * len_step / m_in_km / duration
+        for action, duration in zip(columns['action'], columns['duration'])
+    ]
+
+
+def _running_calories(cls: type[Running],
+                      speed: Sequence[float],
+                      columns: Columns) -> list[float]:
+    multiplier = cls.CALORIES_MEAN_SPEED_MULTIPLIER
+    shift = cls.CALORIES_MEAN_SPEED_SHIFT
+    m_in_km = cls.M_IN_KM
+    h_in_m = cls.H_IN_M
+    return [
+        (multiplier * mean_speed + shift)
+        * weight
+        / m_in_km
+        * duration
+        * h_in_m
+        for mean_speed, weight, duration
+        in zip(speed, columns['weight'], columns['duration'])
+    ]
+
+
+def _running_kernel(cls: type[Running], columns: Columns) -> Metrics:
+    distance = _distance(cls, columns)
+    speed = _mean_speed(distance, columns)
+    return distance, speed, _running_calories(cls, speed, columns)
+
+
+def _sports_walking_calories(cls: type[SportsWalking],
+                             speed: Sequence[float],
+                             columns: Columns) -> list[float]:
+    multiplier_1 = cls.CALORIES_WEIGHT_MULTIPLIER_1
+    multiplier_2 = cls.CALORIES_WEIGHT_MULTIPLIER_2
+    degree = cls.CALORIES_MEAN_SPEAD_DEGREE
+    km_in_h_to_m_in_s = cls.KM_IN_H_TO_M_IN_S
+    cm_to_m = cls.CM_TO_M
+    h_in_m = cls.H_IN_M
+    return [
+        (
+            multiplier_1 * weight
+            + (
+                (mean_speed * km_in_h_to_m_in_s) ** degree
+                / height
+                * cm_to_m
+            )
+            * multiplier_2
+            * weight
+        )
+        * duration
+        * h_in_m
+        for mean_speed, weight, height, duration in zip(
+            speed, columns['weight'], columns['height'], columns['duration']
+        )
+    ]
+
+
+def _sports_walking_kernel(cls: type[SportsWalking],
+                           columns: Columns) -> Metrics:
+    distance = _distance(cls, columns)
+    speed = _mean_speed(distance, columns)
+    return distance, speed, _sports_walking_calories(cls, speed, columns)
+
+
+def _swimming_calories(cls: type[Swimming],
+                       speed: Sequence[float],
+                       columns: Columns) -> list[float]:
+    shift = cls.CALORIES_MEAN_SPEED_SHIFT
+    multiplier = cls.CALORIES_WEIGHT_MULTIPLIER
+    return [
+        (mean_speed + shift) * multiplier * weight * duration
+        for mean_speed, weight, duration
+        in zip(speed, columns['weight'], columns['duration'])
+    ]
+
+
+def _swimming_speed(cls: type[Swimming], columns: Columns) -> list[float]:
+    m_in_km = cls.M_IN_KM
+    return [
+        length_pool * count_pool / m_in_km / duration
+        for length_pool, count_pool, duration in zip(
+            columns['length_pool'],
+            columns['count_pool'],
+            columns['duration'],
+        )
+    ]
+
+
+def _swimming_kernel(cls: type[Swimming], columns: Columns) -> Metrics:
+    distance = _distance(cls, columns)
+    speed = _swimming_speed(cls, columns)
+    return distance, speed, _swimming_calories(cls, speed, columns)
+
+
+def _generic_calories(cls: type[Training],
+                      speed: Sequence[float],
+                      columns: Columns) -> list[float]:
+    return [
+        cls(*data).get_spent_calories()
+        for data in zip(*(columns[name] for name in get_columns(cls)))
+    ]
+
+
+def _generic_kernel(cls: type[Training], columns: Columns) -> Metrics:
+    distance = []
+    speed = []
+    calories = []
+    for data in zip(*(columns[name] for name in get_columns(cls))):
+        training = cls(*data)
+        distance.append(training.get_distance())
+        speed.append(training.get_mean_speed())
+        calories.append(training.get_spent_calories())
+    return distance, speed, calories
+
+
+def _generic_projection(cls: type[Training],
+                        columns: Columns,
+                        fields: Sequence[str]) -> Metrics:
+    result = {name: [] for name in fields}
+    getters = [
+        (result[name], LazyInfoMessage.LAZY_FIELDS[name]) for name in fields
+    ]
+    for data in zip(*(columns[name] for name in get_columns(cls))):
+        training = cls(*data)
+        for values, method in getters:
+            values.append(getattr(training, method)())
+    return tuple(result.get(name) for name in FIELDS)
+
+
+Kernel = Callable[[type[Training], Columns], Metrics]
+SpeedKernel = Callable[[type[Training], Columns], list[float]]
+CalorieKernel = Callable[
+    [type[Training], Sequence[float], Columns], list[float]
+]
+
+BATCH_KERNELS: dict[type[Training], Kernel] = {
+    Running: _running_kernel,
+    SportsWalking: _sports_walking_kernel,
+    Swimming: _swimming_kernel,
+}
+SPEED_KERNELS: dict[type[Training], SpeedKernel] = {
+    Running: _action_speed,
+    SportsWalking: _action_speed,
+    Swimming: _swimming_speed,
+}
+CALORIE_KERNELS: dict[type[Training], CalorieKernel] = {
+    Running: _running_calories,
+    SportsWalking: _sports_walking_calories,
+    Swimming: _swimming_calories,
+}
+
+
+def register_kernel(training_class: type[Training]
+                    ) -> Callable[[Kernel], Kernel]:
+    """Зарегистрировать пакетное ядро для класса тренировки."""
+    def decorator(kernel: Kernel) -> Kernel:
+        BATCH_KERNELS[training_class] = kernel
+        return kernel
+    return decorator
+
+
+def _kernel_class(training_class: type[Training],
+                  kernels: Mapping[type[Training], Callable]
+                  ) -> Optional[type[Training]]:
+    for cls in training_class.__mro__:
+        if cls in kernels:
+            if all(getattr(training_class, name) is getattr(cls, name)
+                   for name in METRICS):
+                return cls
+            return None
+    return None
+
+
+def get_kernel(training_class: type[Training]) -> Kernel:
+    """Найти пакетное ядро для класса тренировки.
+
+    Ядро предка подходит, если класс не переопределяет формулы;
+    иначе показатели считаются построчно методами класса.
+    """
+    cls = _kernel_class(training_class, BATCH_KERNELS)
+    return _generic_kernel if cls is None else BATCH_KERNELS[cls]
+
+
+def get_calorie_kernel(training_class: type[Training]) -> CalorieKernel:
+    """Найти ядро, пересчитывающее калории по готовой средней скорости.
+
+    Ядро предка подходит, если класс не переопределяет формулы;
+    иначе калории считаются построчно методами класса.
+    """
+    cls = _kernel_class(training_class, CALORIE_KERNELS)
+    return _generic_calories if cls is None else CALORIE_KERNELS[cls]
+
+
+def _project(training_class: type[Training],
+             columns: Columns,
+             fields: Sequence[str]) -> Metrics:
+    cls = _kernel_class(training_class, SPEED_KERNELS)
+    if cls is None:
+        kernel = get_kernel(training_class)
+        if kernel is _generic_kernel:
+            return _generic_projection(training_class, columns, fields)
+        metrics = kernel(training_class, columns)
+        return tuple(
+            values if name in fields else None
+            for name, values in zip(FIELDS, metrics)
+        )
+    distance = speed = calories = None
+    if 'distance' in fields:
+        distance = _distance(training_class, columns)
+    if 'speed' in fields or 'calories' in fields:
+        speed = SPEED_KERNELS[cls](training_class, columns)
+    if 'calories' in fields:
+        calories = get_calorie_kernel(training_class)(
+            training_class, speed, columns
+        )
+    if 'speed' not in fields:
+        speed = None
+    return distance, speed, calories
+
+
+def compute_columns(training_class: type[Training],
+                    columns: Columns,
+                    fields: Sequence[str] = FIELDS,
+                    precision: str = 'float64') -> BatchResult:
+    """Рассчитать показатели для столбцов данных одного вида тренировки.
+
+    `fields` — какие из показателей `FIELDS` считать; промежуточные
+    значения, не нужные для них, не вычисляются. `precision` — тип
+    столбцов результата из `PRECISIONS`.
+    """
+    typecode = PRECISIONS.get(precision)
+    if typecode is None:
+        raise ValueError(
+            f'Точность должна быть одной из: {", ".join(PRECISIONS)}.'
+        )
+    names = get_columns(training_class)
+    missing = [name for name in names if name not in columns]
+    if missing:
+        raise ValueError(f'Нет столбцов: {", ".join(missing)}.')
+    if len({len(columns[name]) for name in names}) > 1:
+        raise ValueError('Столбцы должны быть одной длины.')
+    unknown = [name for name in fields if name not in FIELDS]
+    if unknown:
+        raise ValueError(f'Неизвестные показатели: {", ".join(unknown)}.')
+    if len(set(fields)) == len(FIELDS):
+        metrics = get_kernel(training_class)(training_class, columns)
+    else:
+        metrics = _project(training_class, columns, fields)
+    return BatchResult(
+        training_class.__name__,
+        array(typecode, columns['duration']),
+        *(None if values is None else array(typecode, values)
+          for values in metrics),
+    )
+
+
+def compute_batch(workout_type: str,
+                  columns: Columns,
+                  fields: Sequence[str] = FIELDS,
+                  precision: str = 'float64') -> BatchResult:
+    """Рассчитать дистанцию, скорость и калории для столбцов данных."""
+    return compute_columns(load_workout(workout_type), columns, fields,
+                           precision)
+
+
+class TrainingBatch:
+    """Столбцовое хранилище тренировок одного вида.
+
+    `typecode` `'f'` хранит столбцы во float32 вдвое компактнее.
+    """
+
+    def __init__(self,
+                 training_class: type[Training],
+                 typecode: str = 'd') -> None:
+        self.training_class = training_class
+        self.columns: dict[str, array] = {
+            name: array(typecode) for name in get_columns(training_class)
+        }
+
+    @classmethod
+    def from_packages(cls,
+                      workout_type: str,
+                      packages: Iterable[Sequence[float]]
+                      ) -> 'TrainingBatch':
+        """Собрать хранилище из пакетов одного кода тренировки."""
+        training_batch = cls(load_workout(workout_type))
+        training_batch.extend(packages)
+        return training_batch
+
+    def append(self, *data: float) -> None:
+        """Добавить тренировку."""
+        if len(data) != len(self.columns):
+            raise TypeError(
+                f'{self.training_class.__name__} ожидает '
+                f'{len(self.columns)} значений, получено {len(data)}.'
+            )
+        for column, value in zip(self.columns.values(), data):
+            column.append(value)
+
+    def extend(self, packages: Iterable[Sequence[float]]) -> None:
+        """Добавить тренировки из пакетов."""
+        for data in packages:
+            self.append(*data)
+
+    def __len__(self) -> int:
+        return len(self.columns['action'])
+
+    def __getitem__(self, index: int) -> Training:
+        return self.training_class(
+            *(column[index] for column in self.columns.values())
+        )
+
+    def __iter__(self) -> Iterator[Training]:
+        for data in zip(*self.columns.values()):
+            yield self.training_class(*data)
+
+    def compute(self,
+                fields: Sequence[str] = FIELDS,
+                precision: str = 'float64') -> BatchResult:
+        """Рассчитать показатели всех тренировок."""
+        return compute_columns(self.training_class, self.columns, fields,
+                               precision)
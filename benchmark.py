@@ -0,0 +1,1081 @@
+"""Замеры производительности модуля фитнес-трекера.
+
+Запуск: `python benchmark.py [замеры] --sizes 1000 100000 --json out.json`.
+Сравнение: `python benchmark.py --compare base.json out.json`.
+"""
+import argparse
+import asyncio
+import io
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from bisect import bisect_left
+from concurrent.futures import ProcessPoolExecutor
+from collections import deque
+from contextlib import redirect_stdout
+from dataclasses import dataclass, field, make_dataclass
+from typing import Any, Callable, Iterator, Optional
+
+import homework
+
+from batch import (
+    FIELDS,
+    PRECISIONS,
+    SUMMATIONS,
+    TrainingBatch,
+    column_sum,
+    compute_batch,
+    get_columns,
+)
+from cache import ResultCache
+from columnar import ColumnarFile, write_packages
+from dedup import Deduplicator, RotatingBloom, stable_fingerprint
+from homework import (
+    METRICS,
+    WORKOUT_TYPES,
+    InfoMessage,
+    main as homework_main,
+    memoized,
+    read_package,
+)
+from ingest import (
+    iter_lines,
+    iter_packages,
+    process_files,
+    process_paths,
+    run_serial,
+)
+from instrument import Instrumentation
+from live import SessionManager
+from parallel import process_sharded
+from recompute import DerivedStore, Profile
+from render import render_many
+from service import TrackerService, load_test
+from shared import compute_parallel
+from sketches import QUANTILES, Histogram, KLLSketch, MetricSketches
+from sinks import GzipSink, JsonLinesSink, MemorySink, TextFileSink
+from store import TrainingStore
+from validate import compute_valid, read_checked
+
+BENCHMARKS: dict[str, Callable[[int], None]] = {}
+
+SIZES: tuple[int, ...] = (10 ** 3, 10 ** 4, 10 ** 5)
+THRESHOLD: float = 0.1
+LOWER: str = 'lower'
+HIGHER: str = 'higher'
+STARTUP_BUDGET_MS: float = 15.0
+DUPLICATE_RATE: float = 0.1
+
+PACKAGE_RANGES: dict[str, tuple[float, float]] = {
+    'action': (100, 20000),
+    'duration': (0.25, 3),
+    'weight': (40, 120),
+    'height': (150, 200),
+    'length_pool': (25, 50),
+    'count_pool': (1, 80),
+}
+
+
+def benchmark(name: str) -> Callable:
+    """Зарегистрировать замер под именем."""
+    def decorator(func: Callable[[int], None]) -> Callable[[int], None]:
+        BENCHMARKS[name] = func
+        return func
+    return decorator
+
+
+def make_package(rnd: random.Random, workout_type: str) -> list[float]:
+    """Сгенерировать данные одного пакета."""
+    data = []
+    for name in get_columns(WORKOUT_TYPES[workout_type]):
+        low, high = PACKAGE_RANGES[name]
+        if name == 'action':
+            data.append(rnd.randint(int(low), int(high)))
+        else:
+            data.append(round(rnd.uniform(low, high), 3))
+    return data
+
+
+def make_packages(workout_type: str,
+                  size: int,
+                  seed: int = 0) -> list[list[float]]:
+    """Сгенерировать воспроизводимый набор пакетов одного вида."""
+    rnd = random.Random(seed)
+    return [make_package(rnd, workout_type) for _ in range(size)]
+
+
+def to_columns(workout_type: str,
+               packages: list[list[float]]) -> dict[str, list[float]]:
+    """Разложить пакеты по столбцам."""
+    names = get_columns(WORKOUT_TYPES[workout_type])
+    return dict(zip(names, map(list, zip(*packages))))
+
+
+def iter_mixed_packages(size: int,
+                        seed: int = 0) -> Iterator[tuple[str, list[float]]]:
+    """Лениво сгенерировать пакеты всех видов вперемешку."""
+    rnd = random.Random(seed)
+    codes = list(WORKOUT_TYPES)
+    for _ in range(size):
+        workout_type = rnd.choice(codes)
+        yield workout_type, make_package(rnd, workout_type)
+
+
+@dataclass
+class Recorder:
+    """Результаты замеров текущего запуска."""
+
+    repeat: int = 1
+    benchmark: str = ''
+    results: list[dict[str, Any]] = field(default_factory=list)
+
+    def record(self,
+               name: str,
+               size: int,
+               value: float,
+               unit: str,
+               better: Optional[str] = LOWER) -> None:
+        """Сохранить значение и направление улучшения `better`.
+
+        `LOWER` — лучше меньше, `HIGHER` — больше, `None` — значение
+        справочное и при сравнении запусков не проверяется.
+        """
+        self.results.append({
+            'benchmark': self.benchmark,
+            'name': name,
+            'size': size,
+            'value': value,
+            'unit': unit,
+            'better': better,
+        })
+
+
+RECORDER = Recorder()
+
+
+def measure(func: Callable[..., object],
+            setup: Callable[[], object] = None) -> float:
+    """Замерить лучшее из `repeat` времён выполнения функции в секундах.
+
+    Если задана `setup`, её результат передаётся в `func`,
+    а время подготовки в замер не входит.
+    """
+    best = float('inf')
+    for _ in range(RECORDER.repeat):
+        args = () if setup is None else (setup(),)
+        start = time.perf_counter()
+        func(*args)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def report(name: str, size: int, seconds: float) -> None:
+    """Сохранить и вывести время замера."""
+    RECORDER.record(name, size, seconds, 's')
+    print(f'{name:<40} {size:>10} {seconds:>10.3f} с '
+          f'{size / seconds:>14,.0f} зап./с')
+
+
+def report_value(name: str,
+                 size: int,
+                 value: float,
+                 unit: str,
+                 better: Optional[str] = LOWER) -> None:
+    """Сохранить и вывести значение замера в единицах `unit`."""
+    RECORDER.record(name, size, value, unit, better)
+    print(f'{name:<40} {size:>10} {value:>10.3f} {unit}')
+
+
+@benchmark('batch')
+def bench_batch(size: int) -> None:
+    """Поштучный расчёт против пакетного по столбцам."""
+    for workout_type in WORKOUT_TYPES:
+        packages = make_packages(workout_type, size)
+        columns = to_columns(workout_type, packages)
+        scalar = measure(lambda: [
+            read_package(workout_type, data).show_training_info()
+            for data in packages
+        ])
+        vectorized = measure(lambda: compute_batch(workout_type, columns))
+        report(f'{workout_type} read_package', size, scalar)
+        report(f'{workout_type} compute_batch', size, vectorized)
+        report_value(f'{workout_type} ускорение', size,
+                     scalar / vectorized, 'x', better=HIGHER)
+
+
+class DictTraining:
+    """Тренировка с атрибутами в `__dict__`, как до `__slots__`."""
+
+    def __init__(self, names: tuple[str, ...], data: list[float]) -> None:
+        for name, value in zip(names, data):
+            setattr(self, name, value)
+
+
+DictInfoMessage = make_dataclass(
+    'DictInfoMessage',
+    ['training_type', 'duration', 'distance', 'speed', 'calories'],
+)
+
+
+def traced_bytes(build: Callable[[], object]) -> int:
+    """Получить объём памяти, занятый результатом `build`."""
+    tracemalloc.start()
+    try:
+        result = build()
+        used = tracemalloc.get_traced_memory()[0]
+    finally:
+        tracemalloc.stop()
+    del result
+    return used
+
+
+@benchmark('memory')
+def bench_memory(size: int) -> None:
+    """Байты на тренировку: `__dict__`, `__slots__` и столбцы."""
+    for workout_type, training_class in WORKOUT_TYPES.items():
+        names = get_columns(training_class)
+        layouts = {
+            '__dict__': lambda: [
+                DictTraining(names, data)
+                for data in make_packages(workout_type, size)
+            ],
+            '__slots__': lambda: [
+                training_class(*data)
+                for data in make_packages(workout_type, size)
+            ],
+            'TrainingBatch': lambda: TrainingBatch.from_packages(
+                workout_type, make_packages(workout_type, size)
+            ),
+        }
+        for layout, build in layouts.items():
+            per_session = traced_bytes(build) / size
+            report_value(f'{workout_type} {layout}', size, per_session, 'B')
+    row = ('Running', 1.0, 2.0, 3.0, 4.0)
+    for name, cls in (('InfoMessage __dict__', DictInfoMessage),
+                      ('InfoMessage __slots__', InfoMessage)):
+        per_message = traced_bytes(
+            lambda: [cls(*row) for _ in range(size)]
+        ) / size
+        report_value(name, size, per_message, 'B')
+
+
+def make_messages(size: int) -> list[InfoMessage]:
+    """Сгенерировать сообщения для всех видов тренировок."""
+    messages = []
+    for workout_type in WORKOUT_TYPES:
+        messages.extend(
+            read_package(workout_type, data).show_training_info()
+            for data in make_packages(workout_type, size // 3 + 1)
+        )
+    return messages[:size]
+
+
+@benchmark('render')
+def bench_render(size: int) -> None:
+    """Вывод сообщений: словарь + `format`, `get_message`, `render_many`."""
+    messages = make_messages(size)
+    names = InfoMessage.__slots__
+    report('dict + str.format', size, measure(lambda: '\n'.join(
+        message.INFO.format(**{name: getattr(message, name) for name in names})
+        for message in messages
+    )))
+    report('get_message', size, measure(lambda: '\n'.join(
+        message.get_message() for message in messages
+    )))
+    report('render_many', size, measure(
+        lambda: render_many(messages, io.StringIO())
+    ))
+
+
+def write_packages_file(size: int) -> str:
+    """Записать во временный CSV-файл пакеты всех видов тренировок."""
+    fd, path = tempfile.mkstemp(suffix='.csv')
+    with os.fdopen(fd, 'w', encoding='utf-8') as file:
+        for workout_type in WORKOUT_TYPES:
+            for data in make_packages(workout_type, size // 3 + 1):
+                file.write(','.join(map(str, [workout_type, *data])) + '\n')
+    return path
+
+
+@benchmark('scaling')
+def bench_scaling(size: int) -> None:
+    """Последовательный `main` против пула на 1, 2, 4 и 8 процессов."""
+    path = write_packages_file(size)
+    try:
+        outputs = {}
+
+        def run(workers: int) -> None:
+            outputs[workers] = out = io.StringIO()
+            with open(path, encoding='utf-8') as stream:
+                if not workers:
+                    with redirect_stdout(out):
+                        run_serial(stream)
+                else:
+                    process_sharded(stream, out, workers=workers)
+
+        report('serial main()', size, measure(lambda: run(0)))
+        for workers in (1, 2, 4, 8):
+            report(f'{workers} proc.', size, measure(lambda: run(workers)))
+            identical = outputs[workers].getvalue() == outputs[0].getvalue()
+            print(f'{workers} proc. вывод совпадает с main(): {identical}')
+    finally:
+        os.remove(path)
+
+
+@benchmark('service')
+def bench_service(size: int) -> None:
+    """Нагрузочный тест асинхронного сервиса на локальном TCP-порту."""
+    packages = [
+        (workout_type, data)
+        for workout_type in WORKOUT_TYPES
+        for data in make_packages(workout_type, size // 3 + 1)
+    ][:size]
+
+    async def run(concurrency: int) -> None:
+        tracker = TrackerService()
+        server = await tracker.start()
+        host, port = server.sockets[0].getsockname()[:2]
+        async with server:
+            result = await load_test(host, port, packages, concurrency)
+        tracker.worker.cancel()
+        report(f'{concurrency} conn.', size, result.seconds)
+        report_value(f'{concurrency} conn. p50', size, result.p50_ms, 'ms')
+        report_value(f'{concurrency} conn. p99', size, result.p99_ms, 'ms')
+
+    for concurrency in (1, 16, 64):
+        asyncio.run(run(concurrency))
+
+
+@benchmark('metrics')
+def bench_metrics(size: int) -> None:
+    """`show_training_info` обычных и запоминающих классов."""
+    for workout_type, training_class in WORKOUT_TYPES.items():
+        packages = make_packages(workout_type, size)
+        for name, cls in (('plain', training_class),
+                          ('memoized', memoized(training_class))):
+            trainings = [cls(*data) for data in packages]
+            report(f'{workout_type} {name} show_training_info', size, measure(
+                lambda: [
+                    training.show_training_info() for training in trainings
+                ]
+            ))
+            report(f'{workout_type} {name} повторное чтение', size, measure(
+                lambda: [
+                    training.get_spent_calories() for training in trainings
+                ]
+            ))
+
+
+def make_zipf_packages(size: int,
+                       distinct: int = 10000,
+                       exponent: float = 1.1,
+                       seed: int = 0) -> list[tuple[str, list[float]]]:
+    """Сгенерировать поток пакетов с распределением повторов по Ципфу."""
+    pool = [
+        (workout_type, data)
+        for workout_type in WORKOUT_TYPES
+        for data in make_packages(workout_type, distinct // 3 + 1, seed)
+    ]
+    weights = [1 / rank ** exponent for rank in range(1, len(pool) + 1)]
+    return random.Random(seed).choices(pool, weights, k=size)
+
+
+@benchmark('cache')
+def bench_cache(size: int) -> None:
+    """LRU-кэш результатов на потоке с распределением Ципфа."""
+    packages = make_zipf_packages(size)
+    report('без кэша', size, measure(lambda: [
+        read_package(workout_type, data).show_training_info()
+        for workout_type, data in packages
+    ]))
+    for maxsize in (256, 4096):
+        caches = []
+
+        def run() -> None:
+            caches.append(ResultCache(maxsize))
+            for workout_type, data in packages:
+                caches[-1].get_info(workout_type, data)
+
+        report(f'ResultCache({maxsize})', size, measure(run))
+        print(caches[-1].stats())
+
+
+@benchmark('construction')
+def bench_construction(size: int) -> None:
+    """Создание тренировок: конструктор класса и `read_package`."""
+    for workout_type, training_class in WORKOUT_TYPES.items():
+        packages = make_packages(workout_type, size)
+        report(f'{workout_type} {training_class.__name__}()', size, measure(
+            lambda: [training_class(*data) for data in packages]
+        ))
+        report(f'{workout_type} read_package', size, measure(
+            lambda: [read_package(workout_type, data) for data in packages]
+        ))
+
+
+@benchmark('methods')
+def bench_methods(size: int) -> None:
+    """Каждый метод `get_*` и `show_training_info` каждого вида."""
+    for workout_type, training_class in WORKOUT_TYPES.items():
+        trainings = [
+            training_class(*data)
+            for data in make_packages(workout_type, size)
+        ]
+        for method in (*METRICS, 'show_training_info'):
+            report(f'{training_class.__name__}.{method}', size, measure(
+                lambda: [getattr(training, method)() for training in trainings]
+            ))
+
+
+@benchmark('main')
+def bench_main(size: int) -> None:
+    """Сквозной путь `read_package` → `main` с выводом в /dev/null."""
+    def run() -> None:
+        with open(os.devnull, 'w', encoding='utf-8') as devnull:
+            with redirect_stdout(devnull):
+                for workout_type, data in iter_mixed_packages(size):
+                    homework_main(read_package(workout_type, data))
+
+    report('read_package + main', size, measure(run))
+
+
+@benchmark('columnar')
+def bench_columnar(size: int) -> None:
+    """Расчёт из CSV против столбцового файла через mmap.
+
+    CSV на 1 ГБ — это около 3·10^7 пакетов (`--sizes 30000000`).
+    """
+    rnd = random.Random(0)
+    with tempfile.TemporaryDirectory() as directory:
+        for workout_type in WORKOUT_TYPES:
+            bench_columnar_type(directory, rnd, workout_type, size)
+
+
+def bench_columnar_type(directory: str,
+                        rnd: random.Random,
+                        workout_type: str,
+                        size: int) -> None:
+    """Замер столбцового формата для одного вида тренировки."""
+    csv_path = os.path.join(directory, f'{workout_type}.csv')
+    binary_path = os.path.join(directory, f'{workout_type}.hwtc')
+    with open(csv_path, 'w', encoding='utf-8') as file:
+        for _ in range(size):
+            data = make_package(rnd, workout_type)
+            file.write(','.join(map(str, [workout_type, *data])) + '\n')
+    with open(csv_path, encoding='utf-8') as file:
+        write_packages(binary_path, workout_type, (
+            data for _, data in iter_packages(iter_lines(file))
+        ))
+
+    def from_csv() -> None:
+        with open(csv_path, encoding='utf-8') as file:
+            training_batch = TrainingBatch(WORKOUT_TYPES[workout_type])
+            training_batch.extend(
+                data for _, data in iter_packages(iter_lines(file))
+            )
+            training_batch.compute()
+
+    def from_binary() -> None:
+        with ColumnarFile(binary_path) as file:
+            file.compute()
+
+    def random_access() -> None:
+        with ColumnarFile(binary_path) as file:
+            for index in indices:
+                file.read_package(index).get_spent_calories()
+
+    indices = [rnd.randrange(size) for _ in range(min(size, 10000))]
+    report(f'{workout_type} CSV → compute', size, measure(from_csv))
+    report(f'{workout_type} mmap → compute', size, measure(from_binary))
+    report(f'{workout_type} mmap random access', len(indices),
+           measure(random_access))
+    for name, path in (('CSV', csv_path), ('binary', binary_path)):
+        report_value(f'{workout_type} {name} file', size,
+                     os.path.getsize(path), 'B')
+
+
+@benchmark('instrument')
+def bench_instrument(size: int) -> None:
+    """Сквозной `main` без замеров, после их выключения и с замерами."""
+    packages = list(iter_mixed_packages(size))
+
+    def run() -> None:
+        with open(os.devnull, 'w', encoding='utf-8') as devnull:
+            with redirect_stdout(devnull):
+                for workout_type, data in packages:
+                    homework_main(homework.read_package(workout_type, data))
+
+    report('без замеров', size, measure(run))
+    instrumentation = Instrumentation()
+    with instrumentation:
+        pass
+    report('после enable/disable', size, measure(run))
+    with instrumentation:
+        report('с замерами', size, measure(run))
+
+
+@benchmark('sinks')
+def bench_sinks(size: int) -> None:
+    """`print` на каждую строку против буферизованных приёмников."""
+    messages = make_messages(size)
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, 'out')
+
+        def with_print() -> None:
+            with open(path, 'w', encoding='utf-8') as file:
+                with redirect_stdout(file):
+                    for info in messages:
+                        print(info)
+
+        def with_sink(sink_class: type) -> Callable[[], None]:
+            def run() -> None:
+                with sink_class(path) as sink:
+                    for info in messages:
+                        sink.write(info)
+            return run
+
+        report('print', size, measure(with_print))
+        for sink_class in (TextFileSink, GzipSink, JsonLinesSink):
+            report(sink_class.__name__, size,
+                   measure(with_sink(sink_class)))
+    report('MemorySink', size, measure(
+        lambda: MemorySink().write_many(messages)
+    ))
+
+
+@benchmark('validate')
+def bench_validate(size: int) -> None:
+    """Расчёт допустимых пакетов без проверки и с проверкой."""
+    packages = list(iter_mixed_packages(size))
+
+    def unchecked() -> None:
+        for workout_type, data in packages:
+            read_package(workout_type, data).show_training_info()
+
+    def checked() -> None:
+        for workout_type, data in packages:
+            read_checked(workout_type, data).show_training_info()
+
+    report('read_package', size, measure(unchecked))
+    report('read_checked', size, measure(checked))
+    for workout_type in WORKOUT_TYPES:
+        columns = to_columns(workout_type,
+                             make_packages(workout_type, size))
+        report(f'{workout_type} compute_batch', size,
+               measure(lambda: compute_batch(workout_type, columns)))
+        report(f'{workout_type} compute_valid', size,
+               measure(lambda: compute_valid(workout_type, columns)))
+
+
+@benchmark('files')
+def bench_files(size: int) -> None:
+    """Чтение множества мелких файлов подряд и в пуле потоков."""
+    packages = list(iter_mixed_packages(size))
+    per_file = 100
+    with tempfile.TemporaryDirectory() as directory:
+        paths = []
+        for start in range(0, len(packages), per_file):
+            path = os.path.join(directory, f'{start}.csv')
+            with open(path, 'w', encoding='utf-8') as file:
+                for workout_type, data in packages[start:start + per_file]:
+                    file.write(','.join(map(str, [workout_type, *data]))
+                               + '\n')
+            paths.append(path)
+        report('serial', size, measure(
+            lambda: sum(1 for _ in process_paths(paths))
+        ))
+        for workers in (2, 4, 8):
+            report(f'{workers} threads', size, measure(
+                lambda: sum(1 for _ in process_files(paths, workers=workers))
+            ))
+        report('8 threads, unordered', size, measure(
+            lambda: sum(1 for _ in process_files(paths, workers=8,
+                                                 ordered=False))
+        ))
+
+
+@benchmark('recompute')
+def bench_recompute(size: int) -> None:
+    """Полный перерасчёт против пересчёта калорий по новому профилю."""
+    retuned = Profile('retuned', {
+        'RUN': {'CALORIES_MEAN_SPEED_MULTIPLIER': 18.5},
+        'WLK': {'CALORIES_WEIGHT_MULTIPLIER_1': 0.036},
+        'SWM': {'CALORIES_MEAN_SPEED_SHIFT': 1.2},
+    })
+    with tempfile.TemporaryDirectory() as directory:
+        store = DerivedStore(directory)
+        for workout_type in WORKOUT_TYPES:
+            columns = to_columns(workout_type,
+                                 make_packages(workout_type, size))
+            store.build(workout_type, columns, Profile('base'))
+            report(f'{workout_type} полный перерасчёт', size, measure(
+                lambda: store.build(workout_type, columns, retuned)
+            ))
+            report(f'{workout_type} только калории', size, measure(
+                lambda: store.recompute(workout_type, retuned)
+            ))
+
+
+@benchmark('lazy')
+def bench_lazy(size: int) -> None:
+    """Обычное и ленивое сообщение при выборочном доступе к полям."""
+    trainings = [
+        read_package(workout_type, data)
+        for workout_type, data in iter_mixed_packages(size)
+    ]
+    patterns = {
+        'training_type': lambda info: info.training_type,
+        'calories': lambda info: info.calories,
+        'все поля': lambda info: (info.training_type, info.duration,
+                                  info.distance, info.speed, info.calories),
+        'get_message': lambda info: info.get_message(),
+    }
+    for pattern, access in patterns.items():
+        report(f'eager {pattern}', size, measure(lambda: [
+            access(training.show_training_info()) for training in trainings
+        ]))
+        report(f'lazy {pattern}', size, measure(lambda: [
+            access(training.lazy_training_info()) for training in trainings
+        ]))
+    for workout_type in WORKOUT_TYPES:
+        columns = to_columns(workout_type,
+                             make_packages(workout_type, size))
+        for fields in (FIELDS, ('calories',), ('distance',)):
+            report(f'{workout_type} compute_batch {",".join(fields)}', size,
+                   measure(lambda: compute_batch(workout_type, columns,
+                                                 fields)))
+
+
+@benchmark('store')
+def bench_store(size: int) -> None:
+    """Загрузка в SQLite и запросы итогов по индексам."""
+    users = max(size // 1000, 1)
+
+    def rows() -> Iterator[tuple[str, float, str, list[float]]]:
+        for index, (workout_type, data) in enumerate(
+            iter_mixed_packages(size)
+        ):
+            yield f'user{index % users}', index * 60.0, workout_type, data
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, 'trainings.db')
+
+        def load(indexes_first: bool) -> None:
+            for suffix in ('', '-wal', '-shm'):
+                if os.path.exists(path + suffix):
+                    os.remove(path + suffix)
+            with TrainingStore(path, indexes=indexes_first) as store:
+                store.add_many(rows())
+                store.create_indexes()
+
+        report('генерация пакетов (входит в загрузку)', size, measure(
+            lambda: sum(1 for _ in rows())
+        ))
+        report('add_many, индексы после загрузки', size,
+               measure(lambda: load(False)))
+        report('add_many с индексами', size, measure(lambda: load(True)))
+        with TrainingStore(path) as store:
+            middle = size * 30.0
+            report('calories_by_type', size,
+                   measure(store.calories_by_type))
+            report('calories_by_type за сутки', size, measure(
+                lambda: store.calories_by_type(start=middle,
+                                               end=middle + 24 * 60 * 60)
+            ))
+            report('totals_by_type пользователя', size, measure(
+                lambda: store.totals_by_type(user='user1')
+            ))
+            report('top_distances(10)', size, measure(
+                lambda: store.top_distances(10)
+            ))
+            report('top_distances(10) по виду', size, measure(
+                lambda: store.top_distances(10, training_type='Running')
+            ))
+
+
+@benchmark('live')
+def bench_live(size: int) -> None:
+    """Обновления потоковых сессий против пересоздания тренировки."""
+    sessions = 1000
+    rnd = random.Random(0)
+    updates = [
+        (index % sessions, 1.0, rnd.randint(0, 4), 0)
+        for index in range(size)
+    ]
+
+    def start() -> SessionManager:
+        manager = SessionManager()
+        for session_id in range(sessions):
+            manager.start(session_id, 'RUN', weight=75)
+        return manager
+
+    def rebuild() -> None:
+        totals = [[0, 0.0] for _ in range(sessions)]
+        for session_id, seconds, action, _ in updates:
+            total = totals[session_id]
+            total[0] += action
+            total[1] += seconds / 3600
+            read_package('RUN', [*total, 75]).show_training_info()
+
+    def update_only(manager: SessionManager) -> None:
+        manager.update_many(updates)
+
+    def update_and_read(manager: SessionManager) -> None:
+        for session_id, seconds, action, count_pool in updates:
+            manager.update(session_id, seconds, action, count_pool)
+            manager.info(session_id)
+
+    report('пересоздание Running на каждом тике', size, measure(rebuild))
+    report(f'SessionManager.update_many, {sessions} сессий', size,
+           measure(update_only, start))
+    report('SessionManager.update + info', size,
+           measure(update_and_read, start))
+
+
+def compute_messages(workout_type: str,
+                     packages: list[list[float]]) -> list[InfoMessage]:
+    """Рассчитать пакеты в процессе пула и вернуть сообщения."""
+    return [
+        read_package(workout_type, data).show_training_info()
+        for data in packages
+    ]
+
+
+@benchmark('shared')
+def bench_shared(size: int) -> None:
+    """Пул процессов: общая память против передачи объектов через pickle."""
+    workers = min(os.cpu_count() or 1, 4)
+    with ProcessPoolExecutor(workers) as executor:
+        executor.submit(int).result()
+        for workout_type in WORKOUT_TYPES:
+            packages = make_packages(workout_type, size)
+            columns = to_columns(workout_type, packages)
+            chunk = max(-(-size // workers), 1)
+            chunks = [
+                packages[start:start + chunk]
+                for start in range(0, size, chunk)
+            ]
+            report(f'{workout_type} compute_batch, 1 процесс', size,
+                   measure(lambda: compute_batch(workout_type, columns)))
+            report(f'{workout_type} pickle пакетов и сообщений, '
+                   f'{workers} пр.', size,
+                   measure(lambda: [
+                       info for infos in executor.map(
+                           compute_messages, [workout_type] * len(chunks),
+                           chunks,
+                       ) for info in infos
+                   ]))
+            report(f'{workout_type} shared_memory, {workers} пр.', size,
+                   measure(lambda: compute_parallel(workout_type, columns,
+                                                    workers,
+                                                    executor=executor)))
+
+
+@benchmark('precision')
+def bench_precision(size: int) -> None:
+    """Память и скорость режимов float64/float32 и способов суммирования."""
+    for workout_type in WORKOUT_TYPES:
+        packages = make_packages(workout_type, size)
+        for precision, typecode in PRECISIONS.items():
+            training_batch = TrainingBatch(WORKOUT_TYPES[workout_type],
+                                           typecode)
+            training_batch.extend(packages)
+            report(f'{workout_type} compute {precision}', size, measure(
+                lambda: training_batch.compute(precision=precision)
+            ))
+            result = training_batch.compute(precision=precision)
+            stored = sum(
+                len(column) * column.itemsize
+                for column in (*training_batch.columns.values(),
+                               result.duration, result.distance,
+                               result.speed, result.calories)
+            )
+            report_value(f'{workout_type} {precision} столбцы', size,
+                         stored / 2 ** 20, 'МБ')
+    calories = compute_batch('WLK', to_columns(
+        'WLK', make_packages('WLK', size)
+    )).calories
+    exact = column_sum(calories, 'exact')
+    for summation in SUMMATIONS:
+        report(f'сумма калорий {summation}', size,
+               measure(lambda: column_sum(calories, summation)))
+        report_value(f'сумма калорий {summation}, отн. ошибка', size,
+                     abs(column_sum(calories, summation) - exact) / exact
+                     * 1e15, '1e-15')
+
+
+def iter_replayed_rows(size: int,
+                       duplicate_rate: float = DUPLICATE_RATE,
+                       seed: int = 0
+                       ) -> Iterator[tuple[str, float, str, list[float]]]:
+    """Лениво сгенерировать строки устройств с долей повторов."""
+    rnd = random.Random(seed)
+    packages = list(iter_mixed_packages(1000, seed))
+    recent: deque = deque(maxlen=1000)
+    for index in range(size):
+        if recent and rnd.random() < duplicate_rate:
+            yield recent[rnd.randrange(len(recent))]
+            continue
+        workout_type, data = packages[index % len(packages)]
+        row = (f'device{index % 10000}', index * 0.036, workout_type, data)
+        recent.append(row)
+        yield row
+
+
+@benchmark('dedup')
+def bench_dedup(size: int) -> None:
+    """Отсев повторов: множество с окном, BLAKE2b и фильтр Блума."""
+    def run(deduplicator: Deduplicator, count: int = size) -> Deduplicator:
+        for _ in deduplicator.filter(iter_replayed_rows(count)):
+            pass
+        return deduplicator
+
+    report('генерация строк (входит в замеры)', size, measure(
+        lambda: sum(1 for _ in iter_replayed_rows(size))
+    ))
+    variants = {
+        'окно 1 ч, hash': lambda: Deduplicator(),
+        'окно 1 ч, blake2b': lambda: Deduplicator(key=stable_fingerprint),
+        'окно 1 ч + Блум 24 ч': lambda: Deduplicator(
+            bloom=RotatingBloom(24 * 60 * 60, 1_200_000)
+        ),
+    }
+    for name, make in variants.items():
+        report(f'Deduplicator {name}', size, measure(lambda: run(make())))
+        deduplicator = run(make())
+        report_value(f'{name}: доля повторов', size,
+                     deduplicator.stats.rate * 100, '%', better=None)
+        report_value(f'{name}: ключей в индексе', size,
+                     len(deduplicator), 'шт.', better=None)
+    sample = min(size, 100000)
+    keys = len(run(Deduplicator(), sample))
+    report_value('память индекса на ключ', sample, traced_bytes(
+        lambda: run(Deduplicator(), sample)
+    ) / keys, 'байт')
+    bloom = RotatingBloom(24 * 60 * 60, 1_200_000)
+    report_value('память фильтра Блума 24 ч', size, bloom.nbytes / 2 ** 20,
+                 'МБ')
+
+
+@benchmark('sketches')
+def bench_sketches(size: int) -> None:
+    """Квантили скетчами против точных квантилей по отсортированным данным."""
+    columns = to_columns('RUN', make_packages('RUN', size))
+    calories = compute_batch('RUN', columns).calories.tolist()
+    messages = make_messages(size)
+
+    def exact() -> list[float]:
+        ordered = sorted(calories)
+        return [ordered[min(int(q * size), size - 1)] for q in QUANTILES]
+
+    def fill(sketch: KLLSketch) -> KLLSketch:
+        for value in calories:
+            sketch.update(value)
+        return sketch
+
+    def fill_many(sketch: Any) -> Any:
+        sketch.update_many(calories)
+        return sketch
+
+    def add_messages() -> None:
+        metrics = MetricSketches()
+        for info in messages:
+            metrics.add(info)
+
+    report('точные квантили: sorted', size, measure(exact))
+    report('MetricSketches.add, 2 показателя', size, measure(add_messages))
+    ordered = sorted(calories)
+    for k in (100, 200, 400):
+        report(f'KLL k={k} update', size, measure(lambda: fill(KLLSketch(k))))
+        report(f'KLL k={k} update_many', size,
+               measure(lambda: fill_many(KLLSketch(k))))
+        sketch = fill_many(KLLSketch(k, seed=0))
+        error = max(
+            abs(bisect_left(ordered, sketch.quantile(q)) / size - q)
+            for q in QUANTILES
+        )
+        report_value(f'KLL k={k} ошибка ранга p50/p90/p99', size,
+                     error, 'доля')
+        report_value(f'KLL k={k} размер', size,
+                     len(sketch.to_bytes()), 'байт')
+    low, high = min(calories), max(calories)
+    report('Histogram 200 корзин update_many', size, measure(
+        lambda: fill_many(Histogram.linear(low, high, 200))
+    ))
+    histogram = fill_many(Histogram.linear(low, high, 200))
+    report_value('Histogram ошибка ранга p50/p90/p99', size, max(
+        abs(bisect_left(ordered, histogram.quantile(q)) / size - q)
+        for q in QUANTILES
+    ), 'доля')
+
+
+def startup_env(cache: str) -> dict[str, str]:
+    """Окружение подпроцесса с кэшем байт-кода в каталоге `cache`."""
+    env = {**os.environ, 'PYTHONPYCACHEPREFIX': cache}
+    env.pop('PYTHONDONTWRITEBYTECODE', None)
+    return env
+
+
+def import_time_ms(module: str, env: dict[str, str]) -> float:
+    """Получить суммарное время импорта модуля по `-X importtime`."""
+    completed = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', f'import {module}'],
+        env=env, capture_output=True, text=True, check=True,
+        cwd=os.path.dirname(os.path.abspath(__file__)),
+    )
+    for line in completed.stderr.splitlines():
+        *_, cumulative, name = line.split('|')
+        if name.strip() == module:
+            return int(cumulative) / 1000
+    raise ValueError(f'Модуль {module} не найден в выводе importtime.')
+
+
+@benchmark('startup')
+def bench_startup(size: int) -> None:
+    """Время импорта и запуска `python -m cli` в отдельном процессе."""
+    packages = ''.join(
+        f'{workout_type},{",".join(map(str, data))}\n'
+        for workout_type, data in iter_mixed_packages(size)
+    )
+    with tempfile.TemporaryDirectory() as cache:
+        env = startup_env(cache)
+        import_time_ms('cli', env)
+        for module in ('homework', 'cli'):
+            best = min(
+                import_time_ms(module, env) for _ in range(RECORDER.repeat)
+            )
+            report_value(f'import {module}', size, best, 'ms')
+
+        def run_cli() -> None:
+            subprocess.run(
+                [sys.executable, '-m', 'cli'], input=packages, env=env,
+                stdout=subprocess.DEVNULL, text=True, check=True,
+                cwd=os.path.dirname(os.path.abspath(__file__)),
+            )
+
+        report('python -m cli, stdin', size, measure(run_cli))
+
+
+def over_budget(results: dict[str, Any],
+                budget: float = STARTUP_BUDGET_MS) -> list[dict[str, Any]]:
+    """Найти замеры импорта `cli`, превысившие бюджет в миллисекундах."""
+    return [
+        result for result in results['results']
+        if result['benchmark'] == 'startup'
+        and result['name'] == 'import cli' and result['value'] > budget
+    ]
+
+
+def run_benchmarks(names: list[str],
+                   sizes: list[int],
+                   repeat: int = 1) -> dict[str, Any]:
+    """Выполнить замеры и вернуть результаты с описанием окружения."""
+    RECORDER.repeat = repeat
+    RECORDER.results.clear()
+    for name in names:
+        RECORDER.benchmark = name
+        for size in sizes:
+            summary = BENCHMARKS[name].__doc__.splitlines()[0]
+            print(f'== {name} ({size}): {summary}')
+            BENCHMARKS[name](size)
+    return {
+        'meta': {
+            'python': sys.version,
+            'implementation': platform.python_implementation(),
+            'platform': platform.platform(),
+            'created': time.strftime('%Y-%m-%dT%H:%M:%S'),
+            'repeat': repeat,
+        },
+        'results': list(RECORDER.results),
+    }
+
+
+def compare(baseline: dict[str, Any],
+            current: dict[str, Any],
+            threshold: float = THRESHOLD) -> list[dict[str, Any]]:
+    """Найти замеры, ухудшившиеся больше чем на `threshold`.
+
+    Ухудшение считается по направлению `better` замера: рост значения
+    для `LOWER`, падение для `HIGHER`; справочные значения пропускаются.
+    Результаты без поля `better` считаются временами (`LOWER`).
+    """
+    def key(result: dict[str, Any]) -> tuple:
+        return result['benchmark'], result['name'], result['size']
+
+    base = {key(result): result for result in baseline['results']}
+    regressions = []
+    for result in current['results']:
+        old = base.get(key(result))
+        better = result.get('better', LOWER)
+        if (old is None or better is None
+                or old['unit'] != result['unit']
+                or old.get('better', LOWER) != better or not old['value']):
+            continue
+        change = (result['value'] - old['value']) / old['value']
+        if better == HIGHER:
+            change = -change
+        if change > threshold:
+            regressions.append({**result, 'baseline': old['value'],
+                                'change': change})
+    return regressions
+
+
+def load_results(path: str) -> dict[str, Any]:
+    """Прочитать результаты замеров из JSON-файла."""
+    with open(path, encoding='utf-8') as file:
+        return json.load(file)
+
+
+def main(argv: list[str] = None) -> int:
+    """Запустить выбранные замеры или сравнить два запуска."""
+    parser = argparse.ArgumentParser(
+        description=__doc__,
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+    )
+    parser.add_argument('names', nargs='*', metavar='name',
+                        help=', '.join(BENCHMARKS))
+    parser.add_argument('--sizes', '--size', nargs='+', type=int,
+                        default=list(SIZES))
+    parser.add_argument('--repeat', type=int, default=1)
+    parser.add_argument('--json', metavar='PATH',
+                        help='сохранить результаты в JSON')
+    parser.add_argument('--compare', nargs=2, metavar=('BASE', 'NEW'),
+                        help='сравнить два JSON-файла с результатами')
+    parser.add_argument('--threshold', type=float, default=THRESHOLD,
+                        help='допустимое ухудшение, доля (0.1 = 10%%)')
+    parser.add_argument('--startup-budget', type=float,
+                        default=STARTUP_BUDGET_MS, metavar='MS',
+                        help='бюджет импорта cli для замера startup, мс')
+    args = parser.parse_args(argv)
+    if args.compare:
+        baseline, current = map(load_results, args.compare)
+        regressions = compare(baseline, current, args.threshold)
+        for item in regressions:
+            print(f'{item["benchmark"]}: {item["name"]} ({item["size"]}) '
+                  f'{item["baseline"]:.4g} → {item["value"]:.4g} '
+                  f'{item["unit"]} (+{item["change"]:.0%})')
+        print(f'Ухудшений больше {args.threshold:.0%}: {len(regressions)}.')
+        return 1 if regressions else 0
+    unknown = set(args.names) - set(BENCHMARKS)
+    if unknown:
+        parser.error(f'неизвестные замеры: {", ".join(sorted(unknown))}')
+    results = run_benchmarks(args.names or list(BENCHMARKS), args.sizes,
+                             args.repeat)
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as file:
+            json.dump(results, file, ensure_ascii=False, indent=2)
+    exceeded = over_budget(results, args.startup_budget)
+    for item in exceeded:
+        print(f'Импорт cli ({item["size"]}): {item["value"]:.1f} мс, '
+              f'бюджет {args.startup_budget:.1f} мс.')
+    return 1 if exceeded else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
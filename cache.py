@@ -0,0 +1,82 @@
+"""Кэш результатов для повторяющихся пакетов."""
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Hashable, Sequence
+
+from homework import InfoMessage, read_package
+
+MAXSIZE: int = 4096
+
+
+@dataclass
+class CacheStats:
+    """Счётчики кэша результатов."""
+
+    hits: int
+    misses: int
+    evictions: int
+    size: int
+    maxsize: int
+
+    @property
+    def hit_rate(self) -> float:
+        """Доля попаданий в кэш."""
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+
+class ResultCache:
+    """Потокобезопасный LRU-кэш сообщений о тренировках.
+
+    Ключ — код тренировки, данные пакета и типы значений, поэтому
+    `[1, 1, 1]`, `[1.0, 1, 1]` и `[True, 1, 1]` не смешиваются.
+    Сообщения из кэша общие для всех вызовов, изменять их нельзя.
+    """
+
+    def __init__(self, maxsize: int = MAXSIZE) -> None:
+        if maxsize < 1:
+            raise ValueError('Размер кэша должен быть положительным.')
+        self.maxsize = maxsize
+        self._messages: OrderedDict[Hashable, InfoMessage] = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get_info(self,
+                 workout_type: str,
+                 data: Sequence[float]) -> InfoMessage:
+        """Получить сообщение о тренировке, рассчитав его при промахе."""
+        data = tuple(data)
+        key = (workout_type, data, tuple(map(type, data)))
+        with self._lock:
+            info = self._messages.get(key)
+            if info is not None:
+                self._messages.move_to_end(key)
+                self.hits += 1
+                return info
+            self.misses += 1
+        info = read_package(workout_type, data).show_training_info()
+        with self._lock:
+            self._messages[key] = info
+            self._messages.move_to_end(key)
+            if len(self._messages) > self.maxsize:
+                self._messages.popitem(last=False)
+                self.evictions += 1
+        return info
+
+    def stats(self) -> CacheStats:
+        """Получить счётчики кэша."""
+        with self._lock:
+            return CacheStats(self.hits, self.misses, self.evictions,
+                              len(self._messages), self.maxsize)
+
+    def clear(self) -> None:
+        """Очистить кэш и счётчики."""
+        with self._lock:
+            self._messages.clear()
+            self.hits = self.misses = self.evictions = 0
+
+    def __len__(self) -> int:
+        return len(self._messages)
@@ -0,0 +1,134 @@
+"""Командная строка фитнес-трекера: `python -m cli`.
+
+Пакеты передаются аргументами `-p RUN,15000,1,75` или читаются
+из файлов и stdin (`-`). Модули проверки, приёмников и разбора JSON
+загружаются, только когда они нужны, а argparse — только в `main`,
+поэтому запуск на несколько пакетов почти не тратит время на импорт.
+"""
+from __future__ import annotations
+
+import sys
+
+import homework
+from parsing import parse_csv_line
+
+TYPE_CHECKING = False
+if TYPE_CHECKING:
+    from typing import Any, Iterable, Iterator, TextIO
+
+FORMATS: tuple[str, ...] = ('csv', 'jsonl')
+OUTPUT_FORMATS: tuple[str, ...] = ('text', 'jsonl')
+
+
+def parse_package(line: str, fmt: str = 'csv') -> tuple[Any, Any]:
+    """Разобрать строку пакета в формате `csv` или `jsonl`."""
+    if fmt == 'jsonl':
+        from ingest import parse_json_line
+
+        return parse_json_line(line)
+    return parse_csv_line(line)
+
+
+def iter_lines(paths: Iterable[str]) -> Iterator[str]:
+    """Перебрать непустые строки файлов; `-` означает stdin."""
+    for path in paths:
+        stream: TextIO = (
+            sys.stdin if path == '-' else open(path, encoding='utf-8')
+        )
+        try:
+            for line in stream:
+                line = line.strip()
+                if line and not line.startswith('#'):
+                    yield line
+        finally:
+            if stream is not sys.stdin:
+                stream.close()
+
+
+def describe_error(workout_type: Any, data: Any, error: Exception) -> str:
+    """Получить понятный текст ошибки расчёта пакета."""
+    if isinstance(error, ValueError):
+        return str(error)
+    from validate import check_package
+
+    rejection = check_package(workout_type, data)
+    return str(error) if rejection is None else rejection.detail
+
+
+def open_sink(path: str, output_format: str) -> Any:
+    """Открыть приёмник сообщений для файла."""
+    from sinks import JsonLinesSink, TextFileSink
+
+    if output_format == 'jsonl':
+        return JsonLinesSink(path)
+    return TextFileSink(path)
+
+
+def run(lines: Iterable[str],
+        fmt: str = 'csv',
+        sink: Any = None,
+        strict: bool = False,
+        errors: TextIO = None) -> int:
+    """Рассчитать пакеты и вернуть число отклонённых.
+
+    С `strict=True` каждый пакет проверяется модулем validate,
+    иначе проверка загружается только после первой ошибки расчёта.
+    """
+    if errors is None:
+        errors = sys.stderr
+    check_package = None
+    if strict:
+        from validate import check_package
+    failed = 0
+    for line in lines:
+        try:
+            workout_type, data = parse_package(line, fmt)
+        except (ValueError, TypeError, KeyError):
+            print(f'Не удалось разобрать пакет: {line}', file=errors)
+            failed += 1
+            continue
+        try:
+            if check_package is not None:
+                rejection = check_package(workout_type, data)
+                if rejection is not None:
+                    raise ValueError(rejection.detail)
+            training = homework.read_package(workout_type, data)
+            homework.main(training, sink)
+        except (ValueError, TypeError, ArithmeticError) as error:
+            print(describe_error(workout_type, data, error), file=errors)
+            failed += 1
+    return failed
+
+
+def main(argv: list[str] = None) -> int:
+    """Обработать пакеты из аргументов, файлов или stdin."""
+    import argparse
+
+    parser = argparse.ArgumentParser(prog='python -m cli',
+                                     description=__doc__)
+    parser.add_argument('paths', nargs='*',
+                        help='файлы с пакетами; `-` — stdin')
+    parser.add_argument('-p', '--package', action='append', default=[],
+                        metavar='CODE,VALUES',
+                        help='пакет в виде CSV-строки, можно повторять')
+    parser.add_argument('--format', choices=FORMATS, default='csv')
+    parser.add_argument('-o', '--output', metavar='PATH',
+                        help='записать сообщения в файл')
+    parser.add_argument('--output-format', choices=OUTPUT_FORMATS,
+                        default='text')
+    parser.add_argument('--strict', action='store_true',
+                        help='проверять типы и диапазоны каждого пакета')
+    args = parser.parse_args(argv)
+    paths = args.paths or ([] if args.package else ['-'])
+    sink = open_sink(args.output, args.output_format) if args.output else None
+    try:
+        failed = run(args.package, 'csv', sink, args.strict)
+        failed += run(iter_lines(paths), args.format, sink, args.strict)
+    finally:
+        if sink is not None:
+            sink.close()
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,166 @@
+"""Двоичный столбцовый формат пакетов с чтением через mmap.
+
+Файл хранит тренировки одного вида: заголовок, имена столбцов
+и столбцы float64 (little-endian) подряд, каждый на `count` значений.
+"""
+import mmap
+import struct
+import sys
+from array import array
+from typing import Iterable, Mapping, Sequence
+
+from batch import FIELDS, BatchResult, compute_columns, get_columns
+from homework import Training, load_workout
+
+MAGIC: bytes = b'HWTC'
+VERSION: int = 1
+HEADER = struct.Struct('<4sHH4sQ')
+NAME = struct.Struct('<16s')
+ITEM_SIZE: int = 8
+ALIGNMENT: int = 8
+
+
+def _data_offset(column_count: int) -> int:
+    offset = HEADER.size + column_count * NAME.size
+    return -(-offset // ALIGNMENT) * ALIGNMENT
+
+
+def write_columns(path: str,
+                  workout_type: str,
+                  columns: Mapping[str, Sequence[float]],
+                  names: Sequence[str] = None) -> int:
+    """Записать столбцы тренировок одного вида и вернуть число записей.
+
+    По умолчанию записываются столбцы конструктора тренировки.
+    """
+    training_class = load_workout(workout_type)
+    if names is None:
+        names = get_columns(training_class)
+    if len(workout_type.encode('ascii')) > 4:
+        raise ValueError('Код тренировки должен быть не длиннее 4 байт.')
+    encoded = [name.encode('ascii') for name in names]
+    long_names = [
+        name for name, raw in zip(names, encoded) if len(raw) > NAME.size
+    ]
+    if long_names:
+        raise ValueError(
+            f'Имена столбцов должны быть не длиннее {NAME.size} байт: '
+            f'{", ".join(long_names)}.'
+        )
+    count = len(columns[names[0]])
+    with open(path, 'wb') as file:
+        file.write(HEADER.pack(MAGIC, VERSION, len(names),
+                               workout_type.encode('ascii'), count))
+        for raw in encoded:
+            file.write(NAME.pack(raw))
+        file.write(bytes(_data_offset(len(names)) - file.tell()))
+        for name in names:
+            column = array('d', columns[name])
+            if len(column) != count:
+                raise ValueError('Столбцы должны быть одной длины.')
+            if sys.byteorder == 'big':
+                column.byteswap()
+            column.tofile(file)
+    return count
+
+
+def write_packages(path: str,
+                   workout_type: str,
+                   packages: Iterable[Sequence[float]]) -> int:
+    """Записать пакеты одного вида в столбцовый файл."""
+    names = get_columns(load_workout(workout_type))
+    columns = {name: array('d') for name in names}
+    for data in packages:
+        if len(data) != len(names):
+            raise TypeError(
+                f'Пакет {workout_type} должен содержать '
+                f'{len(names)} значений, получено {len(data)}.'
+            )
+        for column, value in zip(columns.values(), data):
+            column.append(value)
+    return write_columns(path, workout_type, columns)
+
+
+class ColumnarFile:
+    """Столбцовый файл, отображённый в память.
+
+    Столбцы доступны как `memoryview` без копирования данных.
+    Запись (`file[index]`) состоит только из столбцов конструктора
+    тренировки; дополнительные столбцы, например рассчитанные
+    `recompute.DerivedStore.build`, в неё не входят.
+    """
+
+    def __init__(self, path: str) -> None:
+        if sys.byteorder != 'little':
+            raise NotImplementedError(
+                'Чтение без копирования поддерживается только '
+                'на little-endian платформах.'
+            )
+        with open(path, 'rb') as file:
+            self._mmap = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        self.columns: dict[str, memoryview] = {}
+        try:
+            self._load(path)
+        except BaseException:
+            self.close()
+            raise
+
+    def _load(self, path: str) -> None:
+        size = len(self._mmap)
+        if size < HEADER.size:
+            raise ValueError(f'{path}: неизвестный формат файла.')
+        magic, version, column_count, code, count = HEADER.unpack_from(
+            self._mmap
+        )
+        if magic != MAGIC or version != VERSION:
+            raise ValueError(f'{path}: неизвестный формат файла.')
+        offset = _data_offset(column_count)
+        if size < offset + column_count * count * ITEM_SIZE:
+            raise ValueError(f'{path}: файл обрезан.')
+        self.workout_type = code.rstrip(b'\0').decode('ascii')
+        self.training_class = load_workout(self.workout_type)
+        self.names = get_columns(self.training_class)
+        self.count = count
+        names = [
+            NAME.unpack_from(self._mmap, HEADER.size + i * NAME.size)[0]
+            .rstrip(b'\0').decode('ascii')
+            for i in range(column_count)
+        ]
+        view = memoryview(self._mmap)
+        for name in names:
+            end = offset + count * ITEM_SIZE
+            self.columns[name] = view[offset:end].cast('d')
+            offset = end
+        view.release()
+
+    def __len__(self) -> int:
+        return self.count
+
+    def __getitem__(self, index: int) -> tuple[float, ...]:
+        if index < 0:
+            index += self.count
+        if not 0 <= index < self.count:
+            raise IndexError('Номер записи вне файла.')
+        columns = self.columns
+        return tuple(columns[name][index] for name in self.names)
+
+    def read_package(self, index: int) -> Training:
+        """Создать тренировку по номеру записи."""
+        return self.training_class(*self[index])
+
+    def compute(self, fields: Sequence[str] = FIELDS) -> BatchResult:
+        """Рассчитать показатели всех записей файла."""
+        return compute_columns(self.training_class, self.columns, fields)
+
+    def close(self) -> None:
+        """Освободить столбцы и закрыть отображение."""
+        for column in self.columns.values():
+            column.release()
+        self.columns.clear()
+        self._mmap.close()
+
+    def __enter__(self) -> 'ColumnarFile':
+        return self
+
+    def __exit__(self, *args) -> None:
+        self.close()
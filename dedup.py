@@ -0,0 +1,272 @@
+"""Отсев повторно присланных пакетов перед расчётом.
+
+Ключ пакета — отпечаток устройства, времени и содержимого пакета.
+Отпечатки хранятся в множестве и забываются, когда время пакетов
+уходит дальше окна `window`; число отпечатков ограничено `max_keys`.
+Для длинных окон можно добавить `RotatingBloom`: фильтр Блума
+фиксированного размера, который помнит отпечатки дольше множества
+ценой редких ложных срабатываний.
+"""
+import math
+from collections import deque
+from dataclasses import dataclass
+from hashlib import blake2b
+from typing import Any, Callable, Hashable, Iterable, Iterator, Sequence
+
+WINDOW: float = 60 * 60
+MAX_KEYS: int = 1 << 20
+ERROR_RATE: float = 0.001
+MASK_64: int = (1 << 64) - 1
+
+Row = tuple[Hashable, float, str, Sequence[float]]
+Fingerprint = Callable[[Hashable, float, str, Sequence[float]], int]
+
+
+def _number(value: Any) -> Any:
+    if type(value) is int or type(value) is bool:
+        try:
+            return float(value)
+        except OverflowError:
+            return value
+    return value
+
+
+def normalize(timestamp: float,
+              data: Sequence[float]) -> tuple[Any, tuple[Any, ...]]:
+    """Привести int к float, чтобы 1 и 1.0 давали один отпечаток.
+
+    Int, не представимые во float, остаются как есть.
+    """
+    return _number(timestamp), tuple(map(_number, data))
+
+
+def fingerprint(device: Hashable,
+                timestamp: float,
+                workout_type: str,
+                data: Sequence[float]) -> int:
+    """Получить 64-битный отпечаток пакета через `hash`.
+
+    Быстрый, но отличается между процессами: хэш строк в Python
+    зависит от PYTHONHASHSEED.
+    """
+    timestamp, data = normalize(timestamp, data)
+    return hash((device, timestamp, workout_type, *data)) & MASK_64
+
+
+def stable_fingerprint(device: Hashable,
+                       timestamp: float,
+                       workout_type: str,
+                       data: Sequence[float]) -> int:
+    """Получить 64-битный отпечаток BLAKE2b, одинаковый во всех процессах."""
+    timestamp, data = normalize(timestamp, data)
+    payload = (
+        f'{device}\x1f{timestamp!r}\x1f{workout_type}\x1f'
+        f'{",".join(map(repr, data))}'
+    )
+    return int.from_bytes(
+        blake2b(payload.encode('utf-8'), digest_size=8).digest(), 'little'
+    )
+
+
+class BloomFilter:
+    """Фильтр Блума для 64-битных отпечатков.
+
+    Размер подбирается по ожидаемому числу ключей `capacity`
+    и доле ложных срабатываний `error_rate`; позиции битов считаются
+    двойным хэшированием из половин отпечатка.
+    """
+
+    def __init__(self,
+                 capacity: int,
+                 error_rate: float = ERROR_RATE) -> None:
+        if capacity <= 0 or not 0 < error_rate < 1:
+            raise ValueError('Нужны capacity > 0 и 0 < error_rate < 1.')
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self.size = max(
+            math.ceil(-capacity * math.log(error_rate) / math.log(2) ** 2), 8
+        )
+        self.hashes = max(round(self.size / capacity * math.log(2)), 1)
+        self.bits = bytearray(-(-self.size // 8))
+        self.count = 0
+
+    def _positions(self, key: int) -> Iterator[int]:
+        low = key & 0xFFFFFFFF
+        high = (key >> 32) | 1
+        size = self.size
+        for index in range(self.hashes):
+            yield (low + index * high) % size
+
+    def add(self, key: int) -> bool:
+        """Добавить отпечаток; вернуть `True`, если он, вероятно, уже был."""
+        bits = self.bits
+        present = True
+        for position in self._positions(key):
+            byte, bit = position >> 3, 1 << (position & 7)
+            if not bits[byte] & bit:
+                present = False
+                bits[byte] |= bit
+        if not present:
+            self.count += 1
+        return present
+
+    def __contains__(self, key: int) -> bool:
+        bits = self.bits
+        return all(
+            bits[position >> 3] & 1 << (position & 7)
+            for position in self._positions(key)
+        )
+
+    def clear(self) -> None:
+        """Очистить фильтр."""
+        self.bits = bytearray(len(self.bits))
+        self.count = 0
+
+
+class RotatingBloom:
+    """Пара фильтров Блума для окна `window`.
+
+    Ключи пишутся в текущий фильтр; раз в `window / 2` он становится
+    предыдущим, а прежний предыдущий очищается. Отпечаток помнится
+    от половины до целого окна; после перерыва не меньше окна
+    очищаются оба фильтра. `capacity` — ожидаемое число ключей
+    за половину окна.
+    """
+
+    def __init__(self,
+                 window: float,
+                 capacity: int,
+                 error_rate: float = ERROR_RATE) -> None:
+        if window <= 0:
+            raise ValueError('Окно должно быть больше нуля.')
+        self.window = window
+        self.current = BloomFilter(capacity, error_rate)
+        self.previous = BloomFilter(capacity, error_rate)
+        self.started: float = None
+
+    def add(self, key: int, timestamp: float) -> bool:
+        """Добавить отпечаток; вернуть `True`, если он, вероятно, уже был."""
+        if self.started is None:
+            self.started = timestamp
+        elif timestamp - self.started >= self.window:
+            self.previous.clear()
+            self.current.clear()
+            self.started = timestamp
+        elif timestamp - self.started >= self.window / 2:
+            self.previous, self.current = self.current, self.previous
+            self.current.clear()
+            self.started = timestamp
+        if key in self.previous:
+            self.current.add(key)
+            return True
+        return self.current.add(key)
+
+    @property
+    def nbytes(self) -> int:
+        """Память под биты обоих фильтров."""
+        return len(self.current.bits) + len(self.previous.bits)
+
+
+@dataclass
+class DedupStats:
+    """Счётчики отсева повторов."""
+
+    seen: int = 0
+    duplicates: int = 0
+    bloom_duplicates: int = 0
+    expired: int = 0
+    evicted: int = 0
+
+    @property
+    def rate(self) -> float:
+        """Доля отсеянных пакетов."""
+        return self.duplicates / self.seen if self.seen else 0.0
+
+    def __str__(self) -> str:
+        return (
+            f'Пакетов: {self.seen}; повторов: {self.duplicates} '
+            f'({self.rate:.2%}), из них по фильтру Блума: '
+            f'{self.bloom_duplicates}; забыто по времени: {self.expired}, '
+            f'вытеснено: {self.evicted}.'
+        )
+
+
+class Deduplicator:
+    """Отсев повторов по отпечаткам за окно времени.
+
+    Время отсчитывается по меткам пакетов: отпечаток забывается,
+    когда самая поздняя метка уходит дальше `window`. Отпечатки
+    забываются в порядке поступления, поэтому пакет, опоздавший
+    больше чем на окно, может быть принят повторно.
+    """
+
+    def __init__(self,
+                 window: float = WINDOW,
+                 max_keys: int = MAX_KEYS,
+                 bloom: RotatingBloom = None,
+                 key: Fingerprint = fingerprint) -> None:
+        if window <= 0 or max_keys <= 0:
+            raise ValueError('Окно и max_keys должны быть больше нуля.')
+        self.window = window
+        self.max_keys = max_keys
+        self.bloom = bloom
+        self.key = key
+        self.stats = DedupStats()
+        self.latest = -math.inf
+        self._keys: set[int] = set()
+        self._order: deque[tuple[float, int]] = deque()
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+    def _expire(self, now: float) -> None:
+        order = self._order
+        oldest = now - self.window
+        while order and order[0][0] <= oldest:
+            self._keys.discard(order.popleft()[1])
+            self.stats.expired += 1
+
+    def seen(self,
+             device: Hashable,
+             timestamp: float,
+             workout_type: str,
+             data: Sequence[float]) -> bool:
+        """Проверить пакет и запомнить его; `True` — это повтор."""
+        stats = self.stats
+        stats.seen += 1
+        key = self.key(device, timestamp, workout_type, data)
+        if key in self._keys:
+            stats.duplicates += 1
+            return True
+        if timestamp > self.latest:
+            self.latest = timestamp
+            self._expire(timestamp)
+        if self.bloom is not None and self.bloom.add(key, timestamp):
+            stats.duplicates += 1
+            stats.bloom_duplicates += 1
+            return True
+        if len(self._keys) >= self.max_keys:
+            self._keys.discard(self._order.popleft()[1])
+            stats.evicted += 1
+        self._keys.add(key)
+        self._order.append((timestamp, key))
+        return False
+
+    def filter(self, rows: Iterable[Row]) -> Iterator[Row]:
+        """Пропустить только новые пакеты `(device, ts, workout_type, data)`.
+
+        Подходит для `store.TrainingStore.add_many` и других потребителей
+        строк с устройством и временем.
+        """
+        seen = self.seen
+        for row in rows:
+            if not seen(*row):
+                yield row
+
+    def snapshot(self) -> dict[str, Any]:
+        """Получить счётчики и размер индекса."""
+        return {
+            'keys': len(self._keys),
+            'rate': self.stats.rate,
+            **vars(self.stats),
+        }
@@ -1,38 +1,160 @@
-from dataclasses import asdict, dataclass, field
+from __future__ import annotations
+
+from functools import lru_cache, wraps
+
+# typing стоит около 10 мс импорта (re, enum, contextlib), поэтому
+# имена из него нужны только проверке типов, а аннотации отложены.
+TYPE_CHECKING = False
+if TYPE_CHECKING:
+    from typing import Any, Callable, ClassVar
 
 
-@dataclass
 class InfoMessage:
-    """Информационное сообщение о тренировке."""
-
-    training_type: str
-    duration: float
-    distance: float
-    speed: float
-    calories: float
-
-    INFO: str = field(
-        default=(
-            'Тип тренировки: {training_type}; '
-            'Длительность: {duration:.3f} ч.; '
-            'Дистанция: {distance:.3f} км; '
-            'Ср. скорость: {speed:.3f} км/ч; '
-            'Потрачено ккал: {calories:.3f}.'
-        ),
-        init=False
+    """Информационное сообщение о тренировке.
+
+    Класс написан без `dataclasses`, чтобы импорт модуля
+    не тянул `inspect` и оставался быстрым для запуска из CLI.
+    """
+
+    __slots__ = ('training_type', 'duration', 'distance', 'speed', 'calories')
+
+    INFO: ClassVar[str] = (
+        'Тип тренировки: {training_type}; '
+        'Длительность: {duration:.3f} ч.; '
+        'Дистанция: {distance:.3f} км; '
+        'Ср. скорость: {speed:.3f} км/ч; '
+        'Потрачено ккал: {calories:.3f}.'
     )
 
+    def __init__(self,
+                 training_type: str,
+                 duration: float,
+                 distance: float,
+                 speed: float,
+                 calories: float,
+                 ) -> None:
+        self.training_type = training_type
+        self.duration = duration
+        self.distance = distance
+        self.speed = speed
+        self.calories = calories
+
+    def __repr__(self) -> str:
+        return (
+            f'{type(self).__qualname__}('
+            f'training_type={self.training_type!r}, '
+            f'duration={self.duration!r}, '
+            f'distance={self.distance!r}, '
+            f'speed={self.speed!r}, '
+            f'calories={self.calories!r})'
+        )
+
+    def __eq__(self, other: Any) -> bool:
+        if other.__class__ is not self.__class__:
+            return NotImplemented
+        return (
+            (self.training_type, self.duration, self.distance,
+             self.speed, self.calories)
+            == (other.training_type, other.duration, other.distance,
+                other.speed, other.calories)
+        )
+
+    __hash__ = None
+
     def __str__(self) -> str:
         return self.get_message()
 
     def get_message(self) -> str:
         """Получить информационное сообщение о тренировке."""
-        return self.INFO.format(**asdict(self))
+        return self.INFO.format(
+            training_type=self.training_type,
+            duration=self.duration,
+            distance=self.distance,
+            speed=self.speed,
+            calories=self.calories,
+        )
+
+
+class LazyMetric:
+    """Показатель, который считается методом тренировки при первом чтении.
+
+    Значение сохраняется в `__dict__` сообщения и дальше читается
+    как обычный атрибут, без вызова дескриптора.
+    """
+
+    __slots__ = ('method', 'name')
+
+    def __init__(self, method: str) -> None:
+        self.method = method
+
+    def __set_name__(self, owner: type, name: str) -> None:
+        self.name = name
+
+    def __get__(self, instance: Any, owner: type = None) -> Any:
+        if instance is None:
+            return self
+        value = instance.__dict__[self.name] = getattr(
+            instance.training, self.method
+        )()
+        return value
+
+
+class LazyInfoMessage:
+    """Сообщение о тренировке, считающее показатели при первом обращении.
+
+    Атрибуты и вывод совпадают с `InfoMessage`. Показатели берутся
+    из тренировки в момент первого обращения к ним.
+    """
+
+    __slots__ = ('training', 'training_type', 'duration', '__dict__')
+
+    INFO: ClassVar[str] = InfoMessage.INFO
+    FIELDS: ClassVar[tuple[str, ...]] = InfoMessage.__slots__
+    LAZY_FIELDS: ClassVar[dict[str, str]] = {
+        'distance': 'get_distance',
+        'speed': 'get_mean_speed',
+        'calories': 'get_spent_calories',
+    }
+
+    distance = LazyMetric('get_distance')
+    speed = LazyMetric('get_mean_speed')
+    calories = LazyMetric('get_spent_calories')
+
+    def __init__(self, training: 'Training') -> None:
+        self.training = training
+        self.training_type = type(training).__name__
+        self.duration = training.duration
+
+    def __str__(self) -> str:
+        return self.get_message()
+
+    def __repr__(self) -> str:
+        fields = ', '.join(
+            f'{name}={getattr(self, name)!r}' for name in self.FIELDS
+        )
+        return f'{type(self).__name__}({fields})'
+
+    def __eq__(self, other: Any) -> bool:
+        if not isinstance(other, (InfoMessage, LazyInfoMessage)):
+            return NotImplemented
+        return all(getattr(self, name) == getattr(other, name)
+                   for name in self.FIELDS)
+
+    __hash__ = None
+
+    get_message = InfoMessage.get_message
+
+    def to_info(self) -> InfoMessage:
+        """Получить обычное сообщение со всеми показателями."""
+        return InfoMessage(*(getattr(self, name) for name in self.FIELDS))
 
 
 class Training:
     """Базовый класс тренировки."""
 
+    # __dict__ создаётся только при подмене методов в экземпляре.
+    __slots__ = ('action', 'duration', 'weight', '__dict__')
+
     M_IN_KM: int = 1000
     H_IN_M: int = 60
     LEN_STEP: float = 0.65
@@ -79,10 +201,113 @@ class Training:
             self.get_spent_calories()
         )
 
+    def lazy_training_info(self) -> LazyInfoMessage:
+        """Вернуть сообщение, считающее показатели по требованию."""
+        return LazyInfoMessage(self)
+
+
+CO_VARARGS: int = 0x04
+CO_VARKEYWORDS: int = 0x08
+
+WORKOUT_TYPES: dict[str, type[Training]] = {}
+ENTRY_POINT_GROUP: str = 'homework.workouts'
+
+
+def get_parameters(training_class: type[Training]) -> tuple[str, ...]:
+    """Получить имена значений пакета для класса тренировки.
+
+    Имена берутся из кода конструктора; `inspect` загружается,
+    только если у конструктора нет кода на Python.
+    """
+    if not (isinstance(training_class, type)
+            and issubclass(training_class, Training)):
+        raise TypeError(f'{training_class!r} не наследует Training.')
+    code = getattr(training_class.__init__, '__code__', None)
+    if code is None or hasattr(training_class, '__signature__'):
+        return _signature_parameters(training_class)
+    if code.co_flags & (CO_VARARGS | CO_VARKEYWORDS) or code.co_kwonlyargcount:
+        raise TypeError(
+            f'Конструктор {training_class.__name__} должен принимать '
+            'только позиционные параметры.'
+        )
+    return code.co_varnames[1:code.co_argcount]
+
+
+def _signature_parameters(training_class: type[Training]
+                          ) -> tuple[str, ...]:
+    import inspect
+
+    parameters = inspect.signature(training_class).parameters.values()
+    for parameter in parameters:
+        if parameter.kind not in (parameter.POSITIONAL_ONLY,
+                                  parameter.POSITIONAL_OR_KEYWORD):
+            raise TypeError(
+                f'Конструктор {training_class.__name__} должен принимать '
+                f'только позиционные параметры, а не {parameter}.'
+            )
+    return tuple(parameter.name for parameter in parameters)
+
 
+def get_arity(training_class: type[Training]) -> int:
+    """Получить число значений в пакете для класса тренировки."""
+    return len(get_parameters(training_class))
+
+
+def register_workout(code: str) -> Callable[[type[Training]],
+                                            type[Training]]:
+    """Зарегистрировать вид тренировки под кодом пакета.
+
+    Параметры конструктора проверяются один раз, при регистрации.
+    """
+    def decorator(training_class: type[Training]) -> type[Training]:
+        get_parameters(training_class)
+        registered = WORKOUT_TYPES.get(code)
+        if registered is not None and registered is not training_class:
+            raise ValueError(
+                f'Код тренировки "{code}" уже занят '
+                f'классом {registered.__name__}.'
+            )
+        WORKOUT_TYPES[code] = training_class
+        return training_class
+    return decorator
+
+
+def unregister_workout(code: str) -> None:
+    """Удалить вид тренировки из реестра."""
+    WORKOUT_TYPES.pop(code, None)
+
+
+@lru_cache(maxsize=None)
+def _entry_points() -> dict[str, Any]:
+    from importlib.metadata import entry_points
+    return {
+        entry_point.name: entry_point
+        for entry_point in entry_points(group=ENTRY_POINT_GROUP)
+    }
+
+
+def load_workout(code: str) -> type[Training]:
+    """Найти вид тренировки, при необходимости загрузив плагин.
+
+    Плагины объявляются точками входа группы `homework.workouts`
+    с кодом тренировки в качестве имени и импортируются только
+    при первом пакете с этим кодом.
+    """
+    training_class = WORKOUT_TYPES.get(code)
+    if training_class is not None:
+        return training_class
+    entry_point = _entry_points().get(code)
+    if entry_point is None:
+        raise ValueError(f'Код тренировки "{code}" некорректен!')
+    return register_workout(code)(entry_point.load())
+
+
+@register_workout('RUN')
 class Running(Training):
     """Тренировка: бег."""
 
+    __slots__ = ()
+
     CALORIES_MEAN_SPEED_MULTIPLIER: int = 18
     CALORIES_MEAN_SPEED_SHIFT: float = 1.79
 
@@ -101,9 +326,12 @@ class Running(Training):
         )
 
 
+@register_workout('WLK')
 class SportsWalking(Training):
     """Тренировка: спортивная ходьба."""
 
+    __slots__ = ('height',)
+
     CALORIES_WEIGHT_MULTIPLIER_1: float = 0.035
     CALORIES_WEIGHT_MULTIPLIER_2: float = 0.029
     CALORIES_MEAN_SPEAD_DEGREE: float = 2
@@ -141,9 +369,12 @@ class SportsWalking(Training):
         )
 
 
+@register_workout('SWM')
 class Swimming(Training):
     """Тренировка: плавание."""
 
+    __slots__ = ('length_pool', 'count_pool')
+
     LEN_STEP: float = 1.38
     CALORIES_MEAN_SPEED_SHIFT: float = 1.1
     CALORIES_WEIGHT_MULTIPLIER: float = 2
@@ -180,24 +411,76 @@ class Swimming(Training):
         )
 
 
-WORKOUT_TYPES: dict[str, type[Training]] = {
-    'SWM': Swimming,
-    'RUN': Running,
-    'WLK': SportsWalking
-}
+METRICS: tuple[str, ...] = (
+    'get_distance',
+    'get_mean_speed',
+    'get_spent_calories',
+)
+
+
+def cached_metric(method: Callable[[Training], float]
+                  ) -> Callable[[Training], float]:
+    """Запоминать показатель тренировки до изменения её данных."""
+    name = method.__name__
+
+    @wraps(method)
+    def wrapper(self: Training) -> float:
+        metrics = self._metrics
+        if metrics is None:
+            metrics = self._metrics = {}
+        elif name in metrics:
+            return metrics[name]
+        value = metrics[name] = method(self)
+        return value
+    return wrapper
+
+
+def _reset_metrics(self: Training, name: str, value: Any) -> None:
+    object.__setattr__(self, name, value)
+    if name != '_metrics':
+        object.__setattr__(self, '_metrics', None)
+
+
+@lru_cache(maxsize=None)
+def memoized(training_class: type[Training]) -> type[Training]:
+    """Получить вариант класса тренировки, запоминающий показатели.
+
+    Показатели считаются один раз на экземпляр и сбрасываются
+    при изменении любого атрибута тренировки.
+    """
+    namespace = {
+        name: cached_metric(getattr(training_class, name))
+        for name in METRICS
+    }
+    namespace.update(
+        __slots__=('_metrics',),
+        __setattr__=_reset_metrics,
+        __doc__=training_class.__doc__,
+        __module__=training_class.__module__,
+        __qualname__=training_class.__qualname__,
+    )
+    return type(training_class.__name__, (training_class,), namespace)
 
 
 def read_package(workout_type: str, data: list[int]) -> Training:
     """Прочитать данные полученные от датчиков."""
-    if workout_type not in WORKOUT_TYPES:
-        raise ValueError(f'Код тренировки "{workout_type}" некорректен!')
-    return WORKOUT_TYPES[workout_type](*data)
+    training_class = WORKOUT_TYPES.get(workout_type)
+    if training_class is None:
+        training_class = load_workout(workout_type)
+    return training_class(*data)
+
 
+def main(training: Training, sink: Any = None) -> None:
+    """Главная функция.
 
-def main(training: Training) -> None:
-    """Главная функция."""
+    Если передан приёмник `sink` (см. модуль sinks), сообщение
+    записывается в него вместо печати.
+    """
     info: InfoMessage = training.show_training_info()
-    print(info)
+    if sink is None:
+        print(info)
+    else:
+        sink.write(info)
 
 
 if __name__ == '__main__':
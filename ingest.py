@@ -0,0 +1,279 @@
+"""Потоковое чтение пакетов от датчиков из файлов и stdin."""
+import argparse
+import json
+import os
+import sys
+from collections import Counter, deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass, field
+from queue import SimpleQueue
+from typing import Any, Callable, Iterable, Iterator, Sequence, TextIO
+
+import homework
+from homework import InfoMessage
+from parsing import Package, parse_csv_line
+from sinks import DeadLetterSink
+from validate import InvalidPackage, Rejection, read_checked
+
+CHUNK_SIZE: int = 1 << 16
+
+
+@dataclass
+class IngestStats:
+    """Счётчики потоковой обработки пакетов."""
+
+    processed: int = 0
+    malformed: int = 0
+    rejected: Counter = field(default_factory=Counter)
+    reasons: Counter = field(default_factory=Counter)
+
+    def reject(self, rejection: Rejection, dead_letter: Any = None) -> None:
+        """Учесть отбракованный пакет и передать его в `dead_letter`.
+
+        Код тренировки, не являющийся строкой (например, список
+        из JSON), учитывается по `repr`.
+        """
+        workout_type = rejection.workout_type
+        if not isinstance(workout_type, str):
+            workout_type = repr(workout_type)
+        self.rejected[workout_type] += 1
+        self.reasons[rejection.reason] += 1
+        if dead_letter is not None:
+            dead_letter.write(rejection)
+
+    def update(self, other: 'IngestStats') -> None:
+        """Прибавить счётчики другой обработки."""
+        self.processed += other.processed
+        self.malformed += other.malformed
+        self.rejected.update(other.rejected)
+        self.reasons.update(other.reasons)
+
+    def __str__(self) -> str:
+        rejected = ', '.join(
+            f'{code}: {count}' for code, count in self.rejected.items()
+        )
+        return (
+            f'Обработано пакетов: {self.processed}; '
+            f'отклонено: {sum(self.rejected.values())}'
+            + (f' ({rejected})' if rejected else '')
+            + f'; не разобрано: {self.malformed}.'
+        )
+
+
+def parse_json_line(line: str) -> Package:
+    """Разобрать пакет вида `["SWM", [720, 1, 80, 25, 40]]`.
+
+    Также принимается объект с ключами `workout_type` и `data`.
+    """
+    package = json.loads(line)
+    if isinstance(package, dict):
+        return package['workout_type'], package['data']
+    workout_type, data = package
+    return workout_type, data
+
+
+PARSERS: dict[str, Callable[[str], Package]] = {
+    'csv': parse_csv_line,
+    'jsonl': parse_json_line,
+}
+
+
+def iter_lines(stream: TextIO, chunk_size: int = CHUNK_SIZE) -> Iterator[str]:
+    """Читать строки порциями примерно по `chunk_size` байт."""
+    for lines in iter(lambda: stream.readlines(chunk_size), []):
+        yield from lines
+
+
+def iter_packages(lines: Iterable[str],
+                  fmt: str = 'csv',
+                  stats: IngestStats = None) -> Iterator[Package]:
+    """Получить пакеты из строк, пропуская пустые и комментарии."""
+    parse = PARSERS[fmt]
+    for line in lines:
+        line = line.strip()
+        if not line or line.startswith('#'):
+            continue
+        try:
+            yield parse(line)
+        except (ValueError, TypeError, KeyError):
+            if stats is not None:
+                stats.malformed += 1
+
+
+def process_packages(packages: Iterable[Package],
+                     stats: IngestStats = None,
+                     dead_letter: Any = None) -> Iterator[InfoMessage]:
+    """Лениво рассчитать сообщения для пакетов.
+
+    Пакеты, не прошедшие проверку, пропускаются и передаются
+    в `dead_letter`, если он задан.
+    """
+    if stats is None:
+        stats = IngestStats()
+    for workout_type, data in packages:
+        try:
+            training = read_checked(workout_type, data)
+        except InvalidPackage as error:
+            stats.reject(error.rejection, dead_letter)
+            continue
+        stats.processed += 1
+        yield training.show_training_info()
+
+
+def process_stream(stream: TextIO,
+                   fmt: str = 'csv',
+                   stats: IngestStats = None,
+                   chunk_size: int = CHUNK_SIZE,
+                   dead_letter: Any = None) -> Iterator[InfoMessage]:
+    """Лениво рассчитать сообщения для пакетов из потока."""
+    if stats is None:
+        stats = IngestStats()
+    packages = iter_packages(iter_lines(stream, chunk_size), fmt, stats)
+    return process_packages(packages, stats, dead_letter)
+
+
+def read_file(path: str,
+              fmt: str = 'csv',
+              chunk_size: int = CHUNK_SIZE
+              ) -> tuple[list[Package], IngestStats]:
+    """Прочитать и разобрать файл с пакетами целиком."""
+    stats = IngestStats()
+    with open(path, encoding='utf-8') as stream:
+        packages = list(iter_packages(iter_lines(stream, chunk_size), fmt,
+                                      stats))
+    return packages, stats
+
+
+def iter_decoded(paths: Sequence[str],
+                 fmt: str = 'csv',
+                 workers: int = None,
+                 prefetch: int = None,
+                 ordered: bool = True,
+                 chunk_size: int = CHUNK_SIZE
+                 ) -> Iterator[tuple[list[Package], IngestStats]]:
+    """Читать и разбирать файлы в пуле потоков.
+
+    Вперёд читается не больше `prefetch` файлов (по умолчанию по два
+    на поток). С `ordered=False` файлы выдаются по мере готовности.
+    """
+    workers = workers or min(32, (os.cpu_count() or 1) + 4)
+    prefetch = max(prefetch or 2 * workers, 1)
+    with ThreadPoolExecutor(workers) as executor:
+        paths = iter(paths)
+        pending: deque[Future] = deque()
+        finished: SimpleQueue[Future] = SimpleQueue()
+        try:
+            while True:
+                for path in paths:
+                    future = executor.submit(read_file, path, fmt,
+                                             chunk_size)
+                    if not ordered:
+                        future.add_done_callback(finished.put)
+                    pending.append(future)
+                    if len(pending) >= prefetch:
+                        break
+                if not pending:
+                    return
+                if ordered:
+                    future = pending.popleft()
+                else:
+                    future = finished.get()
+                    pending.remove(future)
+                yield future.result()
+        finally:
+            for future in pending:
+                future.cancel()
+
+
+def process_files(paths: Sequence[str],
+                  fmt: str = 'csv',
+                  stats: IngestStats = None,
+                  workers: int = None,
+                  prefetch: int = None,
+                  ordered: bool = True,
+                  dead_letter: Any = None) -> Iterator[InfoMessage]:
+    """Лениво рассчитать сообщения для файлов, читаемых в потоках.
+
+    Чтение и разбор файлов идут в пуле потоков, расчёт — в текущем
+    потоке, поэтому порядок сообщений внутри файла сохраняется.
+    """
+    if stats is None:
+        stats = IngestStats()
+    for packages, file_stats in iter_decoded(paths, fmt, workers,
+                                             prefetch, ordered):
+        stats.malformed += file_stats.malformed
+        yield from process_packages(packages, stats, dead_letter)
+
+
+def run_serial(stream: TextIO, fmt: str = 'csv', sink: Any = None) -> None:
+    """Обработать пакеты из потока так же, как блок `__main__`.
+
+    Пакеты проверяются `read_checked`, как и в остальных конвейерах;
+    вместо сообщения об отбракованном пакете печатается причина.
+    """
+    for workout_type, data in iter_packages(iter_lines(stream), fmt):
+        try:
+            training = read_checked(workout_type, data)
+            homework.main(training, sink)
+        except ValueError as error:
+            print(error)
+
+
+def open_source(path: str) -> TextIO:
+    """Открыть файл с пакетами; `-` означает stdin."""
+    if path == '-':
+        return sys.stdin
+    return open(path, encoding='utf-8')
+
+
+def process_paths(paths: Sequence[str],
+                  fmt: str = 'csv',
+                  stats: IngestStats = None,
+                  dead_letter: Any = None) -> Iterator[InfoMessage]:
+    """Лениво рассчитать сообщения для файлов по очереди."""
+    for path in paths:
+        stream = open_source(path)
+        try:
+            yield from process_stream(stream, fmt, stats,
+                                      dead_letter=dead_letter)
+        finally:
+            if stream is not sys.stdin:
+                stream.close()
+
+
+def main(argv: list[str] = None) -> None:
+    """Вывести сообщения для пакетов из файлов или stdin."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('paths', nargs='*', default=['-'])
+    parser.add_argument('--format', choices=PARSERS, default='csv')
+    parser.add_argument('--dead-letter', metavar='PATH',
+                        help='файл JSON Lines для отбракованных пакетов')
+    parser.add_argument('--threads', type=int, default=0,
+                        help='читать файлы в N потоках')
+    parser.add_argument('--prefetch', type=int, default=None,
+                        help='сколько файлов читать вперёд')
+    parser.add_argument('--unordered', action='store_true',
+                        help='выводить файлы по мере готовности')
+    args = parser.parse_args(argv)
+    stats = IngestStats()
+    dead_letter = (
+        DeadLetterSink(args.dead_letter) if args.dead_letter else None
+    )
+    if args.threads and '-' not in args.paths:
+        messages = process_files(args.paths, args.format, stats,
+                                 args.threads, args.prefetch,
+                                 not args.unordered, dead_letter)
+    else:
+        messages = process_paths(args.paths, args.format, stats,
+                                 dead_letter)
+    try:
+        for info in messages:
+            print(info)
+    finally:
+        if dead_letter is not None:
+            dead_letter.close()
+    print(stats, file=sys.stderr)
+
+
+if __name__ == '__main__':
+    main()
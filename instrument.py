@@ -0,0 +1,210 @@
+"""Замеры этапов обработки пакетов и подключение профилировщиков.
+
+Пока замеры выключены, код модуля homework не изменяется, поэтому
+накладных расходов нет. При включении подменяются `read_package`
+и `validate.read_checked` (в своих модулях и во всех загруженных
+модулях, которые их импортировали; обе идут в этап `read_package`),
+`Training.show_training_info`, `InfoMessage.get_message` и `print`
+внутри homework.
+"""
+import builtins
+import cProfile
+import sys
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+from functools import wraps
+from typing import Any, Callable, Iterator
+
+import homework
+
+UNKNOWN_LABEL: str = 'unknown'
+STAGES: tuple[str, ...] = (
+    'read_package',
+    'show_training_info',
+    'get_message',
+    'output',
+)
+
+
+def workout_label(workout_type: Any = None, *args: Any) -> str:
+    """Получить метку этапа чтения по коду тренировки.
+
+    Незарегистрированные коды сводятся к `UNKNOWN_LABEL`, чтобы
+    ошибочные пакеты не порождали неограниченное число меток.
+    """
+    if (isinstance(workout_type, str)
+            and workout_type in homework.WORKOUT_TYPES):
+        return workout_type
+    return UNKNOWN_LABEL
+
+
+def escape_label(value: str) -> str:
+    """Экранировать значение метки для текстового формата Prometheus."""
+    return (
+        value.replace('\\', '\\\\').replace('"', '\\"')
+        .replace('\n', '\\n')
+    )
+
+
+class Instrumentation:
+    """Таймеры и счётчики этапов обработки по видам тренировок.
+
+    Время этапа включает вложенные этапы: `output` включает
+    `get_message`, вызванный при печати сообщения.
+    """
+
+    _active: 'Instrumentation' = None
+
+    def __init__(self) -> None:
+        self.timers: defaultdict[tuple[str, str], list[float]] = (
+            defaultdict(lambda: [0, 0.0])
+        )
+        self._restore: list[Callable[[], None]] = []
+
+    @property
+    def enabled(self) -> bool:
+        """Включены ли замеры."""
+        return Instrumentation._active is self
+
+    def observe(self, stage: str, label: str, seconds: float) -> None:
+        """Учесть один вызов этапа."""
+        timer = self.timers[stage, label]
+        timer[0] += 1
+        timer[1] += seconds
+
+    @contextmanager
+    def stage(self, stage: str, label: str = '') -> Iterator[None]:
+        """Замерить произвольный участок кода как этап."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(stage, label, time.perf_counter() - start)
+
+    def _timed(self,
+               stage: str,
+               func: Callable,
+               label: Callable[..., str]) -> Callable:
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                self.observe(stage, label(*args),
+                             time.perf_counter() - start)
+        return wrapper
+
+    def _patch(self, owner: Any, name: str, value: Any) -> None:
+        missing = object()
+        original = vars(owner).get(name, missing)
+        setattr(owner, name, value)
+        if original is missing:
+            self._restore.append(lambda: delattr(owner, name))
+        else:
+            self._restore.append(lambda: setattr(owner, name, original))
+
+    def enable(self) -> None:
+        """Подменить функции homework на замеряющие обёртки."""
+        if Instrumentation._active is not None:
+            raise RuntimeError('Замеры уже включены.')
+        Instrumentation._active = self
+        readers = {'read_package': homework.read_package}
+        validate = sys.modules.get('validate')
+        if validate is not None:
+            readers['read_checked'] = validate.read_checked
+        for name, reader in readers.items():
+            timed_reader = self._timed('read_package', reader,
+                                       workout_label)
+            for module in list(sys.modules.values()):
+                if getattr(module, name, None) is reader:
+                    self._patch(module, name, timed_reader)
+        self._patch(homework.Training, 'show_training_info', self._timed(
+            'show_training_info', homework.Training.show_training_info,
+            lambda training: type(training).__name__
+        ))
+        self._patch(homework.InfoMessage, 'get_message', self._timed(
+            'get_message', homework.InfoMessage.get_message,
+            lambda info: info.training_type
+        ))
+        self._patch(homework, 'print', self._timed(
+            'output', builtins.print,
+            lambda *args: getattr(args[0], 'training_type', '')
+            if args else ''
+        ))
+
+    def disable(self) -> None:
+        """Вернуть исходные функции homework."""
+        while self._restore:
+            self._restore.pop()()
+        if Instrumentation._active is self:
+            Instrumentation._active = None
+
+    def __enter__(self) -> 'Instrumentation':
+        self.enable()
+        return self
+
+    def __exit__(self, *args) -> None:
+        self.disable()
+
+    def reset(self) -> None:
+        """Обнулить таймеры."""
+        self.timers.clear()
+
+    def as_dict(self) -> dict[str, dict[str, dict[str, float]]]:
+        """Получить таймеры в виде `{этап: {метка: {count, seconds}}}`."""
+        result: dict[str, dict[str, dict[str, float]]] = {}
+        for (stage, label), (count, seconds) in sorted(self.timers.items()):
+            result.setdefault(stage, {})[label] = {
+                'count': count,
+                'seconds': seconds,
+            }
+        return result
+
+    def to_prometheus(self, prefix: str = 'homework') -> str:
+        """Получить таймеры в текстовом формате Prometheus."""
+        lines = [
+            f'# HELP {prefix}_stage_calls_total Число вызовов этапа.',
+            f'# TYPE {prefix}_stage_calls_total counter',
+        ]
+        timers = [
+            (f'stage="{escape_label(stage)}",type="{escape_label(label)}"',
+             count, seconds)
+            for (stage, label), (count, seconds)
+            in sorted(self.timers.items())
+        ]
+        for labels, count, _ in timers:
+            lines.append(f'{prefix}_stage_calls_total{{{labels}}} {count}')
+        lines += [
+            f'# HELP {prefix}_stage_seconds_total Время этапа, секунды.',
+            f'# TYPE {prefix}_stage_seconds_total counter',
+        ]
+        for labels, _, seconds in timers:
+            lines.append(f'{prefix}_stage_seconds_total{{{labels}}} '
+                         f'{seconds!r}')
+        return '\n'.join(lines) + '\n'
+
+
+def run_profiled(func: Callable[..., Any],
+                 *args: Any,
+                 profiler: Any = None,
+                 **kwargs: Any) -> tuple[Any, Any]:
+    """Выполнить пакетную обработку под профилировщиком.
+
+    Подходит `cProfile.Profile` (по умолчанию) или любой объект
+    с методами `enable`/`disable` либо `start`/`stop`.
+    Вернуть результат функции и профилировщик.
+    """
+    if profiler is None:
+        profiler = cProfile.Profile()
+    if hasattr(profiler, 'enable'):
+        start, stop = profiler.enable, profiler.disable
+    else:
+        start, stop = profiler.start, profiler.stop
+    start()
+    try:
+        result = func(*args, **kwargs)
+    finally:
+        stop()
+    return result, profiler
@@ -0,0 +1,138 @@
+"""Потоковые сессии: показатели тренировки по мере поступления данных.
+
+Часы присылают приращения за интервал: секунды, шаги или гребки
+и для плавания — число переплытий бассейна. Сессия хранит один
+экземпляр тренировки и прибавляет приращения к его атрибутам,
+поэтому обновление стоит O(1), а показатели считаются теми же
+методами класса тренировки только при чтении.
+"""
+from typing import Any, Hashable, Iterable, Iterator
+
+from homework import InfoMessage, Training, get_parameters, load_workout
+
+SECONDS_IN_H: int = 60 * 60
+DELTA_FIELDS: frozenset[str] = frozenset(
+    ('action', 'duration', 'count_pool')
+)
+
+Update = tuple[Hashable, float, float, float]
+
+
+class Session:
+    """Идущая тренировка одного пользователя."""
+
+    __slots__ = ('training', 'updates', '_info')
+
+    def __init__(self, training: Training) -> None:
+        self.training = training
+        self.updates = 0
+        self._info: InfoMessage = None
+
+    @classmethod
+    def start(cls, workout_type: str, **static: float) -> 'Session':
+        """Начать сессию; `static` — неизменные данные, например вес.
+
+        Накапливаемые поля (`DELTA_FIELDS`) начинаются с нуля.
+        """
+        training_class = load_workout(workout_type)
+        names = get_parameters(training_class)
+        unknown = set(static) - set(names)
+        if unknown:
+            raise ValueError(
+                f'{training_class.__name__} не принимает: '
+                f'{", ".join(sorted(unknown))}.'
+            )
+        missing = [
+            name for name in names
+            if name not in DELTA_FIELDS and name not in static
+        ]
+        if missing:
+            raise ValueError(f'Не заданы поля: {", ".join(missing)}.')
+        return cls(training_class(*(
+            0 if name in DELTA_FIELDS else static[name] for name in names
+        )))
+
+    def update(self,
+               seconds: float,
+               action: float = 0,
+               count_pool: float = 0) -> None:
+        """Учесть интервал длиной `seconds` с приращениями данных."""
+        training = self.training
+        if count_pool:
+            try:
+                training.count_pool += count_pool
+            except AttributeError:
+                raise ValueError(
+                    f'{type(training).__name__} не считает переплытия.'
+                ) from None
+        training.duration += seconds / SECONDS_IN_H
+        training.action += action
+        self.updates += 1
+        self._info = None
+
+    def info(self) -> InfoMessage:
+        """Получить текущие показатели; до первой секунды они нулевые."""
+        info = self._info
+        if info is None:
+            training = self.training
+            if training.duration:
+                info = training.show_training_info()
+            else:
+                info = InfoMessage(type(training).__name__, 0.0,
+                                   training.get_distance(), 0.0, 0.0)
+            self._info = info
+        return info
+
+
+class SessionManager:
+    """Одновременные сессии по идентификаторам."""
+
+    def __init__(self) -> None:
+        self.sessions: dict[Hashable, Session] = {}
+
+    def start(self,
+              session_id: Hashable,
+              workout_type: str,
+              **static: float) -> Session:
+        """Начать сессию с идентификатором `session_id`."""
+        if session_id in self.sessions:
+            raise ValueError(f'Сессия {session_id!r} уже идёт.')
+        session = self.sessions[session_id] = Session.start(workout_type,
+                                                            **static)
+        return session
+
+    def update(self,
+               session_id: Hashable,
+               seconds: float,
+               action: float = 0,
+               count_pool: float = 0) -> None:
+        """Учесть интервал сессии."""
+        self.sessions[session_id].update(seconds, action, count_pool)
+
+    def update_many(self, updates: Iterable[Update]) -> int:
+        """Учесть интервалы `(session_id, seconds, action, count_pool)`."""
+        sessions = self.sessions
+        count = 0
+        for session_id, seconds, action, count_pool in updates:
+            sessions[session_id].update(seconds, action, count_pool)
+            count += 1
+        return count
+
+    def info(self, session_id: Hashable) -> InfoMessage:
+        """Получить текущие показатели сессии."""
+        return self.sessions[session_id].info()
+
+    def infos(self) -> Iterator[tuple[Hashable, InfoMessage]]:
+        """Перебрать текущие показатели всех сессий."""
+        for session_id, session in self.sessions.items():
+            yield session_id, session.info()
+
+    def finish(self, session_id: Hashable) -> InfoMessage:
+        """Завершить сессию и вернуть итоговые показатели."""
+        return self.sessions.pop(session_id).info()
+
+    def __len__(self) -> int:
+        return len(self.sessions)
+
+    def __contains__(self, session_id: Any) -> bool:
+        return session_id in self.sessions
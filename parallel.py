@@ -0,0 +1,120 @@
+"""Параллельная обработка больших файлов с пакетами."""
+import argparse
+import os
+import sys
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from dataclasses import dataclass, field
+from itertools import islice
+from typing import Iterator, TextIO
+
+from aggregate import TypeTotals
+from ingest import PARSERS, IngestStats, iter_lines, iter_packages
+from render import render
+from sketches import MetricSketches
+from validate import InvalidPackage, read_checked
+
+CHUNK_SIZE: int = 10000
+
+
+@dataclass
+class ShardResult:
+    """Результат обработки шарда."""
+
+    text: str = ''
+    totals: dict[str, TypeTotals] = field(default_factory=dict)
+    stats: IngestStats = field(default_factory=IngestStats)
+    sketches: MetricSketches = field(default_factory=MetricSketches)
+
+    def merge(self, other: 'ShardResult') -> None:
+        """Прибавить агрегаты другого шарда."""
+        for training_type, totals in other.totals.items():
+            self.totals.setdefault(training_type, TypeTotals()).merge(totals)
+        self.stats.update(other.stats)
+        self.sketches.merge(other.sketches)
+
+
+def process_shard(lines: list[str], fmt: str = 'csv') -> ShardResult:
+    """Обработать шард так же, как блок `__main__` модуля homework."""
+    result = ShardResult()
+    output = []
+    for workout_type, data in iter_packages(lines, fmt, result.stats):
+        try:
+            training = read_checked(workout_type, data)
+        except InvalidPackage as error:
+            result.stats.reject(error.rejection)
+            output.append(str(error))
+            continue
+        info = training.show_training_info()
+        result.stats.processed += 1
+        result.totals.setdefault(info.training_type, TypeTotals()).add(info)
+        result.sketches.add(info)
+        output.append(render(info))
+    if output:
+        output.append('')
+    result.text = '\n'.join(output)
+    return result
+
+
+def iter_shards(stream: TextIO,
+                chunk_size: int = CHUNK_SIZE) -> Iterator[list[str]]:
+    """Разбить поток на шарды по `chunk_size` строк."""
+    lines = iter_lines(stream)
+    for shard in iter(lambda: list(islice(lines, chunk_size)), []):
+        yield shard
+
+
+def process_sharded(stream: TextIO,
+                    out: TextIO,
+                    fmt: str = 'csv',
+                    workers: int = None,
+                    chunk_size: int = CHUNK_SIZE) -> ShardResult:
+    """Обработать поток в пуле процессов, сохраняя порядок вывода.
+
+    В работе одновременно не больше двух шардов на процесс.
+    Вывод `out` — текстовый поток или текстовый приёмник из sinks.
+    """
+    workers = workers or os.cpu_count() or 1
+    summary = ShardResult()
+    write = getattr(out, 'write_text', out.write)
+
+    def collect(future: Future) -> None:
+        result = future.result()
+        write(result.text)
+        summary.merge(result)
+
+    with ProcessPoolExecutor(workers) as executor:
+        pending: deque[Future] = deque()
+        for shard in iter_shards(stream, chunk_size):
+            pending.append(executor.submit(process_shard, shard, fmt))
+            if len(pending) >= 2 * workers:
+                collect(pending.popleft())
+        while pending:
+            collect(pending.popleft())
+    return summary
+
+
+def main(argv: list[str] = None) -> None:
+    """Обработать файл с пакетами в нескольких процессах."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('path')
+    parser.add_argument('--format', choices=PARSERS, default='csv')
+    parser.add_argument('--workers', type=int, default=None)
+    parser.add_argument('--chunk-size', type=int, default=CHUNK_SIZE)
+    args = parser.parse_args(argv)
+    with open(args.path, encoding='utf-8') as stream:
+        summary = process_sharded(stream, sys.stdout, args.format,
+                                  args.workers, args.chunk_size)
+    for training_type, totals in summary.totals.items():
+        print(f'{training_type}: {totals}', file=sys.stderr)
+    for training_type, metrics in summary.sketches.summary().items():
+        for metric, quantiles in metrics.items():
+            values = ', '.join(
+                f'p{q * 100:g} {value:.3f}' for q, value in quantiles.items()
+            )
+            print(f'{training_type} {metric}: {values}', file=sys.stderr)
+    print(summary.stats, file=sys.stderr)
+
+
+if __name__ == '__main__':
+    main()
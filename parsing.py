@@ -0,0 +1,20 @@
+"""Разбор строк пакетов без тяжёлых зависимостей.
+
+Модуль общий для `ingest` и `cli`: командная строка импортирует
+только его, чтобы не загружать проверку и приёмники при запуске.
+"""
+Package = tuple[str, list[float]]
+
+
+def parse_number(value: str) -> float:
+    """Преобразовать строку в int или float."""
+    try:
+        return int(value)
+    except ValueError:
+        return float(value)
+
+
+def parse_csv_line(line: str) -> Package:
+    """Разобрать пакет вида `SWM,720,1,80,25,40`."""
+    workout_type, *data = line.split(',')
+    return workout_type.strip(), [parse_number(value) for value in data]
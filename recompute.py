@@ -0,0 +1,193 @@
+"""Пересчёт калорий при смене коэффициентов без полного перерасчёта.
+
+Дистанция и средняя скорость не зависят от коэффициентов калорий,
+поэтому сохраняются вместе с исходными столбцами один раз. При смене
+профиля коэффициентов пересчитывается только столбец калорий.
+"""
+import json
+import os
+import re
+from array import array
+from dataclasses import dataclass, field
+from functools import lru_cache
+from typing import Any
+
+from batch import (
+    BatchResult,
+    Columns,
+    compute_columns,
+    get_calorie_kernel,
+    get_columns,
+)
+from columnar import ColumnarFile, write_columns
+from homework import Training, load_workout
+
+DERIVED: tuple[str, ...] = ('distance', 'speed')
+DERIVED_CONSTANTS: frozenset[str] = frozenset(('LEN_STEP', 'M_IN_KM'))
+VERSION_PATTERN = re.compile(r'[A-Za-z0-9_-][A-Za-z0-9._-]*')
+
+
+@lru_cache(maxsize=None)
+def _with_constants(training_class: type[Training],
+                    constants: tuple[tuple[str, float], ...]
+                    ) -> type[Training]:
+    if not constants:
+        return training_class
+    return type(training_class.__name__, (training_class,), {
+        '__slots__': (),
+        '__module__': training_class.__module__,
+        **dict(constants),
+    })
+
+
+@dataclass(frozen=True)
+class Profile:
+    """Версия коэффициентов калорий.
+
+    `coefficients` — замены констант классов по кодам тренировок,
+    например `{'RUN': {'CALORIES_MEAN_SPEED_MULTIPLIER': 18.5}}`.
+    Константы дистанции и скорости менять нельзя.
+    """
+
+    version: str
+    coefficients: dict[str, dict[str, float]] = field(default_factory=dict)
+
+    def __post_init__(self) -> None:
+        if not VERSION_PATTERN.fullmatch(self.version):
+            raise ValueError(
+                f'Недопустимая версия профиля: {self.version!r}.'
+            )
+        for workout_type, constants in self.coefficients.items():
+            training_class = load_workout(workout_type)
+            for name in constants:
+                if name in DERIVED_CONSTANTS:
+                    raise ValueError(
+                        f'Константа {name} влияет на дистанцию и скорость.'
+                    )
+                if not name.isupper() or not hasattr(training_class, name):
+                    raise ValueError(
+                        f'У {training_class.__name__} нет константы {name}.'
+                    )
+
+    def training_class(self, workout_type: str) -> type[Training]:
+        """Получить класс тренировки с коэффициентами профиля."""
+        constants = self.coefficients.get(workout_type, {})
+        return _with_constants(load_workout(workout_type),
+                               tuple(sorted(constants.items())))
+
+    def to_dict(self) -> dict[str, Any]:
+        """Получить профиль в виде словаря, пригодного для JSON."""
+        return {'version': self.version, 'coefficients': self.coefficients}
+
+    @classmethod
+    def from_dict(cls, data: dict[str, Any]) -> 'Profile':
+        """Восстановить профиль из словаря."""
+        return cls(data['version'], data.get('coefficients', {}))
+
+
+class DerivedStore:
+    """Каталог с промежуточными результатами расчёта.
+
+    `<код>.hwtc` — исходные столбцы с дистанцией и скоростью,
+    `<код>.<версия>.hwtc` — калории по профилю, `<версия>.json` — профиль.
+    """
+
+    def __init__(self, directory: str) -> None:
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+
+    def _path(self, workout_type: str, version: str = None) -> str:
+        name = workout_type if version is None else (
+            f'{workout_type}.{version}'
+        )
+        return os.path.join(self.directory, f'{name}.hwtc')
+
+    def save_profile(self, profile: Profile) -> None:
+        """Сохранить профиль; версия не может сменить коэффициенты."""
+        path = os.path.join(self.directory, f'{profile.version}.json')
+        if os.path.exists(path):
+            if self.load_profile(profile.version) != profile:
+                raise ValueError(
+                    f'Версия {profile.version} уже сохранена '
+                    'с другими коэффициентами.'
+                )
+            return
+        with open(path, 'w', encoding='utf-8') as file:
+            json.dump(profile.to_dict(), file, ensure_ascii=False)
+
+    def load_profile(self, version: str) -> Profile:
+        """Загрузить сохранённый профиль."""
+        path = os.path.join(self.directory, f'{version}.json')
+        with open(path, encoding='utf-8') as file:
+            return Profile.from_dict(json.load(file))
+
+    def _write_calories(self,
+                        workout_type: str,
+                        profile: Profile,
+                        calories: array) -> None:
+        self.save_profile(profile)
+        write_columns(self._path(workout_type, profile.version),
+                      workout_type, {'calories': calories}, ('calories',))
+
+    def build(self,
+              workout_type: str,
+              columns: Columns,
+              profile: Profile) -> BatchResult:
+        """Рассчитать все показатели и сохранить промежуточные столбцы."""
+        training_class = profile.training_class(workout_type)
+        result = compute_columns(training_class, columns)
+        names = get_columns(training_class)
+        write_columns(
+            self._path(workout_type),
+            workout_type,
+            {
+                **{name: columns[name] for name in names},
+                'distance': result.distance,
+                'speed': result.speed,
+            },
+            names + DERIVED,
+        )
+        self._write_calories(workout_type, profile, result.calories)
+        return result
+
+    def recompute(self, workout_type: str, profile: Profile) -> BatchResult:
+        """Пересчитать по профилю только калории и сохранить их."""
+        training_class = profile.training_class(workout_type)
+        kernel = get_calorie_kernel(training_class)
+        with ColumnarFile(self._path(workout_type)) as base:
+            columns = base.columns
+            speed = columns['speed']
+            result = BatchResult(
+                training_class.__name__,
+                array('d', columns['duration']),
+                array('d', columns['distance']),
+                array('d', speed),
+                array('d', kernel(training_class, speed, columns)),
+            )
+        self._write_calories(workout_type, profile, result.calories)
+        return result
+
+    def load(self, workout_type: str, version: str) -> BatchResult:
+        """Прочитать сохранённые показатели для версии профиля."""
+        training_class = self.load_profile(version).training_class(
+            workout_type
+        )
+        with ColumnarFile(self._path(workout_type)) as base, \
+                ColumnarFile(self._path(workout_type, version)) as calories:
+            return BatchResult(
+                training_class.__name__,
+                array('d', base.columns['duration']),
+                array('d', base.columns['distance']),
+                array('d', base.columns['speed']),
+                array('d', calories.columns['calories']),
+            )
+
+    def versions(self, workout_type: str) -> list[str]:
+        """Получить версии профилей, для которых сохранены калории."""
+        prefix, suffix = f'{workout_type}.', '.hwtc'
+        return sorted(
+            name[len(prefix):-len(suffix)]
+            for name in os.listdir(self.directory)
+            if name.startswith(prefix) and name.endswith(suffix)
+            and len(name) > len(prefix) + len(suffix)
+        )
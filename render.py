@@ -0,0 +1,109 @@
+"""Быстрый вывод информационных сообщений о тренировках."""
+import io
+import re
+from itertools import repeat
+from operator import attrgetter
+from string import Formatter
+from typing import Callable, Iterable, Optional, TextIO
+
+from batch import BatchResult
+from homework import InfoMessage
+
+CHUNK_SIZE: int = 10000
+
+PRINTF_SPEC = re.compile(r'[-+ #0]*\d*(\.\d+)?[diouxXeEfFgGs]')
+
+
+def to_printf(template: str) -> tuple[str, tuple[str, ...]]:
+    """Перевести шаблон `str.format` в шаблон оператора `%`.
+
+    Вернуть шаблон и имена полей в порядке подстановки.
+    """
+    parts = []
+    names = []
+    for literal, name, spec, conversion in Formatter().parse(template):
+        parts.append(literal.replace('%', '%%'))
+        if name is None:
+            continue
+        if conversion or not name.isidentifier():
+            raise ValueError(f'Поле {{{name}}} нельзя перевести в `%`.')
+        if not spec:
+            spec = 's'
+        if not PRINTF_SPEC.fullmatch(spec):
+            raise ValueError(f'Формат {spec!r} нельзя перевести в `%`.')
+        parts.append('%' + spec)
+        names.append(name)
+    return ''.join(parts), tuple(names)
+
+
+def compile_template(template: str = InfoMessage.INFO
+                     ) -> Callable[[InfoMessage], str]:
+    """Скомпилировать шаблон в функцию вывода сообщения."""
+    printf, names = to_printf(template)
+    getter = attrgetter(*names)
+    if len(names) == 1:
+        return lambda message: printf % (getter(message),)
+    return lambda message: printf % getter(message)
+
+
+render = compile_template()
+
+
+def _write_lines(lines: Iterable[str],
+                 out: TextIO,
+                 chunk_size: int) -> None:
+    chunk = []
+    for line in lines:
+        chunk.append(line)
+        if len(chunk) >= chunk_size:
+            chunk.append('')
+            out.write('\n'.join(chunk))
+            chunk.clear()
+    if chunk:
+        chunk.append('')
+        out.write('\n'.join(chunk))
+
+
+def render_many(messages: Iterable[InfoMessage],
+                out: TextIO = None,
+                chunk_size: int = CHUNK_SIZE) -> Optional[str]:
+    """Вывести сообщения построчно, как это делает `print`.
+
+    Без `out` вернуть весь текст строкой.
+    """
+    if out is None:
+        out = io.StringIO()
+        render_many(messages, out, chunk_size)
+        return out.getvalue()
+    _write_lines(map(render, messages), out, chunk_size)
+
+
+def render_batch(result: BatchResult,
+                 out: TextIO = None,
+                 chunk_size: int = CHUNK_SIZE) -> Optional[str]:
+    """Вывести сообщения для результатов пакетного расчёта.
+
+    Нужны все показатели сообщения; результат, рассчитанный
+    с `fields`, отклоняется с `ValueError`.
+    """
+    printf, names = to_printf(InfoMessage.INFO)
+    missing = [
+        name for name in names
+        if name != 'training_type' and getattr(result, name) is None
+    ]
+    if missing:
+        raise ValueError(f'Показатели не рассчитаны: {", ".join(missing)}.')
+    if out is None:
+        out = io.StringIO()
+        render_batch(result, out, chunk_size)
+        return out.getvalue()
+    columns = {
+        'training_type': repeat(result.training_type),
+        'duration': result.duration,
+        'distance': result.distance,
+        'speed': result.speed,
+        'calories': result.calories,
+    }
+    rows = zip(*(columns[name] for name in names))
+    lines = (printf % row for row in rows)
+    _write_lines(lines, out, chunk_size)
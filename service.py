@@ -0,0 +1,237 @@
+"""Асинхронный сервис приёма пакетов от трекеров.
+
+Кадр запроса — строка JSON:
+`{"id": 1, "workout_type": "SWM", "data": [720, 1, 80, 25, 40],
+"format": "text"}`. Ответ — строка JSON с тем же `id` и полем
+`message` (формат `text`), `result` (формат `json`) или `error`.
+"""
+import argparse
+import asyncio
+import json
+import statistics
+import time
+from dataclasses import dataclass
+from typing import Any
+
+from homework import read_package
+from render import render
+from validate import check_package
+
+QUEUE_SIZE: int = 1024
+BATCH_SIZE: int = 64
+FORMATS: tuple[str, ...] = ('text', 'json')
+
+
+@dataclass
+class Job:
+    """Пакет, ожидающий расчёта."""
+
+    workout_type: str
+    data: list[float]
+    fmt: str
+    request_id: Any
+    future: asyncio.Future
+
+
+def compute(job: Job) -> dict[str, Any]:
+    """Рассчитать ответ на пакет.
+
+    Любая ошибка расчёта становится ответом с полем `error`,
+    чтобы обработчик очереди продолжал работу.
+    """
+    reply: dict[str, Any] = {'id': job.request_id}
+    try:
+        info = read_package(job.workout_type, job.data).show_training_info()
+        if job.fmt == 'json':
+            reply['result'] = {
+                'training_type': info.training_type,
+                'duration': info.duration,
+                'distance': info.distance,
+                'speed': info.speed,
+                'calories': info.calories,
+            }
+        else:
+            reply['message'] = render(info)
+    except Exception as error:
+        reply['error'] = str(error) or type(error).__name__
+    return reply
+
+
+def check_request(request: Any) -> str:
+    """Проверить кадр запроса и вернуть текст ошибки."""
+    if not isinstance(request, dict):
+        return 'Запрос должен быть объектом JSON.'
+    rejection = check_package(request.get('workout_type'),
+                              request.get('data'))
+    if rejection is not None:
+        return rejection.detail
+    if request.get('format', 'text') not in FORMATS:
+        return f'Формат должен быть одним из: {", ".join(FORMATS)}.'
+    return ''
+
+
+class TrackerService:
+    """Сервис расчёта тренировок с ограниченной очередью."""
+
+    def __init__(self,
+                 queue_size: int = QUEUE_SIZE,
+                 batch_size: int = BATCH_SIZE) -> None:
+        self.queue: asyncio.Queue[Job] = asyncio.Queue(queue_size)
+        self.batch_size = batch_size
+        self.worker: asyncio.Task = None
+        self.batches = 0
+        self.processed = 0
+
+    async def run_worker(self) -> None:
+        """Считать пакеты из очереди порциями до `batch_size`."""
+        while True:
+            batch = [await self.queue.get()]
+            while len(batch) < self.batch_size and not self.queue.empty():
+                batch.append(self.queue.get_nowait())
+            for job in batch:
+                if not job.future.done():
+                    job.future.set_result(compute(job))
+                self.queue.task_done()
+            self.batches += 1
+            self.processed += len(batch)
+            await asyncio.sleep(0)
+
+    async def submit(self, request: dict[str, Any]) -> asyncio.Future:
+        """Поставить пакет в очередь; ждать, если очередь заполнена."""
+        future = asyncio.get_running_loop().create_future()
+        await self.queue.put(Job(
+            request['workout_type'],
+            request['data'],
+            request.get('format', 'text'),
+            request.get('id'),
+            future,
+        ))
+        return future
+
+    async def handle(self,
+                     reader: asyncio.StreamReader,
+                     writer: asyncio.StreamWriter) -> None:
+        """Обслужить соединение, отвечая в порядке запросов."""
+        replies: asyncio.Queue = asyncio.Queue(self.batch_size)
+        sender = asyncio.create_task(self.send_replies(replies, writer))
+        try:
+            while line := await reader.readline():
+                if not line.strip():
+                    continue
+                await replies.put(await self.accept(line))
+        finally:
+            await replies.put(None)
+            await sender
+            writer.close()
+
+    async def accept(self, line: bytes) -> asyncio.Future:
+        """Разобрать кадр и вернуть будущий ответ."""
+        try:
+            request = json.loads(line)
+        except ValueError:
+            request = None
+        error = check_request(request)
+        if not error:
+            return await self.submit(request)
+        future = asyncio.get_running_loop().create_future()
+        future.set_result({
+            'id': request.get('id') if isinstance(request, dict) else None,
+            'error': error,
+        })
+        return future
+
+    async def send_replies(self,
+                           replies: asyncio.Queue,
+                           writer: asyncio.StreamWriter) -> None:
+        """Отправить ответы клиенту по мере готовности."""
+        while (future := await replies.get()) is not None:
+            reply = await future
+            writer.write(json.dumps(reply, ensure_ascii=False).encode()
+                         + b'\n')
+            await writer.drain()
+
+    async def start(self,
+                    host: str = '127.0.0.1',
+                    port: int = 0,
+                    path: str = None) -> asyncio.AbstractServer:
+        """Запустить сервер на TCP-порту или Unix-сокете."""
+        if self.worker is None:
+            self.worker = asyncio.create_task(self.run_worker())
+        if path is not None:
+            return await asyncio.start_unix_server(self.handle, path)
+        return await asyncio.start_server(self.handle, host, port)
+
+
+@dataclass
+class LoadReport:
+    """Результаты нагрузочного теста."""
+
+    requests: int
+    seconds: float
+    rps: float
+    p50_ms: float
+    p99_ms: float
+
+
+async def load_test(host: str,
+                    port: int,
+                    packages: list[tuple[str, list[float]]],
+                    concurrency: int = 16) -> LoadReport:
+    """Отправить пакеты с `concurrency` соединений и замерить задержки.
+
+    При одном пакете его задержка считается и p50, и p99.
+    """
+    if not packages:
+        raise ValueError('Для нагрузочного теста нужен хотя бы один пакет.')
+    latencies: list[float] = []
+
+    async def client(chunk: list[tuple[str, list[float]]]) -> None:
+        reader, writer = await asyncio.open_connection(host, port)
+        for workout_type, data in chunk:
+            frame = json.dumps({'workout_type': workout_type, 'data': data})
+            start = time.perf_counter()
+            writer.write(frame.encode() + b'\n')
+            await writer.drain()
+            await reader.readline()
+            latencies.append(time.perf_counter() - start)
+        writer.close()
+        await writer.wait_closed()
+
+    start = time.perf_counter()
+    await asyncio.gather(*(
+        client(packages[i::concurrency]) for i in range(concurrency)
+    ))
+    seconds = time.perf_counter() - start
+    if len(latencies) > 1:
+        cut_points = statistics.quantiles(latencies, n=100)
+        p50, p99 = cut_points[49], cut_points[98]
+    else:
+        p50 = p99 = latencies[0]
+    return LoadReport(
+        len(latencies),
+        seconds,
+        len(latencies) / seconds,
+        p50 * 1000,
+        p99 * 1000,
+    )
+
+
+async def serve(host: str, port: int, path: str = None) -> None:
+    """Запустить сервис и обслуживать соединения до остановки."""
+    server = await TrackerService().start(host, port, path)
+    async with server:
+        await server.serve_forever()
+
+
+def main(argv: list[str] = None) -> None:
+    """Запустить сервис из командной строки."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--unix', metavar='PATH')
+    args = parser.parse_args(argv)
+    asyncio.run(serve(args.host, args.port, args.unix))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,189 @@
+"""Пакетный расчёт в общей памяти нескольких процессов.
+
+Столбцы пакетов и рассчитанные дистанция, скорость и калории лежат
+в одном сегменте `multiprocessing.shared_memory` по `count` значений
+float64 подряд. Процессы получают только описание сегмента
+и диапазон строк, считают его на месте и пишут результат в те же
+столбцы, поэтому объекты тренировок и сообщения не сериализуются.
+"""
+import os
+from array import array
+from concurrent.futures import Executor, ProcessPoolExecutor
+from dataclasses import dataclass
+from multiprocessing import resource_tracker
+from multiprocessing.shared_memory import SharedMemory
+from typing import Mapping, Sequence
+
+from batch import FIELDS, BatchResult, compute_columns, get_columns
+from homework import load_workout
+
+ITEM_SIZE: int = 8
+CHUNK_SIZE: int = 100000
+
+
+@dataclass(frozen=True)
+class SharedDescriptor:
+    """Описание сегмента, которое передаётся между процессами."""
+
+    name: str
+    workout_type: str
+    count: int
+
+
+class SharedBatch:
+    """Столбцы пакетов и показателей одного вида тренировки в общей памяти.
+
+    Создатель сегмента (`create`) отвечает за `unlink`; процессы,
+    подключившиеся через `attach`, только закрывают его.
+    """
+
+    def __init__(self,
+                 memory: SharedMemory,
+                 workout_type: str,
+                 count: int,
+                 owner: bool = False) -> None:
+        self.memory = memory
+        self.workout_type = workout_type
+        self.training_class = load_workout(workout_type)
+        self.count = count
+        self.owner = owner
+        self.names = get_columns(self.training_class)
+        view = memoryview(memory.buf)
+        self.columns: dict[str, memoryview] = {}
+        for index, name in enumerate(self.names + FIELDS):
+            offset = index * count * ITEM_SIZE
+            self.columns[name] = view[
+                offset:offset + count * ITEM_SIZE
+            ].cast('d')
+        view.release()
+
+    @classmethod
+    def create(cls,
+               workout_type: str,
+               columns: Mapping[str, Sequence[float]]) -> 'SharedBatch':
+        """Создать сегмент и скопировать в него столбцы пакетов."""
+        names = get_columns(load_workout(workout_type))
+        missing = [name for name in names if name not in columns]
+        if missing:
+            raise ValueError(f'Нет столбцов: {", ".join(missing)}.')
+        count = len(columns[names[0]])
+        if any(len(columns[name]) != count for name in names):
+            raise ValueError('Столбцы должны быть одной длины.')
+        size = (len(names) + len(FIELDS)) * count * ITEM_SIZE
+        # До Python 3.13 каждое подключение к сегменту регистрируется
+        # в трекере ресурсов. Процессы пула, запущенные после создания
+        # сегмента, наследуют общий трекер и не считают чужие сегменты
+        # утёкшими при выходе.
+        resource_tracker.ensure_running()
+        memory = SharedMemory(create=True, size=max(size, ITEM_SIZE))
+        try:
+            shared = cls(memory, workout_type, count, owner=True)
+            for name in names:
+                shared.columns[name][:] = array('d', columns[name])
+        except BaseException:
+            memory.close()
+            memory.unlink()
+            raise
+        return shared
+
+    @classmethod
+    def attach(cls, descriptor: SharedDescriptor) -> 'SharedBatch':
+        """Подключиться к сегменту по описанию."""
+        return cls(SharedMemory(descriptor.name), descriptor.workout_type,
+                   descriptor.count)
+
+    @property
+    def descriptor(self) -> SharedDescriptor:
+        """Описание сегмента для передачи в другой процесс."""
+        return SharedDescriptor(self.memory.name, self.workout_type,
+                                self.count)
+
+    def __len__(self) -> int:
+        return self.count
+
+    def compute(self,
+                start: int = 0,
+                stop: int = None,
+                fields: Sequence[str] = FIELDS) -> None:
+        """Рассчитать строки `start:stop` и записать показатели на место."""
+        stop = self.count if stop is None else min(stop, self.count)
+        if start >= stop:
+            return
+        result = compute_columns(
+            self.training_class,
+            {name: self.columns[name][start:stop] for name in self.names},
+            fields,
+        )
+        for name in fields:
+            self.columns[name][start:stop] = getattr(result, name)
+
+    def result(self, fields: Sequence[str] = FIELDS) -> BatchResult:
+        """Скопировать рассчитанные показатели в `BatchResult`."""
+        return BatchResult(
+            self.training_class.__name__,
+            array('d', self.columns['duration']),
+            *(array('d', self.columns[name]) if name in fields else None
+              for name in FIELDS),
+        )
+
+    def close(self) -> None:
+        """Освободить столбцы и закрыть сегмент; владелец его удаляет."""
+        for column in self.columns.values():
+            column.release()
+        self.columns.clear()
+        self.memory.close()
+        if self.owner:
+            self.memory.unlink()
+
+    def __enter__(self) -> 'SharedBatch':
+        return self
+
+    def __exit__(self, *args) -> None:
+        self.close()
+
+
+def compute_range(descriptor: SharedDescriptor,
+                  start: int,
+                  stop: int,
+                  fields: Sequence[str] = FIELDS) -> int:
+    """Рассчитать диапазон строк сегмента в процессе-исполнителе."""
+    with SharedBatch.attach(descriptor) as shared:
+        shared.compute(start, stop, fields)
+    return max(min(stop, descriptor.count) - start, 0)
+
+
+def compute_shared(shared: SharedBatch,
+                   executor: Executor,
+                   chunk_size: int = CHUNK_SIZE,
+                   fields: Sequence[str] = FIELDS) -> int:
+    """Рассчитать сегмент по диапазонам в пуле `executor`."""
+    descriptor = shared.descriptor
+    futures = [
+        executor.submit(compute_range, descriptor, start,
+                        start + chunk_size, fields)
+        for start in range(0, shared.count, chunk_size)
+    ]
+    return sum(future.result() for future in futures)
+
+
+def compute_parallel(workout_type: str,
+                     columns: Mapping[str, Sequence[float]],
+                     workers: int = None,
+                     chunk_size: int = None,
+                     fields: Sequence[str] = FIELDS,
+                     executor: Executor = None) -> BatchResult:
+    """Рассчитать столбцы в нескольких процессах через общую память.
+
+    По умолчанию строки делятся поровну между `workers` процессами.
+    Пул `executor` можно передать, чтобы не создавать его заново.
+    """
+    workers = workers or os.cpu_count() or 1
+    with SharedBatch.create(workout_type, columns) as shared:
+        if chunk_size is None:
+            chunk_size = max(-(-shared.count // workers), 1)
+        if executor is None:
+            with ProcessPoolExecutor(workers) as pool:
+                compute_shared(shared, pool, chunk_size, fields)
+        else:
+            compute_shared(shared, executor, chunk_size, fields)
+        return shared.result(fields)
@@ -0,0 +1,188 @@
+"""Приёмники сообщений о тренировках с пакетной записью."""
+import gzip
+import io
+import json
+import sys
+import time
+from typing import Iterable, TextIO, Union
+
+from homework import InfoMessage
+from render import render
+from validate import Rejection
+
+BUFFER_SIZE: int = 4096
+FLUSH_INTERVAL: float = 1.0
+
+
+class Sink:
+    """Базовый приёмник: копит строки и записывает их порциями.
+
+    Буфер сбрасывается, когда в нём `buffer_size` строк или
+    с прошлого сброса прошло `flush_interval` секунд.
+    """
+
+    def __init__(self,
+                 buffer_size: int = BUFFER_SIZE,
+                 flush_interval: float = FLUSH_INTERVAL) -> None:
+        self.buffer_size = buffer_size
+        self.flush_interval = flush_interval
+        self.closed = False
+        self._buffer: list[str] = []
+        self._flushed_at = time.monotonic()
+
+    def format(self, info: InfoMessage) -> str:
+        """Получить строку для сообщения."""
+        return render(info)
+
+    def write(self, info: InfoMessage) -> None:
+        """Добавить сообщение в буфер."""
+        self._buffer.append(self.format(info))
+        if (len(self._buffer) >= self.buffer_size
+                or time.monotonic() - self._flushed_at
+                >= self.flush_interval):
+            self.flush()
+
+    def write_many(self, messages: Iterable[InfoMessage]) -> None:
+        """Добавить сообщения в буфер."""
+        for info in messages:
+            self.write(info)
+
+    def flush(self) -> None:
+        """Записать накопленные строки."""
+        if self._buffer:
+            self._write_lines(self._buffer)
+            self._buffer = []
+        self._flushed_at = time.monotonic()
+
+    def _write_lines(self, lines: list[str]) -> None:
+        raise NotImplementedError(
+            'Определите _write_lines в {}.'.format(type(self).__name__)
+        )
+
+    def _close(self) -> None:
+        pass
+
+    def close(self) -> None:
+        """Записать остаток буфера и закрыть приёмник."""
+        if self.closed:
+            return
+        self.flush()
+        self._close()
+        self.closed = True
+
+    def __enter__(self) -> 'Sink':
+        return self
+
+    def __exit__(self, *args) -> None:
+        self.close()
+
+
+class TextFileSink(Sink):
+    """Текстовый файл или поток, по строке на сообщение."""
+
+    def __init__(self,
+                 target: Union[str, TextIO] = None,
+                 buffer_size: int = BUFFER_SIZE,
+                 flush_interval: float = FLUSH_INTERVAL) -> None:
+        super().__init__(buffer_size, flush_interval)
+        if target is None:
+            target = sys.stdout
+        self._owns_stream = isinstance(target, str)
+        self.stream: TextIO = (
+            self._open(target) if self._owns_stream else target
+        )
+
+    def _open(self, path: str) -> TextIO:
+        return open(path, 'w', encoding='utf-8')
+
+    def _write_lines(self, lines: list[str]) -> None:
+        lines.append('')
+        self.stream.write('\n'.join(lines))
+
+    def write_text(self, text: str) -> None:
+        """Записать уже готовые строки, сохранив порядок с буфером."""
+        self.flush()
+        self.stream.write(text)
+
+    def flush(self) -> None:
+        super().flush()
+        self.stream.flush()
+
+    def _close(self) -> None:
+        if self._owns_stream:
+            self.stream.close()
+
+
+class GzipSink(TextFileSink):
+    """Текстовый файл, сжатый gzip."""
+
+    def __init__(self,
+                 target: Union[str, io.BufferedIOBase],
+                 buffer_size: int = BUFFER_SIZE,
+                 flush_interval: float = FLUSH_INTERVAL,
+                 compresslevel: int = 6) -> None:
+        self.compresslevel = compresslevel
+        super().__init__(
+            target if isinstance(target, str) else gzip.open(
+                target, 'wt', encoding='utf-8', compresslevel=compresslevel
+            ),
+            buffer_size,
+            flush_interval,
+        )
+        self._owns_stream = True
+
+    def _open(self, path: str) -> TextIO:
+        return gzip.open(path, 'wt', encoding='utf-8',
+                         compresslevel=self.compresslevel)
+
+    def flush(self) -> None:
+        Sink.flush(self)
+
+
+class JsonLinesSink(TextFileSink):
+    """Файл JSON Lines с полями сообщения."""
+
+    _encode = json.JSONEncoder(ensure_ascii=False).encode
+
+    def format(self, info: InfoMessage) -> str:
+        return self._encode({
+            'training_type': info.training_type,
+            'duration': info.duration,
+            'distance': info.distance,
+            'speed': info.speed,
+            'calories': info.calories,
+        })
+
+    def write_text(self, text: str) -> None:
+        raise TypeError('JsonLinesSink принимает только сообщения.')
+
+
+class DeadLetterSink(JsonLinesSink):
+    """Файл JSON Lines с отбракованными пакетами и причинами отказа."""
+
+    def format(self, rejection: Rejection) -> str:
+        return self._encode({
+            'workout_type': rejection.workout_type,
+            'data': rejection.data,
+            'reason': rejection.reason,
+            'detail': rejection.detail,
+        })
+
+
+class MemorySink(Sink):
+    """Сборщик сообщений в памяти."""
+
+    def __init__(self) -> None:
+        super().__init__()
+        self.messages: list[InfoMessage] = []
+
+    def write(self, info: InfoMessage) -> None:
+        self.messages.append(info)
+
+    def flush(self) -> None:
+        pass
+
+    @property
+    def lines(self) -> list[str]:
+        """Строки сообщений в порядке записи."""
+        return [render(info) for info in self.messages]
@@ -0,0 +1,509 @@
+"""Приближённые квантили и распределения показателей тренировок.
+
+`KLLSketch` хранит O(k) значений вместо всех сообщений и отвечает
+на запросы квантилей с ошибкой ранга около `rank_error(k)`.
+`Histogram` считает значения по заданным границам корзин.
+Оба вида объединяются между шардами и сохраняются в компактный
+двоичный вид; `MetricSketches` ведёт их по видам тренировок.
+"""
+import math
+import random
+import struct
+import sys
+from array import array
+from bisect import bisect_left, bisect_right
+from collections import Counter
+from functools import partial
+from itertools import accumulate, islice
+from typing import Iterable, Mapping, Optional, Sequence
+
+from batch import BatchResult
+from homework import InfoMessage
+
+DEFAULT_K: int = 200
+MIN_K: int = 8
+CAPACITY_RATIO: float = 2 / 3
+MIN_CAPACITY: int = 8
+METRICS: tuple[str, ...] = ('speed', 'calories')
+QUANTILES: tuple[float, ...] = (0.5, 0.9, 0.99)
+INF: float = float('inf')
+
+KLL_MAGIC: bytes = b'KLLS'
+HISTOGRAM_MAGIC: bytes = b'HIST'
+VERSION: int = 1
+KLL_HEADER = struct.Struct('<4sBBHQdd')
+HISTOGRAM_HEADER = struct.Struct('<4sBxHQdd')
+ENTRY = struct.Struct('<BBI')
+
+
+def rank_error(k: int) -> float:
+    """Оценить нормированную ошибку ранга одного квантиля для `k`.
+
+    Эмпирическая формула Apache DataSketches для KLL с коэффициентом
+    ёмкости 2/3; ошибка не превышается с вероятностью около 99%.
+    """
+    return 2.296 / k ** 0.9723
+
+
+def k_for_error(error: float) -> int:
+    """Подобрать наименьшее `k` с ошибкой ранга не больше `error`."""
+    if not 0 < error < 1:
+        raise ValueError('Ошибка ранга должна быть между 0 и 1.')
+    return max(math.ceil((2.296 / error) ** (1 / 0.9723)), MIN_K)
+
+
+def _to_bytes(values: array) -> bytes:
+    if sys.byteorder == 'big':
+        values = array(values.typecode, values)
+        values.byteswap()
+    return values.tobytes()
+
+
+def _from_bytes(typecode: str, data: bytes) -> array:
+    values = array(typecode)
+    values.frombytes(data)
+    if sys.byteorder == 'big':
+        values.byteswap()
+    return values
+
+
+def _check_quantile(q: float) -> None:
+    if not 0 <= q <= 1:
+        raise ValueError(f'Квантиль должен быть от 0 до 1, получено {q}.')
+
+
+class KLLSketch:
+    """Скетч квантилей KLL.
+
+    Уровень `h` хранит значения с весом `2 ** h`. Переполненный
+    уровень сортируется, и каждое второе значение со случайным
+    сдвигом переходит на следующий уровень. Ёмкость уровней убывает
+    в `CAPACITY_RATIO` раз от верхнего к нижнему.
+    """
+
+    def __init__(self, k: int = DEFAULT_K, seed: int = None) -> None:
+        if k < MIN_K:
+            raise ValueError(f'Параметр k должен быть не меньше {MIN_K}.')
+        self.k = k
+        self.count = 0
+        self.min = INF
+        self.max = -INF
+        self._random = random.Random(seed)
+        self._levels: list[list[float]] = [[]]
+        self._size = 0
+        self._sorted: Optional[tuple[list[float], list[int]]] = None
+        self._set_capacities()
+
+    @property
+    def rank_error(self) -> float:
+        """Ожидаемая нормированная ошибка ранга."""
+        return rank_error(self.k)
+
+    def _grow(self) -> None:
+        self._levels.append([])
+        self._set_capacities()
+
+    def _set_capacities(self) -> None:
+        depth = len(self._levels)
+        self._capacities = [
+            max(math.ceil(self.k * CAPACITY_RATIO ** (depth - level - 1)),
+                MIN_CAPACITY)
+            for level in range(depth)
+        ]
+        self._max_size = sum(self._capacities)
+
+    def _compact(self, level: int) -> None:
+        items = self._levels[level]
+        items.sort()
+        leftover = [items.pop()] if len(items) % 2 else []
+        self._levels[level + 1].extend(
+            items[self._random.getrandbits(1)::2]
+        )
+        self._levels[level] = leftover
+
+    def _compress(self) -> None:
+        while self._size >= self._max_size:
+            for level in range(len(self._levels)):
+                if len(self._levels[level]) >= self._capacities[level]:
+                    if level + 1 == len(self._levels):
+                        self._grow()
+                    self._compact(level)
+                    self._size = sum(map(len, self._levels))
+                    if self._size < self._max_size:
+                        break
+
+    def update(self, value: float) -> None:
+        """Учесть одно значение."""
+        self._levels[0].append(value)
+        self.count += 1
+        if value < self.min:
+            self.min = value
+        if value > self.max:
+            self.max = value
+        self._sorted = None
+        self._size += 1
+        if self._size >= self._max_size:
+            self._compress()
+
+    def update_many(self, values: Iterable[float]) -> None:
+        """Учесть значения порциями, например столбец пакетного расчёта."""
+        values = iter(values)
+        while chunk := list(islice(values, self._max_size)):
+            self._levels[0].extend(chunk)
+            self.count += len(chunk)
+            self.min = min(self.min, min(chunk))
+            self.max = max(self.max, max(chunk))
+            self._size += len(chunk)
+            self._compress()
+        self._sorted = None
+
+    def merge(self, other: 'KLLSketch') -> None:
+        """Добавить значения другого скетча, например другого шарда."""
+        while len(self._levels) < len(other._levels):
+            self._grow()
+        for level, items in zip(self._levels, other._levels):
+            level.extend(items)
+        self.count += other.count
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+        self._size = sum(map(len, self._levels))
+        self._sorted = None
+        self._compress()
+
+    def __len__(self) -> int:
+        return self.count
+
+    def _weights(self) -> tuple[list[float], list[int]]:
+        if self._sorted is None:
+            pairs = sorted(
+                (value, 1 << level)
+                for level, items in enumerate(self._levels)
+                for value in items
+            )
+            self._sorted = (
+                [value for value, _ in pairs],
+                list(accumulate(weight for _, weight in pairs)),
+            )
+        return self._sorted
+
+    def rank(self, value: float) -> float:
+        """Оценить долю значений, не превышающих `value`."""
+        if not self.count:
+            return 0.0
+        values, cumulative = self._weights()
+        index = bisect_right(values, value)
+        return cumulative[index - 1] / self.count if index else 0.0
+
+    def quantile(self, q: float) -> float:
+        """Оценить квантиль уровня `q` от 0 до 1."""
+        _check_quantile(q)
+        if not self.count:
+            raise ValueError('Скетч пуст.')
+        if q == 0:
+            return self.min
+        if q == 1:
+            return self.max
+        values, cumulative = self._weights()
+        index = bisect_left(cumulative, q * self.count)
+        return values[min(index, len(values) - 1)]
+
+    def quantiles(self, qs: Sequence[float] = QUANTILES) -> list[float]:
+        """Оценить несколько квантилей."""
+        return [self.quantile(q) for q in qs]
+
+    def to_bytes(self) -> bytes:
+        """Сохранить скетч: заголовок, длины уровней и значения float64."""
+        return b''.join((
+            KLL_HEADER.pack(KLL_MAGIC, VERSION, len(self._levels), self.k,
+                            self.count, self.min, self.max),
+            _to_bytes(array('I', map(len, self._levels))),
+            *(_to_bytes(array('d', items)) for items in self._levels),
+        ))
+
+    @classmethod
+    def from_bytes(cls, data: bytes, seed: int = None) -> 'KLLSketch':
+        """Восстановить скетч из `to_bytes`."""
+        magic, version, depth, k, count, low, high = (
+            KLL_HEADER.unpack_from(data)
+        )
+        if magic != KLL_MAGIC or version != VERSION:
+            raise ValueError('Неизвестный формат скетча.')
+        sketch = cls(k, seed)
+        while len(sketch._levels) < depth:
+            sketch._grow()
+        offset = KLL_HEADER.size
+        lengths = _from_bytes('I', data[offset:offset + 4 * depth])
+        offset += 4 * depth
+        for level, length in enumerate(lengths):
+            end = offset + 8 * length
+            sketch._levels[level] = _from_bytes('d', data[offset:end]).tolist()
+            offset = end
+        sketch.count, sketch.min, sketch.max = count, low, high
+        sketch._size = sum(lengths)
+        return sketch
+
+
+class Histogram:
+    """Гистограмма по возрастающим границам `edges`.
+
+    Корзина `i` от 1 до `len(edges) - 1` считает значения
+    `edges[i - 1] <= value < edges[i]`; крайние корзины считают
+    значения левее первой и не левее последней границы.
+    """
+
+    def __init__(self, edges: Sequence[float]) -> None:
+        edges = tuple(map(float, edges))
+        if len(edges) < 2 or any(
+            left >= right for left, right in zip(edges, edges[1:])
+        ):
+            raise ValueError('Нужно не меньше двух возрастающих границ.')
+        self.edges = edges
+        self.counts = array('Q', bytes(8 * (len(edges) + 1)))
+        self.count = 0
+        self.min = INF
+        self.max = -INF
+        self._bin = partial(bisect_right, edges)
+
+    @classmethod
+    def linear(cls, lower: float, upper: float, bins: int) -> 'Histogram':
+        """Гистограмма с `bins` корзинами равной ширины."""
+        step = (upper - lower) / bins
+        return cls([lower + step * index for index in range(bins)] + [upper])
+
+    @classmethod
+    def geometric(cls,
+                  lower: float,
+                  upper: float,
+                  bins: int) -> 'Histogram':
+        """Гистограмма с корзинами, растущими в одно и то же число раз."""
+        if lower <= 0:
+            raise ValueError('Нижняя граница должна быть больше нуля.')
+        ratio = (upper / lower) ** (1 / bins)
+        return cls([lower * ratio ** index for index in range(bins)]
+                   + [upper])
+
+    def update(self, value: float) -> None:
+        """Учесть одно значение."""
+        self.counts[self._bin(value)] += 1
+        self.count += 1
+        if value < self.min:
+            self.min = value
+        if value > self.max:
+            self.max = value
+
+    def update_many(self, values: Iterable[float]) -> None:
+        """Учесть значения; корзины ищутся без цикла на Python."""
+        values = values if isinstance(values, (list, array, memoryview)) \
+            else list(values)
+        if not len(values):
+            return
+        for index, count in Counter(map(self._bin, values)).items():
+            self.counts[index] += count
+        self.count += len(values)
+        self.min = min(self.min, min(values))
+        self.max = max(self.max, max(values))
+
+    def merge(self, other: 'Histogram') -> None:
+        """Прибавить счётчики гистограммы с теми же границами."""
+        if other.edges != self.edges:
+            raise ValueError('Объединять можно гистограммы с одними '
+                             'границами.')
+        for index, count in enumerate(other.counts):
+            self.counts[index] += count
+        self.count += other.count
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+
+    def __len__(self) -> int:
+        return self.count
+
+    def quantile(self, q: float) -> float:
+        """Оценить квантиль линейной интерполяцией внутри корзины.
+
+        Ошибка не больше ширины корзины с квантилем; в крайних
+        корзинах интерполяция идёт до наименьшего и наибольшего значения.
+        """
+        _check_quantile(q)
+        if not self.count:
+            raise ValueError('Гистограмма пуста.')
+        target = q * self.count
+        lows = (min(self.min, self.edges[0]), *self.edges)
+        highs = (*self.edges, max(self.max, self.edges[-1]))
+        seen = 0
+        for low, high, count in zip(lows, highs, self.counts):
+            if count and seen + count >= target:
+                value = low + (high - low) * (target - seen) / count
+                return min(max(value, self.min), self.max)
+            seen += count
+        return self.max
+
+    def quantiles(self, qs: Sequence[float] = QUANTILES) -> list[float]:
+        """Оценить несколько квантилей."""
+        return [self.quantile(q) for q in qs]
+
+    def to_bytes(self) -> bytes:
+        """Сохранить гистограмму: заголовок, границы и счётчики."""
+        return b''.join((
+            HISTOGRAM_HEADER.pack(HISTOGRAM_MAGIC, VERSION, len(self.edges),
+                                  self.count, self.min, self.max),
+            _to_bytes(array('d', self.edges)),
+            _to_bytes(self.counts),
+        ))
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> 'Histogram':
+        """Восстановить гистограмму из `to_bytes`."""
+        magic, version, size, count, low, high = (
+            HISTOGRAM_HEADER.unpack_from(data)
+        )
+        if magic != HISTOGRAM_MAGIC or version != VERSION:
+            raise ValueError('Неизвестный формат гистограммы.')
+        offset = HISTOGRAM_HEADER.size
+        histogram = cls(_from_bytes('d', data[offset:offset + 8 * size]))
+        offset += 8 * size
+        histogram.counts = _from_bytes(
+            'Q', data[offset:offset + 8 * (size + 1)]
+        )
+        histogram.count, histogram.min, histogram.max = count, low, high
+        return histogram
+
+
+class MetricSketches:
+    """Скетчи показателей `metrics` по видам тренировок.
+
+    Для показателей из `edges` дополнительно ведутся гистограммы
+    с заданными границами.
+    """
+
+    def __init__(self,
+                 metrics: Sequence[str] = METRICS,
+                 k: int = DEFAULT_K,
+                 edges: Mapping[str, Sequence[float]] = None,
+                 seed: int = None) -> None:
+        self.metrics = tuple(metrics)
+        self.k = k
+        self.edges = {
+            metric: tuple(map(float, bounds))
+            for metric, bounds in (edges or {}).items()
+        }
+        self.seed = seed
+        self.sketches: dict[tuple[str, str], KLLSketch] = {}
+        self.histograms: dict[tuple[str, str], Histogram] = {}
+        self._targets: dict[str, list[tuple[str, KLLSketch,
+                                            Optional[Histogram]]]] = {}
+
+    def _for_type(self, training_type: str) -> list[
+        tuple[str, KLLSketch, Optional[Histogram]]
+    ]:
+        targets = self._targets.get(training_type)
+        if targets is None:
+            targets = self._targets[training_type] = []
+            for metric in self.metrics:
+                key = (training_type, metric)
+                sketch = self.sketches.get(key)
+                if sketch is None:
+                    sketch = self.sketches[key] = KLLSketch(self.k,
+                                                            self.seed)
+                histogram = self.histograms.get(key)
+                if histogram is None and metric in self.edges:
+                    histogram = self.histograms[key] = Histogram(
+                        self.edges[metric]
+                    )
+                targets.append((metric, sketch, histogram))
+        return targets
+
+    def add(self, info: InfoMessage) -> None:
+        """Учесть показатели сообщения о тренировке."""
+        for metric, sketch, histogram in self._for_type(info.training_type):
+            value = getattr(info, metric)
+            sketch.update(value)
+            if histogram is not None:
+                histogram.update(value)
+
+    def add_batch(self, result: BatchResult) -> None:
+        """Учесть столбцы пакетного расчёта."""
+        for metric, sketch, histogram in self._for_type(result.training_type):
+            column = getattr(result, metric)
+            if column is None:
+                raise ValueError(f'Показатель {metric} не рассчитан.')
+            sketch.update_many(column)
+            if histogram is not None:
+                histogram.update_many(column)
+
+    def merge(self, other: 'MetricSketches') -> None:
+        """Добавить скетчи другого набора, например другого шарда."""
+        for key, sketch in other.sketches.items():
+            if key in self.sketches:
+                self.sketches[key].merge(sketch)
+            else:
+                self.sketches[key] = KLLSketch.from_bytes(sketch.to_bytes(),
+                                                          self.seed)
+        for key, histogram in other.histograms.items():
+            if key in self.histograms:
+                self.histograms[key].merge(histogram)
+            else:
+                self.histograms[key] = Histogram.from_bytes(
+                    histogram.to_bytes()
+                )
+        self._targets.clear()
+
+    def keys(self) -> list[tuple[str, str]]:
+        """Получить пары вид тренировки — показатель."""
+        return list(self.sketches)
+
+    def quantiles(self,
+                  training_type: str,
+                  metric: str,
+                  qs: Sequence[float] = QUANTILES) -> dict[float, float]:
+        """Оценить квантили показателя для вида тренировки."""
+        sketch = self.sketches.get((training_type, metric))
+        if sketch is None:
+            raise KeyError(f'Нет данных: {training_type}, {metric}.')
+        return dict(zip(qs, sketch.quantiles(qs)))
+
+    def summary(self,
+                qs: Sequence[float] = QUANTILES
+                ) -> dict[str, dict[str, dict[float, float]]]:
+        """Получить квантили всех показателей по видам тренировок."""
+        result: dict[str, dict[str, dict[float, float]]] = {}
+        for (training_type, metric), sketch in self.sketches.items():
+            if sketch.count:
+                result.setdefault(training_type, {})[metric] = dict(
+                    zip(qs, sketch.quantiles(qs))
+                )
+        return result
+
+    def to_bytes(self) -> bytes:
+        """Сохранить все скетчи и гистограммы в один блок байтов."""
+        parts = []
+        for kind, items in ((0, self.sketches), (1, self.histograms)):
+            for (training_type, metric), sketch in items.items():
+                name = f'{training_type}\0{metric}'.encode('utf-8')
+                data = sketch.to_bytes()
+                parts += [ENTRY.pack(kind, len(name), len(data)), name, data]
+        return b''.join(parts)
+
+    @classmethod
+    def from_bytes(cls,
+                   data: bytes,
+                   metrics: Sequence[str] = METRICS,
+                   k: int = DEFAULT_K,
+                   edges: Mapping[str, Sequence[float]] = None,
+                   seed: int = None) -> 'MetricSketches':
+        """Восстановить набор из `to_bytes`."""
+        sketches = cls(metrics, k, edges, seed)
+        offset = 0
+        while offset < len(data):
+            kind, name_size, size = ENTRY.unpack_from(data, offset)
+            offset += ENTRY.size
+            key = tuple(
+                data[offset:offset + name_size].decode('utf-8').split('\0')
+            )
+            offset += name_size
+            chunk = data[offset:offset + size]
+            offset += size
+            if kind:
+                sketches.histograms[key] = Histogram.from_bytes(chunk)
+            else:
+                sketches.sketches[key] = KLLSketch.from_bytes(chunk, seed)
+        return sketches
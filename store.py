@@ -0,0 +1,280 @@
+"""Хранилище пакетов и рассчитанных показателей в SQLite.
+
+Пакеты пишутся порциями через `executemany`, каждая порция —
+одна транзакция. Индексы по пользователю, виду тренировки, времени
+и дистанции обслуживают выборки за период и запросы итогов.
+"""
+import sqlite3
+from dataclasses import dataclass
+from itertools import islice
+from typing import Any, Hashable, Iterable, Iterator, Sequence
+
+from aggregate import TypeTotals
+from batch import neumaier_add
+from homework import InfoMessage
+from ingest import IngestStats
+from parsing import parse_number
+from validate import InvalidPackage, read_checked
+
+BATCH_SIZE: int = 10000
+
+SCHEMA: tuple[str, ...] = (
+    '''CREATE TABLE IF NOT EXISTS trainings (
+        id INTEGER PRIMARY KEY,
+        user TEXT NOT NULL,
+        ts REAL NOT NULL,
+        workout_type TEXT NOT NULL,
+        data TEXT NOT NULL,
+        training_type TEXT NOT NULL,
+        duration REAL NOT NULL,
+        distance REAL NOT NULL,
+        speed REAL NOT NULL,
+        calories REAL NOT NULL
+    )''',
+)
+INDEXES: tuple[str, ...] = (
+    'CREATE INDEX IF NOT EXISTS trainings_user ON trainings (user, ts)',
+    'CREATE INDEX IF NOT EXISTS trainings_type '
+    'ON trainings (training_type, ts)',
+    'CREATE INDEX IF NOT EXISTS trainings_ts ON trainings (ts)',
+    'CREATE INDEX IF NOT EXISTS trainings_distance ON trainings (distance)',
+)
+INSERT: str = (
+    'INSERT INTO trainings (user, ts, workout_type, data, training_type, '
+    'duration, distance, speed, calories) '
+    'VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)'
+)
+COLUMNS: str = (
+    'user, ts, workout_type, data, '
+    'training_type, duration, distance, speed, calories'
+)
+
+# SUM в SQLite до 3.43 складывает REAL без компенсации.
+SUM: str = 'SUM' if sqlite3.sqlite_version_info >= (3, 43) else 'NSUM'
+
+Row = tuple[Hashable, float, str, Sequence[float]]
+
+
+class CompensatedSum:
+    """Агрегатная функция SQLite `NSUM`: сумма с компенсацией."""
+
+    def __init__(self) -> None:
+        self.total = 0.0
+        self.error = 0.0
+
+    def step(self, value: float) -> None:
+        if value is not None:
+            self.total, self.error = neumaier_add(self.total, self.error,
+                                                  value)
+
+    def finalize(self) -> float:
+        return self.total
+
+
+@dataclass
+class StoredTraining:
+    """Сохранённый пакет с рассчитанным сообщением."""
+
+    user: str
+    timestamp: float
+    workout_type: str
+    data: list[float]
+    info: InfoMessage
+
+
+def _record(user: Hashable,
+            timestamp: float,
+            workout_type: str,
+            data: Sequence[float],
+            info: InfoMessage) -> tuple:
+    return (
+        str(user),
+        timestamp,
+        workout_type,
+        ','.join(map(str, data)),
+        info.training_type,
+        info.duration,
+        info.distance,
+        info.speed,
+        info.calories,
+    )
+
+
+def _to_stored(row: tuple) -> StoredTraining:
+    user, ts, workout_type, data, *fields = row
+    return StoredTraining(
+        user,
+        ts,
+        workout_type,
+        [parse_number(value) for value in data.split(',')],
+        InfoMessage(*fields),
+    )
+
+
+def _where(user: Hashable = None,
+           training_type: str = None,
+           start: float = None,
+           end: float = None) -> tuple[str, list[Any]]:
+    conditions = []
+    parameters: list[Any] = []
+    if user is not None:
+        conditions.append('user = ?')
+        parameters.append(str(user))
+    if training_type is not None:
+        conditions.append('training_type = ?')
+        parameters.append(training_type)
+    if start is not None:
+        conditions.append('ts >= ?')
+        parameters.append(start)
+    if end is not None:
+        conditions.append('ts < ?')
+        parameters.append(end)
+    if not conditions:
+        return '', parameters
+    return ' WHERE ' + ' AND '.join(conditions), parameters
+
+
+class TrainingStore:
+    """Пакеты тренировок и их показатели в базе SQLite."""
+
+    def __init__(self,
+                 path: str = ':memory:',
+                 batch_size: int = BATCH_SIZE,
+                 indexes: bool = True) -> None:
+        self.path = path
+        self.batch_size = batch_size
+        self.connection = sqlite3.connect(path)
+        self.connection.create_aggregate('NSUM', 1, CompensatedSum)
+        self.connection.execute('PRAGMA journal_mode = WAL')
+        self.connection.execute('PRAGMA synchronous = NORMAL')
+        with self.connection:
+            for statement in SCHEMA:
+                self.connection.execute(statement)
+        if indexes:
+            self.create_indexes()
+
+    def create_indexes(self) -> None:
+        """Создать индексы; при первичной загрузке их удобно строить после."""
+        with self.connection:
+            for statement in INDEXES:
+                self.connection.execute(statement)
+
+    def _rows(self,
+              rows: Iterable[Row],
+              stats: IngestStats) -> Iterator[tuple]:
+        for user, timestamp, workout_type, data in rows:
+            try:
+                training = read_checked(workout_type, data)
+            except InvalidPackage as error:
+                stats.reject(error.rejection)
+                continue
+            stats.processed += 1
+            yield _record(user, timestamp, workout_type, data,
+                          training.show_training_info())
+
+    def add_many(self,
+                 rows: Iterable[Row],
+                 stats: IngestStats = None) -> IngestStats:
+        """Рассчитать и сохранить пакеты `(user, ts, workout_type, data)`.
+
+        Пакеты, не прошедшие проверку, пропускаются и учитываются
+        в `stats`.
+        """
+        if stats is None:
+            stats = IngestStats()
+        records = self._rows(rows, stats)
+        while chunk := list(islice(records, self.batch_size)):
+            with self.connection:
+                self.connection.executemany(INSERT, chunk)
+        return stats
+
+    def add(self,
+            user: Hashable,
+            timestamp: float,
+            workout_type: str,
+            data: Sequence[float]) -> InfoMessage:
+        """Рассчитать и сохранить один пакет."""
+        info = read_checked(workout_type, data).show_training_info()
+        with self.connection:
+            self.connection.execute(
+                INSERT, _record(user, timestamp, workout_type, data, info)
+            )
+        return info
+
+    def __len__(self) -> int:
+        return self.connection.execute(
+            'SELECT COUNT(*) FROM trainings'
+        ).fetchone()[0]
+
+    def totals_by_type(self,
+                       user: Hashable = None,
+                       start: float = None,
+                       end: float = None) -> dict[str, TypeTotals]:
+        """Получить итоги по видам тренировок за период."""
+        where, parameters = _where(user, None, start, end)
+        cursor = self.connection.execute(
+            f'SELECT training_type, COUNT(*), {SUM}(duration), '
+            f'{SUM}(distance), {SUM}(calories) '
+            f'FROM trainings{where} GROUP BY training_type',
+            parameters,
+        )
+        return {
+            training_type: TypeTotals(count, duration, distance, calories)
+            for training_type, count, duration, distance, calories in cursor
+        }
+
+    def calories_by_type(self,
+                         user: Hashable = None,
+                         start: float = None,
+                         end: float = None) -> dict[str, float]:
+        """Получить сумму калорий по видам тренировок за период."""
+        where, parameters = _where(user, None, start, end)
+        return dict(self.connection.execute(
+            f'SELECT training_type, {SUM}(calories) FROM trainings{where} '
+            'GROUP BY training_type',
+            parameters,
+        ))
+
+    def top_distances(self,
+                      n: int = 10,
+                      user: Hashable = None,
+                      training_type: str = None) -> list[StoredTraining]:
+        """Получить `n` тренировок с наибольшей дистанцией."""
+        where, parameters = _where(user, training_type)
+        cursor = self.connection.execute(
+            f'SELECT {COLUMNS} FROM trainings{where} '
+            'ORDER BY distance DESC LIMIT ?',
+            [*parameters, n],
+        )
+        return [_to_stored(row) for row in cursor]
+
+    def trainings(self,
+                  user: Hashable = None,
+                  training_type: str = None,
+                  start: float = None,
+                  end: float = None) -> Iterator[StoredTraining]:
+        """Перебрать сохранённые тренировки за период по времени."""
+        where, parameters = _where(user, training_type, start, end)
+        cursor = self.connection.execute(
+            f'SELECT {COLUMNS} FROM trainings{where} ORDER BY ts',
+            parameters,
+        )
+        return map(_to_stored, cursor)
+
+    def explain(self, sql: str, parameters: Sequence[Any] = ()) -> str:
+        """Получить план запроса SQLite."""
+        return '\n'.join(
+            row[-1] for row in self.connection.execute(
+                f'EXPLAIN QUERY PLAN {sql}', parameters
+            )
+        )
+
+    def close(self) -> None:
+        """Закрыть базу."""
+        self.connection.close()
+
+    def __enter__(self) -> 'TrainingStore':
+        return self
+
+    def __exit__(self, *args) -> None:
+        self.close()
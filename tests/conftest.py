@@ -5,6 +5,12 @@ from io import StringIO
 BASE_DIR = Path(__file__).resolve(strict=True).parent.parent
 sys.path.append(str(BASE_DIR))
 
+PACKAGES = {
+    'SWM': [[720, 1, 80, 25, 40], [420, 4, 20, 42, 4], [1206, 12, 6, 12, 6]],
+    'RUN': [[15000, 1, 75], [420, 4, 20], [1206, 12, 6]],
+    'WLK': [[9000, 1, 75, 180], [3000.33, 2.512, 75.8, 180.1]],
+}
+
 
 class Capturing(list):
     """
@@ -27,5 +33,19 @@ class Capturing(list):
         sys.stdout = self._stdout
 
 
+def to_columns(workout_type, packages=None):
+    """Split packages (PACKAGES by default) into constructor columns."""
+    from batch import get_columns
+    from homework import load_workout
+
+    if packages is None:
+        packages = PACKAGES[workout_type]
+    names = get_columns(load_workout(workout_type))
+    return {
+        name: [data[index] for data in packages]
+        for index, name in enumerate(names)
+    }
+
+
 def pytest_make_parametrize_id(config, val):
     return repr(val)
@@ -0,0 +1,88 @@
+import json
+import math
+
+import pytest
+
+import aggregate
+import homework
+
+DAY = aggregate.DAY
+
+
+def make_aggregator():
+    aggregator = aggregate.StreamingAggregator(window=3 * DAY, bucket=DAY)
+    aggregator.add_package('anna', 'RUN', [15000, 1, 75], 0)
+    aggregator.add_package('anna', 'RUN', [9000, 1, 75], DAY + 10)
+    aggregator.add_package('anna', 'RUN', [420, 4, 20], 3 * DAY + 10)
+    aggregator.add_package('anna', 'RUN', [1206, 12, 6], 2 * DAY + 10)
+    aggregator.add_package('anna', 'SWM', [720, 1, 80, 25, 40], DAY)
+    aggregator.add_package('ivan', 'WLK', [9000, 1, 75, 180], 3 * DAY)
+    return aggregator
+
+
+def running(data):
+    return homework.Running(*data).show_training_info()
+
+
+def test_totals():
+    aggregator = make_aggregator()
+    totals = aggregator.totals('anna', 'Running')
+    assert totals.count == 4
+    expected = sum(
+        running(data).calories
+        for data in ([15000, 1, 75], [9000, 1, 75], [420, 4, 20],
+                     [1206, 12, 6])
+    )
+    assert totals.calories == pytest.approx(expected)
+    assert totals.mean_calories == pytest.approx(expected / 4)
+    assert len(aggregator) == 3
+
+
+def test_totals_are_compensated():
+    values = [0.1] * 10 + [1e16, 1.0, -1e16]
+    first, second = aggregate.TypeTotals(), aggregate.TypeTotals()
+    for index, value in enumerate(values):
+        totals = first if index < 5 else second
+        totals.add(homework.InfoMessage('Running', value, value, 0, value))
+    first.merge(second)
+    assert first.count == len(values)
+    for total in (first.duration, first.distance, first.calories):
+        assert total == math.fsum(values), (
+            'Итоги должны складываться с компенсацией округления'
+        )
+
+
+def test_window_totals():
+    aggregator = make_aggregator()
+    window = aggregator.window_totals('anna', 'Running', 3 * DAY + 20)
+    assert window.count == 3, (
+        'В окне должны остаться только последние три дня.'
+    )
+    assert window.distance == pytest.approx(sum(
+        running(data).distance
+        for data in ([9000, 1, 75], [420, 4, 20], [1206, 12, 6])
+    ))
+    assert aggregator.window_totals('nobody', 'Running', 0).count == 0
+
+
+def test_late_events():
+    aggregator = make_aggregator()
+    aggregator.add_package('anna', 'RUN', [15000, 1, 75], 0)
+    assert aggregator.late == 1
+    assert aggregator.totals('anna', 'Running').count == 5
+
+
+def test_snapshot_restore():
+    aggregator = make_aggregator()
+    snapshot = json.loads(json.dumps(aggregator.snapshot()))
+    restored = aggregate.StreamingAggregator.restore(snapshot)
+    assert restored.snapshot() == aggregator.snapshot()
+    restored.add_package('anna', 'RUN', [15000, 1, 75], 4 * DAY)
+    assert restored.totals('anna', 'Running').count == 5
+
+
+def test_evict_idle():
+    aggregator = make_aggregator()
+    evicted = aggregator.evict_idle(5 * DAY)
+    assert set(evicted) == {('anna', 'Swimming')}
+    assert len(aggregator) == 2
@@ -0,0 +1,192 @@
+import pytest
+
+import batch
+import homework
+
+
+PACKAGES = [
+    ('SWM', [[720, 1, 80, 25, 40], [420, 4, 20, 42, 4], [1206, 12, 6, 12, 6]]),
+    ('RUN', [[15000, 1, 75], [420, 4, 20], [1206, 12, 6]]),
+    ('WLK', [[9000, 1, 75, 180], [9000, 1.5, 75, 180],
+             [3000.33, 2.512, 75.8, 180.1]]),
+]
+
+
+@pytest.mark.parametrize('workout_type, packages', PACKAGES)
+def test_compute_batch_matches_scalar(workout_type, packages):
+    names = batch.get_columns(homework.WORKOUT_TYPES[workout_type])
+    columns = dict(zip(names, map(list, zip(*packages))))
+    result = batch.compute_batch(workout_type, columns)
+    assert len(result) == len(packages)
+    for i, data in enumerate(packages):
+        info = homework.read_package(workout_type, data).show_training_info()
+        assert result.training_type == info.training_type
+        for name in ('duration', 'distance', 'speed', 'calories'):
+            assert getattr(result, name)[i] == pytest.approx(
+                getattr(info, name), rel=0, abs=1e-9
+            ), (
+                f'Пакетный расчёт `{name}` должен совпадать '
+                'с расчётом в классах тренировок.'
+            )
+
+
+def test_compute_batch_unknown_type():
+    with pytest.raises(ValueError):
+        batch.compute_batch('PPP', {'action': [1]})
+
+
+@pytest.mark.parametrize('columns', [
+    {'action': [1, 2], 'duration': [1, 2]},
+    {'action': [1, 2], 'duration': [1, 2], 'weight': [1]},
+])
+def test_compute_batch_bad_columns(columns):
+    with pytest.raises(ValueError):
+        batch.compute_batch('RUN', columns)
+
+
+@pytest.mark.parametrize('workout_type, packages', PACKAGES)
+def test_training_batch(workout_type, packages):
+    training_batch = batch.TrainingBatch.from_packages(workout_type, packages)
+    assert len(training_batch) == len(packages)
+    result = training_batch.compute()
+    for i, data in enumerate(packages):
+        training = training_batch[i]
+        assert type(training) is homework.WORKOUT_TYPES[workout_type]
+        expected = homework.read_package(workout_type, data)
+        assert training.get_spent_calories() == pytest.approx(
+            expected.get_spent_calories()
+        )
+        assert result.calories[i] == pytest.approx(
+            expected.get_spent_calories()
+        )
+
+
+def test_training_batch_arity():
+    training_batch = batch.TrainingBatch(homework.Running)
+    with pytest.raises(TypeError):
+        training_batch.append(1, 2)
+
+
+def test_slots():
+    for cls in (homework.Running, homework.SportsWalking, homework.Swimming):
+        assert '__slots__' in vars(cls), (
+            f'Класс `{cls.__name__}` должен объявлять `__slots__`.'
+        )
+    info = homework.InfoMessage('Running', 1, 2, 3, 4)
+    assert not hasattr(info, '__dict__')
+
+
+def test_compute_batch_generic_kernel():
+    class Cycling(homework.Running):
+        LEN_STEP = 3.0
+
+        def get_spent_calories(self):
+            return self.get_distance() * self.weight
+
+    homework.register_workout('CYC')(Cycling)
+    try:
+        assert batch.get_kernel(Cycling) is not batch.BATCH_KERNELS[
+            homework.Running
+        ], 'Ядро предка не подходит, если формулы переопределены.'
+        packages = [[1000, 1, 70], [2000, 2, 80]]
+        result = batch.TrainingBatch.from_packages('CYC', packages).compute()
+        assert list(result.calories) == [
+            Cycling(*data).get_spent_calories() for data in packages
+        ]
+    finally:
+        homework.unregister_workout('CYC')
+
+
+@pytest.mark.parametrize('fields', [
+    ('calories',), ('distance',), ('speed',), ('speed', 'calories'),
+])
+@pytest.mark.parametrize('workout_type', ['RUN', 'WLK', 'SWM'])
+def test_compute_batch_projection(workout_type, fields):
+    packages = {
+        'RUN': [[15000, 1, 75], [420, 4, 20]],
+        'WLK': [[9000, 1, 75, 180], [3000.33, 2.512, 75.8, 180.1]],
+        'SWM': [[720, 1, 80, 25, 40], [420, 4, 20, 42, 4]],
+    }[workout_type]
+    full = batch.TrainingBatch.from_packages(workout_type, packages)
+    expected = full.compute()
+    result = full.compute(fields)
+    for name in batch.FIELDS:
+        if name in fields:
+            assert getattr(result, name) == getattr(expected, name), (
+                'Проекция должна совпадать с полным расчётом.'
+            )
+        else:
+            assert getattr(result, name) is None
+    assert result.duration == expected.duration
+
+
+def test_compute_batch_projection_generic():
+    calls = []
+
+    class Rowing(homework.Training):
+        def get_distance(self):
+            calls.append('distance')
+            return super().get_distance()
+
+        def get_spent_calories(self):
+            calls.append('calories')
+            return self.weight * self.duration
+
+    columns = {'action': [1000, 2000], 'duration': [1, 2], 'weight': [70, 80]}
+    result = batch.compute_columns(Rowing, columns, ('calories',))
+    assert list(result.calories) == [70, 160]
+    assert calls == ['calories', 'calories']
+    with pytest.raises(ValueError):
+        batch.compute_columns(Rowing, columns, ('pace',))
+
+
+@pytest.mark.parametrize('workout_type, packages', PACKAGES)
+@pytest.mark.parametrize('typecode', ['d', 'f'])
+def test_float32_precision_bound(workout_type, packages, typecode):
+    training_batch = batch.TrainingBatch(
+        homework.WORKOUT_TYPES[workout_type], typecode
+    )
+    training_batch.extend(packages)
+    result = training_batch.compute(precision='float32')
+    assert result.calories.itemsize == 4
+    bound = batch.FLOAT32_BOUND if typecode == 'f' else 2.0 ** -24
+    for i, data in enumerate(packages):
+        info = homework.read_package(workout_type, data).show_training_info()
+        for name in ('distance', 'speed', 'calories'):
+            assert getattr(result, name)[i] == pytest.approx(
+                getattr(info, name), rel=bound, abs=0
+            ), f'Ошибка `{name}` во float32 превышает заявленную границу.'
+
+
+def test_compute_batch_float64_is_exact():
+    workout_type, packages = PACKAGES[2]
+    result = batch.TrainingBatch.from_packages(workout_type,
+                                               packages).compute()
+    assert list(result.calories) == [
+        homework.read_package(workout_type, data).get_spent_calories()
+        for data in packages
+    ]
+    with pytest.raises(ValueError):
+        batch.compute_batch(workout_type, {}, precision='float16')
+
+
+def test_column_sum():
+    values = [1e16, 1.0, -1e16, 1.0] * 1000
+    assert batch.column_sum(values, 'exact') == 2000.0
+    assert batch.column_sum(values, 'compensated') == 2000.0
+    assert batch.column_sum(values, 'naive') != 2000.0, (
+        'Последовательное сложение теряет малые слагаемые.'
+    )
+    result = batch.compute_batch('RUN', {'action': [15000, 20000],
+                                         'duration': [1, 2],
+                                         'weight': [75, 80]})
+    assert result.total('calories') == pytest.approx(
+        sum(result.calories), rel=1e-15
+    )
+    with pytest.raises(ValueError):
+        batch.column_sum(values, 'kahan')
+    with pytest.raises(ValueError):
+        batch.compute_batch('RUN', {'action': [1], 'duration': [1],
+                                    'weight': [1]}, ('speed',)).total(
+            'calories'
+        )
@@ -0,0 +1,64 @@
+import pytest
+
+import benchmark
+
+
+def make_results(values):
+    return {'results': [
+        {'benchmark': 'methods', 'name': name, 'size': 1000,
+         'value': value, 'unit': 's'}
+        for name, value in values.items()
+    ]}
+
+
+@pytest.mark.parametrize('threshold, expected', [
+    (0.1, ['slower']),
+    (0.6, []),
+])
+def test_compare(threshold, expected):
+    baseline = make_results({'slower': 1.0, 'faster': 1.0, 'same': 1.0})
+    current = make_results({'slower': 1.5, 'faster': 0.5, 'same': 1.05,
+                            'new': 1.0})
+    regressions = benchmark.compare(baseline, current, threshold)
+    assert [item['name'] for item in regressions] == expected
+
+
+def test_compare_directions():
+    baseline = {'results': [
+        {'benchmark': 'batch', 'name': 'speedup', 'size': 1000,
+         'value': 10.0, 'unit': 'x', 'better': 'higher'},
+        {'benchmark': 'batch', 'name': 'faster', 'size': 1000,
+         'value': 10.0, 'unit': 'x', 'better': 'higher'},
+        {'benchmark': 'dedup', 'name': 'rate', 'size': 1000,
+         'value': 10.0, 'unit': '%', 'better': None},
+        {'benchmark': 'methods', 'name': 'time', 'size': 1000,
+         'value': 1.0, 'unit': 's'},
+    ]}
+    current = {'results': [
+        {**result, 'value': value}
+        for result, value in zip(baseline['results'], (5.0, 20.0, 50.0, 2.0))
+    ]}
+    regressions = benchmark.compare(baseline, current, 0.1)
+    assert [item['name'] for item in regressions] == ['speedup', 'time'], (
+        'Падение значения HIGHER — ухудшение, справочные значения '
+        'не сравниваются'
+    )
+    assert regressions[0]['change'] == pytest.approx(0.5)
+
+
+def test_run_benchmarks_records_results(capsys):
+    results = benchmark.run_benchmarks(['construction'], [10])
+    names = {result['name'] for result in results['results']}
+    assert 'RUN read_package' in names
+    assert all(result['unit'] == 's' for result in results['results'])
+    assert 'python' in results['meta']
+
+
+def test_over_budget():
+    results = {'results': [
+        {'benchmark': 'startup', 'name': 'import cli', 'size': 1,
+         'value': value, 'unit': 'ms'}
+        for value in (10.0, 40.0)
+    ]}
+    exceeded = benchmark.over_budget(results, 25.0)
+    assert [item['value'] for item in exceeded] == [40.0]
@@ -0,0 +1,65 @@
+import threading
+
+import pytest
+
+import cache
+import homework
+
+
+def test_result_cache_lru():
+    result_cache = cache.ResultCache(maxsize=2)
+    first = result_cache.get_info('RUN', [15000, 1, 75])
+    assert first == homework.read_package(
+        'RUN', [15000, 1, 75]
+    ).show_training_info()
+    assert result_cache.get_info('RUN', (15000, 1, 75)) is first
+    result_cache.get_info('SWM', [720, 1, 80, 25, 40])
+    result_cache.get_info('RUN', [15000, 1, 75])
+    result_cache.get_info('WLK', [9000, 1, 75, 180])
+    stats = result_cache.stats()
+    assert (stats.hits, stats.misses, stats.evictions) == (2, 3, 1)
+    assert stats.size == 2
+    assert stats.hit_rate == pytest.approx(0.4)
+    result_cache.get_info('RUN', [15000, 1, 75])
+    assert result_cache.stats().hits == 3, (
+        'Последний использованный пакет не должен вытесняться.'
+    )
+
+
+def test_result_cache_keys_by_value_types():
+    result_cache = cache.ResultCache()
+    first = result_cache.get_info('RUN', [15000, 1, 75])
+    as_float = result_cache.get_info('RUN', [15000, 1.0, 75])
+    as_bool = result_cache.get_info('RUN', [15000, True, 75])
+    assert as_float is not first and as_bool is not first, (
+        'Пакеты с разными типами значений не должны делить запись кэша'
+    )
+    assert as_float.duration == 1.0 and type(as_float.duration) is float
+    assert type(as_bool.duration) is bool
+    assert result_cache.stats().misses == 3
+
+
+def test_result_cache_errors_not_cached():
+    result_cache = cache.ResultCache()
+    with pytest.raises(ValueError):
+        result_cache.get_info('PPP', [1, 1, 1])
+    assert len(result_cache) == 0
+
+
+def test_result_cache_threads():
+    result_cache = cache.ResultCache(maxsize=8)
+    packages = [('RUN', [1000 * i, 1, 75]) for i in range(1, 17)]
+
+    def work():
+        for _ in range(50):
+            for package in packages:
+                result_cache.get_info(*package)
+
+    threads = [threading.Thread(target=work) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    stats = result_cache.stats()
+    assert stats.hits + stats.misses == 4 * 50 * 16
+    assert stats.size == 8
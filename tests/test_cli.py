@@ -0,0 +1,99 @@
+import json
+import subprocess
+import sys
+
+import pytest
+
+import cli
+import homework
+from conftest import BASE_DIR, Capturing
+
+
+def expected_message(workout_type, data):
+    return homework.read_package(
+        workout_type, data
+    ).show_training_info().get_message()
+
+
+def test_main_packages(capsys):
+    code = cli.main(['-p', 'RUN,15000,1,75', '-p', 'SWM,720,1,80,25,40'])
+    output = capsys.readouterr().out.splitlines()
+    assert code == 0
+    assert output == [
+        expected_message('RUN', [15000, 1, 75]),
+        expected_message('SWM', [720, 1, 80, 25, 40]),
+    ]
+
+
+@pytest.mark.parametrize('package, error', [
+    ('PPP,1,2', 'Код тренировки "PPP" некорректен!'),
+    ('WLK,9000,1', 'SportsWalking ожидает 4 значений, получено 2.'),
+    ('RUN,15000,0,75', 'Поле duration вне допустимого диапазона: 0.'),
+    ('RUN,x,1,75', 'Не удалось разобрать пакет: RUN,x,1,75'),
+])
+def test_main_errors(capsys, package, error):
+    code = cli.main(['-p', 'RUN,15000,1,75', '-p', package])
+    captured = capsys.readouterr()
+    assert code == 1, 'При отклонённых пакетах код возврата должен быть 1.'
+    assert captured.out.splitlines() == [
+        expected_message('RUN', [15000, 1, 75])
+    ]
+    assert captured.err.splitlines() == [error]
+
+
+@pytest.mark.parametrize('strict', [False, True])
+def test_strict_rejects_bool(capsys, strict):
+    lines = ['{"workout_type": "RUN", "data": [15000, true, 75]}']
+    with Capturing():
+        failed = cli.run(lines, 'jsonl', strict=strict)
+    assert failed == int(strict)
+
+
+def test_main_files(tmp_path, capsys):
+    packages = tmp_path / 'packages.jsonl'
+    packages.write_text(
+        '["SWM", [720, 1, 80, 25, 40]]\n'
+        '\n'
+        '{"workout_type": "WLK", "data": [9000, 1, 75, 180]}\n',
+        encoding='utf-8',
+    )
+    output = tmp_path / 'messages.jsonl'
+    code = cli.main([str(packages), '--format', 'jsonl', '-p',
+                     'RUN,15000,1,75', '-o', str(output),
+                     '--output-format', 'jsonl'])
+    assert code == 0
+    assert capsys.readouterr().out == '', (
+        'С `--output` сообщения не должны выводиться в stdout.'
+    )
+    records = [
+        json.loads(line)
+        for line in output.read_text(encoding='utf-8').splitlines()
+    ]
+    assert [record['training_type'] for record in records] == [
+        'Running', 'Swimming', 'SportsWalking'
+    ]
+
+
+def test_import_is_lazy():
+    heavy = ('batch', 'sinks', 'validate', 'ingest', 'dataclasses',
+             'inspect', 'argparse', 'json')
+    completed = subprocess.run(
+        [sys.executable, '-c',
+         'import sys, cli; print(*sorted(set(sys.argv[1:]) & '
+         'set(sys.modules)))', *heavy],
+        cwd=BASE_DIR, capture_output=True, text=True, check=True,
+    )
+    assert completed.stdout.split() == [], (
+        f'`import cli` загрузил лишние модули: {completed.stdout}'
+    )
+
+
+def test_python_m_cli():
+    completed = subprocess.run(
+        [sys.executable, '-m', 'cli'], input='RUN,15000,1,75\n',
+        cwd=BASE_DIR, capture_output=True, text=True,
+    )
+    assert completed.returncode == 0
+    assert completed.stdout.splitlines() == [
+        expected_message('RUN', [15000, 1, 75])
+    ]
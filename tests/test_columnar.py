@@ -0,0 +1,75 @@
+import pytest
+from conftest import PACKAGES
+
+import batch
+import columnar
+import homework
+
+
+@pytest.mark.parametrize('workout_type', PACKAGES)
+def test_columnar_round_trip(tmp_path, workout_type):
+    packages = PACKAGES[workout_type]
+    path = str(tmp_path / f'{workout_type}.hwtc')
+    assert columnar.write_packages(path, workout_type, packages) == len(
+        packages
+    )
+    with columnar.ColumnarFile(path) as file:
+        assert file.workout_type == workout_type
+        assert len(file) == len(packages)
+        assert list(file.columns) == list(
+            batch.get_columns(homework.WORKOUT_TYPES[workout_type])
+        )
+        assert all(
+            isinstance(column, memoryview)
+            for column in file.columns.values()
+        )
+        assert file[-1] == tuple(packages[-1])
+        expected = homework.read_package(workout_type, packages[1])
+        assert file.read_package(1).get_spent_calories() == pytest.approx(
+            expected.get_spent_calories()
+        )
+        result = file.compute()
+        for i, data in enumerate(packages):
+            info = homework.read_package(workout_type, data)
+            assert result.calories[i] == pytest.approx(
+                info.get_spent_calories()
+            )
+        with pytest.raises(IndexError):
+            file[len(packages)]
+
+
+def test_columnar_errors(tmp_path):
+    path = tmp_path / 'bad.hwtc'
+    with pytest.raises(ValueError):
+        columnar.write_packages(str(path), 'PPP', [])
+    with pytest.raises(TypeError):
+        columnar.write_packages(str(path), 'RUN', [[1, 2]])
+    path.write_bytes(b'x' * 64)
+    with pytest.raises(ValueError):
+        columnar.ColumnarFile(str(path))
+
+
+def test_columnar_long_name(tmp_path):
+    path = tmp_path / 'long.hwtc'
+    with pytest.raises(ValueError):
+        columnar.write_columns(
+            str(path), 'RUN', {'a' * 17: [1.0]}, names=['a' * 17]
+        )
+    assert not path.exists(), (
+        'Файл не должен создаваться при слишком длинном имени столбца'
+    )
+
+
+def test_columnar_corrupt_file(tmp_path):
+    path = tmp_path / 'runs.hwtc'
+    columnar.write_packages(str(path), 'RUN', [[9000, 1, 75], [420, 4, 20]])
+    raw = path.read_bytes()
+    path.write_bytes(raw[:-1])
+    with pytest.raises(ValueError, match='обрезан'):
+        columnar.ColumnarFile(str(path))
+    path.write_bytes(raw[:8] + b'XXX\0' + raw[12:])
+    with pytest.raises(ValueError):
+        columnar.ColumnarFile(str(path))
+    path.write_bytes(raw[:10])
+    with pytest.raises(ValueError):
+        columnar.ColumnarFile(str(path))
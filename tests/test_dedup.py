@@ -0,0 +1,113 @@
+import pytest
+
+import dedup
+import store
+
+ROWS = [
+    ('watch-1', 0.0, 'RUN', [15000, 1, 75]),
+    ('watch-1', 0.0, 'RUN', [15000, 1, 75]),
+    ('watch-2', 0.0, 'RUN', [15000, 1, 75]),
+    ('watch-1', 10.0, 'RUN', [15000, 1, 75]),
+    ('watch-1', 10.0, 'SWM', [720, 1, 80, 25, 40]),
+    ('watch-1', 0.0, 'RUN', [15000, 1, 75]),
+]
+
+
+@pytest.mark.parametrize('key', [dedup.fingerprint,
+                                 dedup.stable_fingerprint])
+def test_filter_drops_replays(key):
+    deduplicator = dedup.Deduplicator(key=key)
+    assert list(deduplicator.filter(ROWS)) == [
+        ROWS[0], ROWS[2], ROWS[3], ROWS[4]
+    ]
+    assert deduplicator.stats.duplicates == 2
+    assert deduplicator.stats.rate == pytest.approx(2 / 6)
+    assert deduplicator.snapshot()['keys'] == 4
+
+
+def test_stable_fingerprint():
+    key = dedup.stable_fingerprint(*ROWS[0])
+    assert 0 <= key <= dedup.MASK_64
+    assert key == dedup.stable_fingerprint(*ROWS[1])
+    assert key != dedup.stable_fingerprint(*ROWS[2])
+    assert key != dedup.stable_fingerprint(*ROWS[3])
+
+
+@pytest.mark.parametrize('key', [dedup.fingerprint,
+                                 dedup.stable_fingerprint])
+def test_fingerprint_ignores_int_float(key):
+    deduplicator = dedup.Deduplicator(key=key)
+    rows = [
+        ('watch-1', 0, 'RUN', [15000, 1, 75]),
+        ('watch-1', 0.0, 'RUN', (15000.0, 1.0, 75.0)),
+        ('watch-1', 0.0, 'RUN', [15000, 1, 10 ** 400]),
+        ('watch-1', 0.0, 'RUN', [15000, 1, 10 ** 400]),
+    ]
+    assert list(deduplicator.filter(rows)) == [rows[0], rows[2]], (
+        'Пакеты, различающиеся только int и float, должны считаться повтором'
+    )
+
+
+def test_window_and_max_keys():
+    deduplicator = dedup.Deduplicator(window=60, max_keys=2)
+    row = ('watch-1', 0.0, 'RUN', [15000, 1, 75])
+    assert not deduplicator.seen(*row)
+    assert not deduplicator.seen('watch-1', 30.0, 'RUN', [1, 1, 75])
+    assert deduplicator.seen(*row)
+    assert not deduplicator.seen('watch-1', 61.0, 'RUN', [2, 1, 75])
+    assert deduplicator.stats.expired == 1
+    assert not deduplicator.seen(*row), (
+        'Отпечаток за пределами окна должен забываться.'
+    )
+    assert deduplicator.stats.evicted == 1
+    assert len(deduplicator) == 2, 'Индекс не должен превышать max_keys.'
+
+
+def test_bloom_filter():
+    bloom = dedup.BloomFilter(1000, 0.01)
+    keys = [dedup.fingerprint('watch', index, 'RUN', [index])
+            for index in range(1000)]
+    assert sum(bloom.add(key) for key in keys) < 30
+    assert all(key in bloom for key in keys), (
+        'Фильтр Блума не должен терять добавленные ключи.'
+    )
+    false_positives = sum(
+        dedup.fingerprint('other', index, 'RUN', [index]) in bloom
+        for index in range(10000)
+    )
+    assert false_positives < 300
+    with pytest.raises(ValueError):
+        dedup.BloomFilter(0)
+
+
+def test_rotating_bloom_extends_window():
+    bloom = dedup.RotatingBloom(window=1000, capacity=100)
+    deduplicator = dedup.Deduplicator(window=10, max_keys=10, bloom=bloom)
+    row = ('watch-1', 0.0, 'RUN', [15000, 1, 75])
+    assert not deduplicator.seen(*row)
+    for index in range(1, 20):
+        deduplicator.seen('watch-1', float(index * 20), 'RUN', [index, 1, 1])
+    assert len(deduplicator) < 10
+    assert deduplicator.seen(*row), 'Фильтр Блума должен помнить повтор.'
+    assert deduplicator.stats.bloom_duplicates == 1
+    for index in range(3):
+        bloom.add(index, 2000.0 + 600 * index)
+    assert not deduplicator.seen(*row), (
+        'Фильтр Блума должен забывать ключи старше окна.'
+    )
+
+
+def test_rotating_bloom_forgets_after_gap():
+    bloom = dedup.RotatingBloom(window=10, capacity=100)
+    assert not bloom.add(1, 0.0)
+    assert not bloom.add(2, 100.0)
+    assert not bloom.add(1, 100.0), (
+        'После перерыва длиной в окно фильтр Блума должен забыть ключи.'
+    )
+
+
+def test_store_behind_deduplicator():
+    deduplicator = dedup.Deduplicator()
+    with store.TrainingStore() as training_store:
+        stats = training_store.add_many(deduplicator.filter(ROWS))
+        assert stats.processed == len(training_store) == 4
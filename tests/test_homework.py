@@ -451,3 +451,118 @@ def test_main_output(input_data, expected):
     assert get_message_output == expected, (
         'Метод `main` должен печатать результат в консоль.\n'
     )
+
+
+@pytest.mark.parametrize('input_data', [
+    ['SWM', [720, 1, 80, 25, 40]],
+    ['RUN', [15000, 1, 75]],
+    ['WLK', [9000, 1, 75, 180]],
+])
+def test_memoized(input_data):
+    workout_type, data = input_data
+    training_class = homework.WORKOUT_TYPES[workout_type]
+    memoized_class = homework.memoized(training_class)
+    assert issubclass(memoized_class, training_class)
+    assert memoized_class.__name__ == training_class.__name__
+    training = memoized_class(*data)
+    expected = training_class(*data)
+    assert training.show_training_info() == expected.show_training_info()
+    assert training._metrics, (
+        'Показатели должны запоминаться после первого расчёта.'
+    )
+    training.duration = expected.duration = 2
+    training.action = expected.action = 1000
+    assert training.show_training_info() == expected.show_training_info(), (
+        'Запомненные показатели должны сбрасываться при изменении данных.'
+    )
+
+
+class Rowing(homework.Training):
+    """Тренировка: гребля."""
+
+    LEN_STEP: float = 5.0
+
+    def get_spent_calories(self) -> float:
+        return self.get_mean_speed() * self.weight
+
+
+def test_register_workout():
+    homework.register_workout('ROW')(Rowing)
+    try:
+        assert homework.get_arity(Rowing) == 3
+        training = homework.read_package('ROW', [1000, 2, 80])
+        assert isinstance(training, Rowing)
+        assert training.get_spent_calories() == pytest.approx(200.0)
+        with pytest.raises(ValueError):
+            homework.register_workout('ROW')(homework.Running)
+    finally:
+        homework.unregister_workout('ROW')
+    with pytest.raises(ValueError):
+        homework.read_package('ROW', [1000, 2, 80])
+
+
+def test_register_workout_validates_constructor():
+    class Varargs(homework.Training):
+        def __init__(self, *data):
+            super().__init__(*data)
+
+    with pytest.raises(TypeError):
+        homework.register_workout('VAR')(Varargs)
+    with pytest.raises(TypeError):
+        homework.register_workout('STR')(str)
+    assert 'VAR' not in homework.WORKOUT_TYPES
+
+
+def test_load_workout_entry_point(monkeypatch):
+    from importlib.metadata import EntryPoint
+
+    entry_point = EntryPoint(
+        name='ROW', value='test_homework:Rowing',
+        group=homework.ENTRY_POINT_GROUP,
+    )
+    monkeypatch.setattr(homework, '_entry_points', lambda: {
+        'ROW': entry_point
+    })
+    try:
+        training = homework.read_package('ROW', [1000, 2, 80])
+        assert type(training).__name__ == 'Rowing'
+        assert 'ROW' in homework.WORKOUT_TYPES, (
+            'Плагин должен регистрироваться при первой загрузке.'
+        )
+    finally:
+        homework.unregister_workout('ROW')
+
+
+@pytest.mark.parametrize('input_data', [
+    ('SWM', [720, 1, 80, 25, 40]),
+    ('RUN', [15000, 1, 75]),
+    ('WLK', [9000, 1, 75, 180]),
+])
+def test_lazy_training_info(input_data):
+    training = homework.read_package(*input_data)
+    lazy = training.lazy_training_info()
+    info = training.show_training_info()
+    assert lazy.get_message() == info.get_message()
+    assert str(lazy) == str(info)
+    assert lazy == info and info == lazy
+    assert lazy.to_info() == info
+
+
+def test_lazy_training_info_computes_on_access():
+    training = homework.read_package('RUN', [15000, 1, 75])
+    calls = []
+    for name in ('get_distance', 'get_mean_speed', 'get_spent_calories'):
+        method = getattr(training, name)
+        setattr(training, name, lambda method=method, name=name: (
+            calls.append(name) or method()
+        ))
+    lazy = training.lazy_training_info()
+    assert (lazy.training_type, lazy.duration) == ('Running', 1)
+    assert calls == [], 'Тип и длительность не требуют расчёта показателей.'
+    assert lazy.calories == pytest.approx(797.805)
+    assert lazy.calories == pytest.approx(797.805)
+    assert calls.count('get_spent_calories') == 1, (
+        'Показатель должен считаться один раз.'
+    )
+    with pytest.raises(AttributeError):
+        lazy.unknown
@@ -0,0 +1,106 @@
+import io
+
+import pytest
+
+import homework
+import ingest
+
+
+CSV = (
+    'SWM,720,1,80,25,40\n'
+    '\n'
+    '# комментарий\n'
+    'RUN,15000,1,75\n'
+    'PPP,9000,1,75,180\n'
+    'WLK,9000,1.5,75,180\n'
+    'WLK,x,1,75,180\n'
+)
+JSONL = (
+    '["SWM", [720, 1, 80, 25, 40]]\n'
+    '{"workout_type": "RUN", "data": [15000, 1, 75]}\n'
+    '["PPP", [9000, 1, 75, 180]]\n'
+    '{"workout_type": "WLK", "data": [9000, 1.5, 75, 180]}\n'
+    '{"data": []}\n'
+)
+EXPECTED = [
+    ('SWM', [720, 1, 80, 25, 40]),
+    ('RUN', [15000, 1, 75]),
+    ('WLK', [9000, 1.5, 75, 180]),
+]
+
+
+@pytest.mark.parametrize('text, fmt', [(CSV, 'csv'), (JSONL, 'jsonl')])
+def test_process_stream(text, fmt):
+    stats = ingest.IngestStats()
+    result = ingest.process_stream(io.StringIO(text), fmt, stats,
+                                   chunk_size=8)
+    assert not isinstance(result, list), (
+        '`process_stream` должна возвращать сообщения лениво.'
+    )
+    expected = [
+        homework.read_package(*package).show_training_info()
+        for package in EXPECTED
+    ]
+    assert list(result) == expected
+    assert stats.processed == 3
+    assert stats.rejected == {'PPP': 1}
+    assert stats.malformed == 1
+    assert 'PPP: 1' in str(stats)
+
+
+def test_parse_csv_line_numbers():
+    workout_type, data = ingest.parse_csv_line('WLK, 9000, 1.5, 75, 180')
+    assert workout_type == 'WLK'
+    assert data == [9000, 1.5, 75, 180]
+    assert type(data[0]) is int
+
+
+def write_files(tmp_path, count=12):
+    paths = []
+    for index in range(count):
+        path = tmp_path / f'device-{index}.csv'
+        path.write_text(
+            f'RUN,{1000 * (index + 1)},1,75\n'
+            f'WLK,{900 * (index + 1)},1,75,180\n'
+            'WLK,x,1,75,180\n',
+            encoding='utf-8',
+        )
+        paths.append(str(path))
+    return paths
+
+
+@pytest.mark.parametrize('workers, prefetch', [(1, 1), (4, 2), (4, None)])
+def test_process_files_ordered(tmp_path, workers, prefetch):
+    paths = write_files(tmp_path)
+    serial_stats = ingest.IngestStats()
+    serial = list(ingest.process_paths(paths, 'csv', serial_stats))
+    stats = ingest.IngestStats()
+    result = ingest.process_files(paths, 'csv', stats, workers, prefetch)
+    assert list(result) == serial, (
+        'Порядок сообщений должен совпадать с последовательным чтением.'
+    )
+    assert stats == serial_stats
+    assert stats.malformed == len(paths)
+
+
+def test_process_files_unordered(tmp_path):
+    paths = write_files(tmp_path)
+    serial = list(ingest.process_paths(paths))
+    result = list(ingest.process_files(paths, workers=4, ordered=False))
+    assert sorted(map(str, result)) == sorted(map(str, serial))
+
+
+def test_iter_decoded_prefetch(tmp_path, monkeypatch):
+    paths = write_files(tmp_path)
+    submitted = []
+    read_file = ingest.read_file
+
+    def counting_read_file(path, *args):
+        submitted.append(path)
+        return read_file(path, *args)
+
+    monkeypatch.setattr(ingest, 'read_file', counting_read_file)
+    decoded = ingest.iter_decoded(paths, workers=2, prefetch=3)
+    next(decoded)
+    assert len(submitted) <= 3, 'Вперёд читается не больше prefetch файлов.'
+    decoded.close()
@@ -0,0 +1,99 @@
+import cProfile
+import io
+
+from conftest import Capturing
+
+import cache
+import homework
+import ingest
+import instrument
+import validate
+
+
+def run_packages():
+    for workout_type, data in [('RUN', [15000, 1, 75]),
+                               ('SWM', [720, 1, 80, 25, 40]),
+                               ('RUN', [9000, 1, 75])]:
+        homework.main(homework.read_package(workout_type, data))
+
+
+def test_instrumentation_counts_stages():
+    read_package = homework.read_package
+    show_training_info = homework.Training.show_training_info
+    with instrument.Instrumentation() as instrumentation:
+        assert instrumentation.enabled
+        assert cache.read_package is not read_package, (
+            'Замеры должны подменять `read_package` и в других модулях.'
+        )
+        with Capturing() as output:
+            run_packages()
+    assert len(output) == 3
+    assert homework.read_package is read_package
+    assert cache.read_package is read_package
+    assert homework.Training.show_training_info is show_training_info
+    assert not hasattr(homework, 'print'), (
+        'После выключения замеров `print` в homework должен быть встроенным.'
+    )
+    timers = instrumentation.as_dict()
+    assert set(timers) == set(instrument.STAGES)
+    assert timers['read_package']['RUN']['count'] == 2
+    assert timers['show_training_info']['Swimming']['count'] == 1
+    assert timers['output']['Running']['count'] == 2
+    assert timers['get_message']['Running']['seconds'] >= 0
+    text = instrumentation.to_prometheus()
+    assert (
+        'homework_stage_calls_total{stage="read_package",type="RUN"} 2'
+        in text
+    )
+    assert '# TYPE homework_stage_seconds_total counter' in text
+
+
+def test_instrumentation_counts_checked_packages():
+    stream = io.StringIO('RUN,15000,1,75\nSWM,720,1,80,25,40\n')
+    with instrument.Instrumentation() as instrumentation:
+        messages = list(ingest.process_stream(stream))
+    assert len(messages) == 2
+    timers = instrumentation.as_dict()
+    assert set(timers['read_package']) == {'RUN', 'SWM'}, (
+        'Пакеты, проверенные `read_checked`, должны попадать '
+        'в этап read_package.'
+    )
+    assert ingest.read_checked is validate.read_checked
+
+
+def test_prometheus_labels():
+    instrumentation = instrument.Instrumentation()
+    with instrumentation:
+        for code in ('P"P\nX', ['RUN'], 'RUN'):
+            try:
+                ingest.read_checked(code, [15000, 1, 75])
+            except ValueError:
+                pass
+    assert set(instrumentation.as_dict()['read_package']) == {
+        'RUN', 'unknown'
+    }, 'Незарегистрированные коды должны сводиться к одной метке.'
+    instrumentation.observe('output', 'a\\b"c\nd', 1.0)
+    text = instrumentation.to_prometheus()
+    assert 'type="a\\\\b\\"c\\nd"} 1' in text
+    assert len(text.splitlines()) == 4 + 2 * len(instrumentation.timers), (
+        'Перевод строки в метке не должен разрывать строку метрики.'
+    )
+
+
+def test_run_profiled():
+    with Capturing():
+        result, profiler = instrument.run_profiled(run_packages)
+    assert result is None
+    assert isinstance(profiler, cProfile.Profile)
+
+    class Sampler:
+        calls = []
+
+        def start(self):
+            self.calls.append('start')
+
+        def stop(self):
+            self.calls.append('stop')
+
+    _, sampler = instrument.run_profiled(sum, [1, 2], profiler=Sampler())
+    assert sampler.calls == ['start', 'stop']
@@ -0,0 +1,79 @@
+import pytest
+
+import homework
+import live
+
+
+def assert_info_equal(actual, expected):
+    assert actual.training_type == expected.training_type
+    for name in ('duration', 'distance', 'speed', 'calories'):
+        assert getattr(actual, name) == pytest.approx(
+            getattr(expected, name)
+        ), f'Показатель {name} сессии должен совпадать с расчётом пакета.'
+
+
+@pytest.mark.parametrize('workout_type, static, ticks, data', [
+    ('RUN', {'weight': 75}, [(1, 3, 0)] * 3600 + [(1800, 7200, 0)],
+     [18000, 1.5, 75]),
+    ('WLK', {'weight': 75, 'height': 180}, [(60, 150, 0)] * 60,
+     [9000, 1, 75, 180]),
+    ('SWM', {'weight': 80, 'length_pool': 25},
+     [(90, 72, 1)] * 40, [2880, 1, 80, 25, 40]),
+])
+def test_session_matches_package(workout_type, static, ticks, data):
+    session = live.Session.start(workout_type, **static)
+    for seconds, action, count_pool in ticks:
+        session.update(seconds, action, count_pool)
+    assert session.updates == len(ticks)
+    expected = homework.read_package(workout_type, data).show_training_info()
+    assert_info_equal(session.info(), expected)
+
+
+def test_session_info_cached_until_update():
+    session = live.Session.start('RUN', weight=75)
+    assert session.info().speed == 0.0, (
+        'До первого интервала показатели должны быть нулевыми.'
+    )
+    session.update(60, 150)
+    first = session.info()
+    assert session.info() is first
+    session.update(60, 150)
+    assert session.info() is not first
+    assert session.info().distance == pytest.approx(2 * first.distance)
+
+
+@pytest.mark.parametrize('workout_type, static, match', [
+    ('RUN', {}, 'weight'),
+    ('RUN', {'weight': 75, 'height': 180}, 'height'),
+])
+def test_session_start_errors(workout_type, static, match):
+    with pytest.raises(ValueError, match=match):
+        live.Session.start(workout_type, **static)
+
+
+def test_session_manager():
+    manager = live.SessionManager()
+    manager.start('a', 'RUN', weight=75)
+    manager.start('b', 'SWM', weight=80, length_pool=25)
+    with pytest.raises(ValueError):
+        manager.start('a', 'RUN', weight=75)
+    count = manager.update_many([
+        ('a', 1800, 7500, 0),
+        ('b', 1800, 1440, 20),
+        ('a', 1800, 7500, 0),
+        ('b', 1800, 1440, 20),
+    ])
+    assert count == 4 and len(manager) == 2
+    with pytest.raises(ValueError, match='переплытия'):
+        manager.update('a', 1, 1, 1)
+    assert dict(manager.infos()).keys() == {'a', 'b'}
+    assert_info_equal(
+        manager.finish('a'),
+        homework.read_package('RUN', [15000, 1, 75]).show_training_info(),
+    )
+    assert 'a' not in manager and len(manager) == 1
+    assert_info_equal(
+        manager.info('b'),
+        homework.read_package('SWM', [2880, 1, 80, 25, 40])
+        .show_training_info(),
+    )
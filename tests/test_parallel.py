@@ -0,0 +1,40 @@
+import io
+
+import pytest
+from conftest import Capturing
+
+import ingest
+import parallel
+
+CSV = (
+    'SWM,720,1,80,25,40\n'
+    'RUN,15000,1,75\n'
+    'RUN,15000,1,0\n'
+    'RUN,-100,1,75\n'
+    'PPP,9000,1,75,180\n'
+    'WLK,9000,1,75,180\n'
+    'WLK,x,1,75,180\n'
+    'WLK,9000,1.5,75,180\n'
+    'RUN,1206,12,6\n'
+    'WLK,3000.33,2.512,75.8,180.1\n'
+)
+
+
+@pytest.mark.parametrize('workers, chunk_size', [(1, 100), (2, 1), (2, 3)])
+def test_process_sharded_matches_serial(workers, chunk_size):
+    with Capturing() as serial_output:
+        ingest.run_serial(io.StringIO(CSV))
+    out = io.StringIO()
+    summary = parallel.process_sharded(
+        io.StringIO(CSV), out, workers=workers, chunk_size=chunk_size
+    )
+    assert out.getvalue() == ''.join(
+        f'{line}\n' for line in serial_output
+    ), 'Вывод по шардам должен совпадать с последовательной обработкой.'
+    assert summary.stats.processed == 6
+    assert summary.stats.rejected == {'PPP': 1, 'RUN': 2}
+    assert summary.stats.malformed == 1
+    assert summary.totals['SportsWalking'].count == 3
+    assert summary.totals['Running'].calories == pytest.approx(
+        797.805 + 12.812, abs=1e-3
+    )
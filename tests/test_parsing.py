@@ -0,0 +1,20 @@
+import pytest
+
+import parsing
+
+
+@pytest.mark.parametrize('line, expected', [
+    ('RUN,15000,1,75', ('RUN', [15000, 1, 75])),
+    (' WLK, 9000, 1.5, 75, 180', ('WLK', [9000, 1.5, 75, 180])),
+])
+def test_parse_csv_line(line, expected):
+    workout_type, data = parsing.parse_csv_line(line)
+    assert (workout_type, data) == expected
+    assert [type(value) for value in data] == [
+        type(value) for value in expected[1]
+    ], 'Целые значения должны оставаться int, дробные — float'
+
+
+def test_parse_number_error():
+    with pytest.raises(ValueError):
+        parsing.parse_number('быстро')
@@ -0,0 +1,81 @@
+import pytest
+from conftest import PACKAGES, to_columns
+
+import batch
+import columnar
+import homework
+import recompute
+
+RETUNED = {
+    'RUN': {'CALORIES_MEAN_SPEED_MULTIPLIER': 20},
+    'WLK': {
+        'CALORIES_WEIGHT_MULTIPLIER_1': 0.04,
+        'CALORIES_WEIGHT_MULTIPLIER_2': 0.03,
+    },
+    'SWM': {'CALORIES_MEAN_SPEED_SHIFT': 1.2},
+}
+
+
+@pytest.mark.parametrize('workout_type', PACKAGES)
+def test_recompute_matches_full_rerun(tmp_path, monkeypatch, workout_type):
+    store = recompute.DerivedStore(str(tmp_path))
+    columns = to_columns(workout_type)
+    base = store.build(workout_type, columns, recompute.Profile('v1'))
+    assert base == batch.compute_batch(workout_type, columns)
+
+    profile = recompute.Profile('v2', RETUNED)
+    result = store.recompute(workout_type, profile)
+    training_class = homework.WORKOUT_TYPES[workout_type]
+    for name, value in RETUNED[workout_type].items():
+        monkeypatch.setattr(training_class, name, value)
+    expected = batch.compute_batch(workout_type, columns)
+    assert result == expected, (
+        'Пересчёт калорий должен совпадать с полным перерасчётом.'
+    )
+    assert list(expected.calories) == [
+        homework.read_package(workout_type, data).get_spent_calories()
+        for data in PACKAGES[workout_type]
+    ]
+    assert result.calories != base.calories
+    assert store.versions(workout_type) == ['v1', 'v2']
+    assert store.load(workout_type, 'v1') == base
+    assert store.load(workout_type, 'v2') == result
+
+
+def test_base_file_reads_packages(tmp_path):
+    store = recompute.DerivedStore(str(tmp_path))
+    store.build('RUN', to_columns('RUN'), recompute.Profile('v1'))
+    with columnar.ColumnarFile(str(tmp_path / 'RUN.hwtc')) as file:
+        assert 'speed' in file.columns
+        assert list(file[1]) == PACKAGES['RUN'][1], (
+            'Запись должна содержать только данные пакета без '
+            'рассчитанных столбцов.'
+        )
+        training = file.read_package(0)
+    assert training.show_training_info() == homework.read_package(
+        'RUN', PACKAGES['RUN'][0]
+    ).show_training_info()
+
+
+def test_profile_validation():
+    with pytest.raises(ValueError):
+        recompute.Profile('v1', {'RUN': {'LEN_STEP': 1.0}})
+    with pytest.raises(ValueError):
+        recompute.Profile('v1', {'RUN': {'UNKNOWN': 1.0}})
+    with pytest.raises(ValueError):
+        recompute.Profile('../v1')
+    profile = recompute.Profile('v2', RETUNED)
+    assert recompute.Profile.from_dict(profile.to_dict()) == profile
+    running = profile.training_class('RUN')
+    assert issubclass(running, homework.Running)
+    assert running.CALORIES_MEAN_SPEED_MULTIPLIER == 20
+    assert homework.Running.CALORIES_MEAN_SPEED_MULTIPLIER == 18
+    assert profile.training_class('RUN') is running
+
+
+def test_profile_version_is_immutable(tmp_path):
+    store = recompute.DerivedStore(str(tmp_path))
+    store.save_profile(recompute.Profile('v1', RETUNED))
+    store.save_profile(recompute.Profile('v1', RETUNED))
+    with pytest.raises(ValueError):
+        store.save_profile(recompute.Profile('v1'))
@@ -0,0 +1,53 @@
+import io
+
+import pytest
+
+import batch
+import homework
+import render
+
+MESSAGES = [
+    homework.InfoMessage('Swimming', 1, 75, 1, 80),
+    homework.InfoMessage('Running', 4, 20.0005, 4.1234, 20),
+    homework.InfoMessage('SportsWalking', 12.3456, 6, 12, 6.6666),
+]
+
+
+@pytest.mark.parametrize('message', MESSAGES)
+def test_render(message):
+    assert render.render(message) == message.get_message(), (
+        'Быстрый вывод должен совпадать с `InfoMessage.get_message`.'
+    )
+
+
+@pytest.mark.parametrize('chunk_size', [1, 2, 100])
+def test_render_many(chunk_size):
+    expected = ''.join(f'{message}\n' for message in MESSAGES)
+    out = io.StringIO()
+    render.render_many(MESSAGES, out, chunk_size)
+    assert out.getvalue() == expected
+    assert render.render_many(MESSAGES, chunk_size=chunk_size) == expected
+
+
+def test_render_batch():
+    packages = [[9000, 1, 75, 180], [3000.33, 2.512, 75.8, 180.1]]
+    training_batch = batch.TrainingBatch.from_packages('WLK', packages)
+    expected = ''.join(
+        f'{homework.read_package("WLK", data).show_training_info()}\n'
+        for data in packages
+    )
+    assert render.render_batch(training_batch.compute()) == expected
+
+
+def test_render_batch_projected():
+    training_batch = batch.TrainingBatch.from_packages('RUN', [[9000, 1, 75]])
+    out = io.StringIO()
+    with pytest.raises(ValueError, match='speed, calories'):
+        render.render_batch(training_batch.compute(('distance',)), out)
+    assert out.getvalue() == '', 'При ошибке ничего не должно выводиться'
+
+
+@pytest.mark.parametrize('template', ['{0}', '{name!r}', '{value:^10}'])
+def test_to_printf_unsupported(template):
+    with pytest.raises(ValueError):
+        render.to_printf(template)
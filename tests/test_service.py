@@ -0,0 +1,93 @@
+import asyncio
+import json
+
+import pytest
+
+import homework
+import service
+
+
+async def exchange(frames):
+    tracker = service.TrackerService(queue_size=2, batch_size=2)
+    server = await tracker.start()
+    host, port = server.sockets[0].getsockname()[:2]
+    reader, writer = await asyncio.open_connection(host, port)
+    for frame in frames:
+        writer.write(frame.encode() + b'\n')
+    await writer.drain()
+    replies = [json.loads(await reader.readline()) for _ in frames]
+    writer.close()
+    server.close()
+    await server.wait_closed()
+    tracker.worker.cancel()
+    return replies
+
+
+def test_service_replies_in_order():
+    frames = [
+        json.dumps({'id': 1, 'workout_type': 'SWM',
+                    'data': [720, 1, 80, 25, 40]}),
+        json.dumps({'id': 2, 'workout_type': 'PPP', 'data': [1, 1, 1]}),
+        'не json',
+        json.dumps({'id': 4, 'workout_type': 'RUN', 'data': [1, 1]}),
+        json.dumps({'id': 5, 'workout_type': 'WLK',
+                    'data': [9000, 1, 75, 180], 'format': 'json'}),
+    ]
+    replies = asyncio.run(exchange(frames))
+    expected = homework.read_package('SWM', [720, 1, 80, 25, 40])
+    assert replies[0] == {
+        'id': 1, 'message': str(expected.show_training_info())
+    }
+    assert replies[1]['id'] == 2 and 'PPP' in replies[1]['error']
+    assert replies[2]['id'] is None and 'error' in replies[2]
+    assert replies[3]['id'] == 4 and 'error' in replies[3]
+    assert replies[4]['id'] == 5
+    assert replies[4]['result']['calories'] == pytest.approx(349.252,
+                                                             abs=1e-3)
+
+
+def test_service_survives_unexpected_error():
+    @homework.register_workout('BUG')
+    class Broken(homework.Training):
+        def get_spent_calories(self):
+            raise KeyError('weight')
+
+    frames = [
+        json.dumps({'id': 1, 'workout_type': 'BUG', 'data': [1, 1, 1]}),
+        json.dumps({'id': 2, 'workout_type': 'RUN', 'data': [9000, 0, 75]}),
+        json.dumps({'id': 3, 'workout_type': 'RUN',
+                    'data': [9000, 1, 75]}),
+    ]
+    try:
+        replies = asyncio.run(asyncio.wait_for(exchange(frames), 5))
+    finally:
+        homework.unregister_workout('BUG')
+    assert replies[0] == {'id': 1, 'error': "'weight'"}, (
+        'Неожиданная ошибка расчёта должна вернуться ответом с error'
+    )
+    assert replies[1]['id'] == 2 and 'error' in replies[1], (
+        'Пакет с нулевой длительностью должен отбраковываться проверкой'
+    )
+    assert 'message' in replies[2], (
+        'Обработчик очереди должен работать после ошибки расчёта'
+    )
+
+
+def test_load_test_small_inputs():
+    async def run(packages):
+        tracker = service.TrackerService()
+        server = await tracker.start()
+        host, port = server.sockets[0].getsockname()[:2]
+        try:
+            async with server:
+                return await service.load_test(host, port, packages)
+        finally:
+            tracker.worker.cancel()
+
+    report = asyncio.run(run([('RUN', [15000, 1, 75])]))
+    assert report.requests == 1
+    assert report.p50_ms == report.p99_ms > 0, (
+        'Для одного пакета p50 и p99 должны равняться его задержке'
+    )
+    with pytest.raises(ValueError):
+        asyncio.run(run([]))
@@ -0,0 +1,47 @@
+from concurrent.futures import ProcessPoolExecutor
+
+import pytest
+from conftest import to_columns
+
+import shared
+from batch import compute_batch
+
+PACKAGES = {
+    'RUN': [[15000 + index, 1 + index % 3, 75] for index in range(50)],
+    'SWM': [[720 + index, 1, 80, 25, 40 + index % 5] for index in range(50)],
+}
+
+
+@pytest.mark.parametrize('workout_type', PACKAGES)
+def test_compute_parallel_matches_batch(workout_type):
+    columns = to_columns(workout_type, PACKAGES[workout_type])
+    expected = compute_batch(workout_type, columns)
+    with ProcessPoolExecutor(2) as executor:
+        result = shared.compute_parallel(workout_type, columns,
+                                         chunk_size=7, executor=executor)
+    assert result == expected, (
+        'Расчёт в общей памяти должен совпадать с пакетным.'
+    )
+
+
+def test_shared_batch_attach_and_fields():
+    columns = to_columns('RUN', PACKAGES['RUN'])
+    with shared.SharedBatch.create('RUN', columns) as owner:
+        descriptor = owner.descriptor
+        assert shared.compute_range(descriptor, 40, 100, ('speed',)) == 10
+        with shared.SharedBatch.attach(descriptor) as attached:
+            assert list(attached.columns['action']) == columns['action']
+            attached.compute(0, 40, ('speed',))
+        result = owner.result(('speed',))
+    assert result.distance is None and result.calories is None
+    assert result.speed == compute_batch('RUN', columns, ('speed',)).speed
+    with pytest.raises(FileNotFoundError):
+        shared.SharedBatch.attach(descriptor)
+
+
+def test_compute_parallel_empty_and_errors():
+    empty = shared.compute_parallel('RUN', {'action': [], 'duration': [],
+                                            'weight': []}, workers=1)
+    assert len(empty) == 0
+    with pytest.raises(ValueError, match='weight'):
+        shared.SharedBatch.create('RUN', {'action': [1], 'duration': [1]})
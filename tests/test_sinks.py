@@ -0,0 +1,85 @@
+import gzip
+import io
+import json
+
+import pytest
+from conftest import Capturing
+
+import homework
+import ingest
+import parallel
+import sinks
+
+PACKAGES = [
+    ('SWM', [720, 1, 80, 25, 40]),
+    ('RUN', [15000, 1, 75]),
+    ('WLK', [9000, 1, 75, 180]),
+]
+
+
+def messages():
+    return [
+        homework.read_package(*package).show_training_info()
+        for package in PACKAGES
+    ]
+
+
+def printed():
+    with Capturing() as output:
+        for info in messages():
+            print(info)
+    return ''.join(f'{line}\n' for line in output)
+
+
+@pytest.mark.parametrize('buffer_size', [1, 2, 100])
+def test_text_file_sink(buffer_size):
+    stream = io.StringIO()
+    with sinks.TextFileSink(stream, buffer_size=buffer_size) as sink:
+        for training in (homework.read_package(*p) for p in PACKAGES):
+            homework.main(training, sink)
+    assert stream.getvalue() == printed(), (
+        'Приёмник должен выводить то же, что и `print`.'
+    )
+
+
+def test_text_file_sink_buffers():
+    stream = io.StringIO()
+    sink = sinks.TextFileSink(stream, buffer_size=10, flush_interval=60)
+    sink.write_many(messages())
+    assert stream.getvalue() == ''
+    sink.close()
+    assert stream.getvalue() == printed()
+    sink.close()
+
+
+def test_gzip_sink(tmp_path):
+    path = str(tmp_path / 'out.txt.gz')
+    with sinks.GzipSink(path) as sink:
+        sink.write_many(messages())
+    with gzip.open(path, 'rt', encoding='utf-8') as file:
+        assert file.read() == printed()
+
+
+def test_json_lines_sink(tmp_path):
+    path = str(tmp_path / 'out.jsonl')
+    with sinks.JsonLinesSink(path) as sink:
+        sink.write_many(messages())
+    with open(path, encoding='utf-8') as file:
+        rows = [json.loads(line) for line in file]
+    assert [row['training_type'] for row in rows] == [
+        'Swimming', 'Running', 'SportsWalking'
+    ]
+    assert rows[0]['calories'] == pytest.approx(336.0)
+
+
+def test_memory_sink_with_runners():
+    text = ''.join(','.join(map(str, [code, *data])) + '\n'
+                   for code, data in PACKAGES)
+    sink = sinks.MemorySink()
+    ingest.run_serial(io.StringIO(text), sink=sink)
+    assert sink.messages == messages()
+    assert sink.lines == printed().splitlines()
+    stream = io.StringIO()
+    with sinks.TextFileSink(stream) as text_sink:
+        parallel.process_sharded(io.StringIO(text), text_sink, workers=1)
+    assert stream.getvalue() == printed()
@@ -0,0 +1,120 @@
+import random
+from bisect import bisect_left
+
+import pytest
+
+import homework
+import sketches
+from batch import compute_batch
+
+QUANTILES = (0.01, 0.1, 0.5, 0.9, 0.99)
+
+
+def exact_rank(ordered, value):
+    return bisect_left(ordered, value) / len(ordered)
+
+
+@pytest.fixture(scope='module')
+def values():
+    rnd = random.Random(7)
+    return [rnd.lognormvariate(2, 1) for _ in range(50000)]
+
+
+@pytest.mark.parametrize('k', [50, 200])
+@pytest.mark.parametrize('batched', [False, True])
+def test_kll_accuracy(values, k, batched):
+    sketch = sketches.KLLSketch(k, seed=1)
+    if batched:
+        sketch.update_many(values)
+    else:
+        for value in values:
+            sketch.update(value)
+    ordered = sorted(values)
+    assert sketch.count == len(values)
+    assert (sketch.min, sketch.max) == (ordered[0], ordered[-1])
+    assert len(sketch.to_bytes()) < 8 * 4 * k, (
+        'Скетч должен занимать O(k) памяти.'
+    )
+    for q in QUANTILES:
+        error = abs(exact_rank(ordered, sketch.quantile(q)) - q)
+        assert error <= sketch.rank_error, (
+            f'Ошибка ранга квантиля {q} превышает оценку: {error}.'
+        )
+
+
+def test_kll_merge_and_bytes(values):
+    shards = [sketches.KLLSketch(100, seed=index) for index in range(4)]
+    for index, shard in enumerate(shards):
+        shard.update_many(values[index::4])
+    merged = shards[0]
+    for shard in shards[1:]:
+        merged.merge(shard)
+    ordered = sorted(values)
+    assert merged.count == len(values)
+    for q in QUANTILES:
+        assert abs(exact_rank(ordered, merged.quantile(q)) - q) <= (
+            merged.rank_error
+        )
+    restored = sketches.KLLSketch.from_bytes(merged.to_bytes())
+    assert restored.quantiles(QUANTILES) == merged.quantiles(QUANTILES)
+    assert restored.count == merged.count
+    with pytest.raises(ValueError):
+        sketches.KLLSketch.from_bytes(b'XXXX' + merged.to_bytes()[4:])
+
+
+def test_k_for_error():
+    k = sketches.k_for_error(0.01)
+    assert sketches.rank_error(k) <= 0.01 < sketches.rank_error(k - 1)
+    with pytest.raises(ValueError):
+        sketches.k_for_error(0)
+
+
+def test_histogram(values):
+    histogram = sketches.Histogram.geometric(0.5, 500, 400)
+    left, right = values[:1000], values[1000:]
+    histogram.update_many(left)
+    other = sketches.Histogram.geometric(0.5, 500, 400)
+    for value in right:
+        other.update(value)
+    histogram.merge(other)
+    assert histogram.count == sum(histogram.counts) == len(values)
+    ordered = sorted(values)
+    for q in QUANTILES:
+        assert abs(exact_rank(ordered, histogram.quantile(q)) - q) < 0.005
+    restored = sketches.Histogram.from_bytes(histogram.to_bytes())
+    assert restored.counts == histogram.counts
+    assert restored.quantiles() == histogram.quantiles()
+    with pytest.raises(ValueError):
+        histogram.merge(sketches.Histogram.linear(0, 1, 10))
+
+
+def test_metric_sketches_messages_and_batch():
+    packages = [[15000 + 100 * index, 1, 75] for index in range(150)]
+    by_message = sketches.MetricSketches(edges={'speed': range(0, 50)},
+                                         seed=0)
+    for data in packages:
+        by_message.add(homework.read_package('RUN', data)
+                       .show_training_info())
+    columns = {
+        name: [data[index] for data in packages]
+        for index, name in enumerate(('action', 'duration', 'weight'))
+    }
+    by_batch = sketches.MetricSketches(edges={'speed': range(0, 50)},
+                                       seed=0)
+    by_batch.add_batch(compute_batch('RUN', columns))
+    assert by_message.keys() == by_batch.keys() == [
+        ('Running', 'speed'), ('Running', 'calories')
+    ]
+    for training_type, metric in by_message.keys():
+        assert by_message.quantiles(training_type, metric) == pytest.approx(
+            by_batch.quantiles(training_type, metric)
+        ), 'Сообщения и столбцы должны давать одни квантили.'
+    restored = sketches.MetricSketches.from_bytes(by_message.to_bytes())
+    assert restored.summary() == by_message.summary()
+    assert restored.histograms[('Running', 'speed')].counts == (
+        by_message.histograms[('Running', 'speed')].counts
+    )
+    restored.merge(by_batch)
+    assert restored.sketches[('Running', 'speed')].count == 300
+    with pytest.raises(ValueError, match='calories'):
+        by_batch.add_batch(compute_batch('RUN', columns, ('speed',)))
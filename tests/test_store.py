@@ -0,0 +1,92 @@
+import pytest
+
+import homework
+import store
+from aggregate import DAY
+
+PACKAGES = [
+    ('alice', 0, 'RUN', [15000, 1, 75]),
+    ('alice', DAY, 'SWM', [720, 1, 80, 25, 40]),
+    ('bob', DAY, 'WLK', [9000, 1, 75, 180]),
+    ('bob', 2 * DAY, 'RUN', [20000, 2, 80]),
+    ('bob', 3 * DAY, 'RUN', [15000, 0, 75]),
+    ('bob', 3 * DAY, 'PPP', [1, 2, 3]),
+]
+
+
+def info(workout_type, data):
+    return homework.read_package(workout_type, data).show_training_info()
+
+
+@pytest.fixture
+def training_store(tmp_path):
+    with store.TrainingStore(str(tmp_path / 'trainings.db'),
+                             batch_size=2) as training_store:
+        stats = training_store.add_many(PACKAGES)
+        assert stats.processed == 4
+        assert stats.rejected == {'RUN': 1, 'PPP': 1}
+        yield training_store
+
+
+def test_add_many(training_store):
+    assert len(training_store) == 4
+    stored = list(training_store.trainings(user='bob'))
+    assert [item.timestamp for item in stored] == [DAY, 2 * DAY]
+    assert stored[0].data == [9000, 1, 75, 180]
+    assert stored[0].info == info('WLK', [9000, 1, 75, 180]), (
+        'Сохранённые показатели должны совпадать с расчётом.'
+    )
+
+
+def test_totals(training_store):
+    calories = training_store.calories_by_type()
+    assert calories['Running'] == pytest.approx(
+        info('RUN', [15000, 1, 75]).calories
+        + info('RUN', [20000, 2, 80]).calories
+    )
+    assert set(calories) == {'Running', 'Swimming', 'SportsWalking'}
+    assert training_store.calories_by_type(user='alice', start=DAY) == {
+        'Swimming': info('SWM', [720, 1, 80, 25, 40]).calories
+    }
+    totals = training_store.totals_by_type(start=0, end=2 * DAY)
+    assert totals['Running'].count == 1
+    assert totals['Swimming'].distance == pytest.approx(0.9936)
+
+
+def test_top_distances(training_store):
+    top = training_store.top_distances(2)
+    assert [item.info.distance for item in top] == [
+        info('RUN', [20000, 2, 80]).distance,
+        info('RUN', [15000, 1, 75]).distance,
+    ]
+    assert [item.user for item in training_store.top_distances(
+        1, training_type='SportsWalking'
+    )] == ['bob']
+
+
+def test_indexes_are_used(training_store):
+    plan = training_store.explain(
+        'SELECT * FROM trainings WHERE user = ? AND ts >= ?', ('bob', 0)
+    )
+    assert 'trainings_user' in plan
+    plan = training_store.explain(
+        'SELECT * FROM trainings ORDER BY distance DESC LIMIT 5'
+    )
+    assert 'trainings_distance' in plan
+
+
+def test_add():
+    with store.TrainingStore() as training_store:
+        message = training_store.add('carol', 10, 'RUN', [15000, 1, 75])
+        assert message == info('RUN', [15000, 1, 75])
+        with pytest.raises(ValueError):
+            training_store.add('carol', 11, 'RUN', [15000, 1])
+        assert len(training_store) == 1
+
+
+def test_compensated_sum():
+    training_store = store.TrainingStore()
+    total = training_store.connection.execute(
+        'SELECT NSUM(column1) FROM (VALUES (1e16), (1.0), (-1e16), (0.5))'
+    ).fetchone()[0]
+    assert total == 1.5, 'NSUM должна складывать с компенсацией округления'
@@ -0,0 +1,166 @@
+import io
+import json
+from array import array
+
+import pytest
+
+import batch
+import homework
+import ingest
+import sinks
+import validate
+
+VALID = [
+    ('SWM', [720, 1, 80, 25, 40]),
+    ('RUN', [15000, 1, 75]),
+    ('WLK', [9000, 1.5, 75, 180]),
+    ('RUN', [0, 0.5, 75]),
+]
+
+
+@pytest.mark.parametrize('workout_type, data', VALID)
+def test_check_package_valid(workout_type, data):
+    assert validate.check_package(workout_type, data) is None
+
+
+@pytest.mark.parametrize('workout_type, data, reason', [
+    ('PPP', [9000, 1, 75, 180], validate.UNKNOWN_TYPE),
+    (['RUN'], [15000, 1, 75], validate.UNKNOWN_TYPE),
+    ('RUN', [15000, 1], validate.BAD_ARITY),
+    ('SWM', [720, 1, 80, 25, 40, 1], validate.BAD_ARITY),
+    ('RUN', [15000, True, 75], validate.BAD_TYPE),
+    ('RUN', [15000, '1', 75], validate.BAD_TYPE),
+    ('RUN', 'abc', validate.BAD_TYPE),
+    ('RUN', [15000, 0, 75], validate.OUT_OF_RANGE),
+    ('RUN', [-1, 1, 75], validate.OUT_OF_RANGE),
+    ('RUN', [15000, float('nan'), 75], validate.OUT_OF_RANGE),
+    ('WLK', [9000, 1, 75, float('inf')], validate.OUT_OF_RANGE),
+    ('SWM', [720, 1, 80, 0, 40], validate.OUT_OF_RANGE),
+    ('RUN', [10 ** 400, 1, 75], validate.OUT_OF_RANGE),
+    ('WLK', [9000, 1, 75, -10 ** 400], validate.OUT_OF_RANGE),
+])
+def test_check_package_rejects(workout_type, data, reason):
+    rejection = validate.check_package(workout_type, data)
+    assert rejection is not None, 'Пакет должен быть отбракован.'
+    assert rejection.reason == reason
+    assert rejection.detail
+
+
+def test_process_stream_dead_letter():
+    text = (
+        'RUN,15000,1,75\n'
+        'RUN,15000,0,75\n'
+        'RUN,15000,1\n'
+        'PPP,1,1,1\n'
+        'WLK,9000,1.5,75,180\n'
+    )
+    stats = ingest.IngestStats()
+    dead_letter = sinks.MemorySink()
+    result = list(ingest.process_stream(io.StringIO(text), 'csv', stats,
+                                        dead_letter=dead_letter))
+    assert [info.training_type for info in result] == [
+        'Running', 'SportsWalking'
+    ]
+    assert stats.processed == 2
+    assert stats.rejected == {'RUN': 2, 'PPP': 1}
+    assert stats.reasons == {
+        validate.OUT_OF_RANGE: 1,
+        validate.BAD_ARITY: 1,
+        validate.UNKNOWN_TYPE: 1,
+    }
+    assert [r.reason for r in dead_letter.messages] == [
+        validate.OUT_OF_RANGE, validate.BAD_ARITY, validate.UNKNOWN_TYPE
+    ]
+
+
+def test_process_stream_unhashable_workout_type():
+    text = (
+        '[["RUN"], [15000, 1, 75]]\n'
+        '{"workout_type": {"code": "RUN"}, "data": [15000, 1, 75]}\n'
+        '["RUN", [15000, 1, 75]]\n'
+    )
+    stats = ingest.IngestStats()
+    result = list(ingest.process_stream(io.StringIO(text), 'jsonl', stats))
+    assert [info.training_type for info in result] == ['Running'], (
+        'Пакет с кодом-списком должен отбраковываться, не прерывая поток.'
+    )
+    assert stats.rejected == {"['RUN']": 1, "{'code': 'RUN'}": 1}
+    assert stats.reasons == {validate.UNKNOWN_TYPE: 2}
+
+
+def test_process_stream_int_overflow():
+    stats = ingest.IngestStats()
+    text = f'RUN,{"9" * 400},1,75\nRUN,15000,1,75\n'
+    result = list(ingest.process_stream(io.StringIO(text), 'csv', stats))
+    assert len(result) == 1, (
+        'Число, не представимое во float, должно отбраковываться.'
+    )
+    assert stats.reasons == {validate.OUT_OF_RANGE: 1}
+    columns = {'action': [10 ** 400, 15000], 'duration': [1, 1],
+               'weight': [75, 75]}
+    assert validate.invalid_mask(homework.Running, columns) == b'\1\0'
+
+
+def test_split_columns_valid_without_copy():
+    columns = {
+        'action': array('d', [15000, 9000]),
+        'duration': array('d', [1, 2]),
+        'weight': array('d', [75, 80]),
+    }
+    valid, rejections = validate.split_columns('RUN', columns)
+    assert valid is columns
+    assert rejections == []
+
+
+def test_compute_valid():
+    columns = {
+        'action': [9000, 9000, 9000, 9000],
+        'duration': [1, 0, 1.5, 1],
+        'weight': [75, 75, None, 80],
+        'height': [180, 180, 180, 170],
+    }
+    dead_letter = sinks.MemorySink()
+    result, rejections = validate.compute_valid('WLK', columns, dead_letter)
+    assert [r.reason for r in rejections] == [
+        validate.OUT_OF_RANGE, validate.BAD_TYPE
+    ]
+    assert dead_letter.messages == rejections
+    expected = batch.compute_batch('WLK', {
+        name: [column[0], column[3]] for name, column in columns.items()
+    })
+    assert result == expected
+
+
+def test_invalid_mask_missing_column():
+    with pytest.raises(ValueError):
+        validate.invalid_mask(homework.Running, {'action': [1]})
+
+
+def test_dead_letter_sink(tmp_path):
+    path = str(tmp_path / 'rejected.jsonl')
+    with sinks.DeadLetterSink(path) as sink:
+        sink.write(validate.check_package('RUN', [15000, 0, 75]))
+    with open(path, encoding='utf-8') as file:
+        row = json.loads(file.readline())
+    assert row['reason'] == validate.OUT_OF_RANGE
+    assert row['data'] == [15000, 0, 75]
+
+
+def test_invalid_mask_array_columns():
+    columns = {
+        'action': array('d', [15000, 15000, 15000]),
+        'duration': array('d', [1, float('nan'), 1]),
+        'weight': array('d', [75, 75, float('inf')]),
+    }
+    mask = validate.invalid_mask(homework.Running, columns)
+    assert mask == b'\0\1\1'
+
+
+def test_read_checked():
+    training = validate.read_checked('RUN', [15000, 1, 75])
+    assert isinstance(training, homework.Running)
+    with pytest.raises(ValueError) as error:
+        validate.read_checked('RUN', [15000, 0, 75])
+    assert error.value.rejection.reason == validate.OUT_OF_RANGE, (
+        'Ошибка проверки должна быть подклассом ValueError с причиной.'
+    )
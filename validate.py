@@ -0,0 +1,271 @@
+"""Проверка пакетов перед расчётом и отбраковка с кодами причин.
+
+Проверяются код тренировки, число значений, их типы (int или float,
+но не bool) и диапазоны: длительность, вес, рост и длина бассейна
+больше нуля, число действий и переплытий не меньше нуля, все
+значения конечны и представимы во float, в том числе большие int.
+Отбракованные пакеты можно передать в приёмник `sinks.DeadLetterSink`.
+"""
+import sys
+from array import array
+from dataclasses import dataclass
+from functools import lru_cache
+from itertools import compress
+from typing import Any, Callable, Optional, Sequence
+
+from batch import BatchResult, Columns, compute_columns, get_columns
+from homework import WORKOUT_TYPES, Training, load_workout
+
+UNKNOWN_TYPE: str = 'unknown_type'
+BAD_ARITY: str = 'bad_arity'
+BAD_TYPE: str = 'bad_type'
+OUT_OF_RANGE: str = 'out_of_range'
+REASONS: tuple[str, ...] = (UNKNOWN_TYPE, BAD_ARITY, BAD_TYPE, OUT_OF_RANGE)
+
+POSITIVE: frozenset[str] = frozenset(
+    ('duration', 'weight', 'height', 'length_pool')
+)
+NON_NEGATIVE: frozenset[str] = frozenset(('action', 'count_pool'))
+NUMBER_TYPES: frozenset[type] = frozenset((int, float))
+INF: float = float('inf')
+FLOAT_MAX: float = sys.float_info.max
+
+_FLIP = bytes.maketrans(b'\0\1', b'\1\0')
+
+
+@dataclass
+class Rejection:
+    """Отбракованный пакет."""
+
+    workout_type: Any
+    data: Any
+    reason: str
+    detail: str
+
+
+class InvalidPackage(ValueError):
+    """Пакет не прошёл проверку."""
+
+    def __init__(self, rejection: Rejection) -> None:
+        super().__init__(rejection.detail)
+        self.rejection = rejection
+
+
+@dataclass(frozen=True)
+class Schema:
+    """Правила проверки значений пакета одного вида тренировки.
+
+    Значение допустимо, если `lower < value <= FLOAT_MAX` (для строгой
+    границы) или `lower <= value <= FLOAT_MAX`. `accepts` — быстрая проверка
+    допустимого пакета без поиска причины отказа.
+    """
+
+    training_class: type[Training]
+    names: tuple[str, ...]
+    lower: tuple[float, ...]
+    strict: tuple[bool, ...]
+    accepts: Callable[[Any], bool]
+
+
+def _compile_accepts(lower: tuple[float, ...],
+                     strict: tuple[bool, ...]) -> Callable[[Any], bool]:
+    """Собрать быструю проверку пакета по готовым границам.
+
+    Сравнение с `FLOAT_MAX` отсеивает бесконечности и int, не
+    представимые во float; NaN отсеивается, так как любое сравнение
+    с ним ложно.
+    """
+    size = len(lower)
+    bounds = tuple(zip(lower, strict))
+
+    def accepts(data: Any) -> bool:
+        if type(data) not in (list, tuple) or len(data) != size:
+            return False
+        for value, (bound, is_strict) in zip(data, bounds):
+            if type(value) not in NUMBER_TYPES or not (
+                bound < value <= FLOAT_MAX if is_strict
+                else bound <= value <= FLOAT_MAX
+            ):
+                return False
+        return True
+    return accepts
+
+
+@lru_cache(maxsize=None)
+def get_schema(training_class: type[Training]) -> Schema:
+    """Получить правила проверки для вида тренировки."""
+    names = get_columns(training_class)
+    lower = tuple(
+        0.0 if name in POSITIVE or name in NON_NEGATIVE else -FLOAT_MAX
+        for name in names
+    )
+    strict = tuple(name in POSITIVE for name in names)
+    return Schema(training_class, names, lower, strict,
+                  _compile_accepts(lower, strict))
+
+
+def check_package(workout_type: Any, data: Any) -> Optional[Rejection]:
+    """Проверить пакет; вернуть `None` или причину отказа."""
+    try:
+        training_class = WORKOUT_TYPES.get(workout_type)
+    except TypeError:
+        training_class = None
+    if training_class is not None and get_schema(training_class).accepts(
+        data
+    ):
+        return None
+    return _explain(workout_type, data, training_class)
+
+
+def read_checked(workout_type: Any, data: Any) -> Training:
+    """Проверить пакет и создать тренировку.
+
+    Для допустимого пакета код тренировки ищется один раз.
+    Иначе возбуждается `InvalidPackage` с причиной отказа.
+    """
+    try:
+        training_class = WORKOUT_TYPES.get(workout_type)
+    except TypeError:
+        training_class = None
+    if training_class is not None and get_schema(training_class).accepts(
+        data
+    ):
+        return training_class(*data)
+    rejection = _explain(workout_type, data, training_class)
+    if rejection is not None:
+        raise InvalidPackage(rejection)
+    return load_workout(workout_type)(*data)
+
+
+def _explain(workout_type: Any,
+             data: Any,
+             training_class: Optional[type[Training]]
+             ) -> Optional[Rejection]:
+    if training_class is None:
+        try:
+            training_class = load_workout(workout_type)
+        except (TypeError, ValueError) as error:
+            return Rejection(workout_type, data, UNKNOWN_TYPE, str(error))
+    if not isinstance(data, (list, tuple)):
+        return Rejection(workout_type, data, BAD_TYPE,
+                         'Данные пакета должны быть списком чисел.')
+    schema = get_schema(training_class)
+    if len(data) != len(schema.names):
+        return Rejection(
+            workout_type, data, BAD_ARITY,
+            f'{training_class.__name__} ожидает {len(schema.names)} '
+            f'значений, получено {len(data)}.'
+        )
+    for value, lower, strict, name in zip(data, schema.lower,
+                                          schema.strict, schema.names):
+        if type(value) not in NUMBER_TYPES:
+            return Rejection(workout_type, data, BAD_TYPE,
+                             f'Поле {name} должно быть числом.')
+        if not (lower < value <= FLOAT_MAX if strict
+                else lower <= value <= FLOAT_MAX):
+            return Rejection(
+                workout_type, data, OUT_OF_RANGE,
+                f'Поле {name} вне допустимого диапазона: {value!r}.'
+            )
+    return None
+
+
+def _column_accepts(column: Sequence[Any],
+                    lower: float,
+                    strict: bool) -> bool:
+    if not len(column):
+        return True
+    if not isinstance(column, (array, memoryview)) and not (
+        NUMBER_TYPES.issuperset(map(type, column))
+    ):
+        return False
+    smallest = min(column)
+    if not (lower < smallest if strict else lower <= smallest):
+        return False
+    return max(column) <= FLOAT_MAX and -INF < sum(column) < INF
+
+
+def _type_mask(column: Sequence[Any]) -> bytes:
+    if isinstance(column, (array, memoryview)):
+        return bytes(len(column))
+    return bytes(type(value) not in NUMBER_TYPES for value in column)
+
+
+def _range_mask(column: Sequence[Any],
+                lower: float,
+                strict: bool,
+                skip: bytes) -> bytes:
+    if strict:
+        return bytes(
+            not skipped and not lower < value <= FLOAT_MAX
+            for value, skipped in zip(column, skip)
+        )
+    return bytes(
+        not skipped and not lower <= value <= FLOAT_MAX
+        for value, skipped in zip(column, skip)
+    )
+
+
+def invalid_mask(training_class: type[Training], columns: Columns) -> bytes:
+    """Получить маску строк с ошибками: 1 — строка отбракована.
+
+    Столбец сначала проверяется целиком через `min` и `sum`; маска
+    строится только для столбцов с ошибками. Маски столбцов
+    объединяются побитовым ИЛИ над целыми числами.
+    """
+    schema = get_schema(training_class)
+    missing = [name for name in schema.names if name not in columns]
+    if missing:
+        raise ValueError(f'Нет столбцов: {", ".join(missing)}.')
+    count = len(columns[schema.names[0]])
+    combined = 0
+    for name, lower, strict in zip(schema.names, schema.lower,
+                                   schema.strict):
+        column = columns[name]
+        if len(column) != count:
+            raise ValueError('Столбцы должны быть одной длины.')
+        if _column_accepts(column, lower, strict):
+            continue
+        type_mask = _type_mask(column)
+        combined |= int.from_bytes(type_mask, 'little')
+        combined |= int.from_bytes(
+            _range_mask(column, lower, strict, type_mask), 'little'
+        )
+    return combined.to_bytes(count, 'little')
+
+
+def split_columns(workout_type: str,
+                  columns: Columns,
+                  dead_letter: Any = None
+                  ) -> tuple[Columns, list[Rejection]]:
+    """Отделить допустимые строки столбцов от отбракованных.
+
+    Если ошибок нет, столбцы возвращаются без копирования.
+    Отбракованные строки записываются в `dead_letter`, если он задан.
+    """
+    training_class = load_workout(workout_type)
+    mask = invalid_mask(training_class, columns)
+    if not mask.count(1):
+        return columns, []
+    names = get_columns(training_class)
+    rejections = []
+    for index in compress(range(len(mask)), mask):
+        rejection = check_package(
+            workout_type, [columns[name][index] for name in names]
+        )
+        rejections.append(rejection)
+        if dead_letter is not None:
+            dead_letter.write(rejection)
+    valid = mask.translate(_FLIP)
+    return {
+        name: array('d', compress(columns[name], valid)) for name in names
+    }, rejections
+
+
+def compute_valid(workout_type: str,
+                  columns: Columns,
+                  dead_letter: Any = None
+                  ) -> tuple[BatchResult, list[Rejection]]:
+    """Рассчитать допустимые строки столбцов и вернуть отказы."""
+    valid, rejections = split_columns(workout_type, columns, dead_letter)
+    return compute_columns(load_workout(workout_type), valid), rejections